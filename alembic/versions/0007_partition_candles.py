@@ -0,0 +1,121 @@
+"""partition candles by timeframe and month
+
+Revision ID: 0007_partition_candles
+Revises: 0006_multi_index_mapping
+Create Date: 2026-10-17 00:00:00
+"""
+
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_partition_candles"
+down_revision = "0006_multi_index_mapping"
+branch_labels = None
+depends_on = None
+
+COLUMNS = "symbol, timeframe, ts, open, high, low, close, volume, source"
+MONTHS_AHEAD = 2
+# Frozen copies of the partition layout at this revision; runtime maintenance lives in
+# app.infra.db.partitions and may evolve without changing what this migration does.
+TIMEFRAMES = ("5m", "15m", "1h", "1d")
+
+
+def _month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_timeframe(conn, timeframe: str) -> None:
+    table = f"candles_{timeframe}"
+    conn.execute(
+        sa.text(
+            f"CREATE TABLE {table} PARTITION OF candles FOR VALUES IN ('{timeframe}') PARTITION BY RANGE (ts)"
+        )
+    )
+    conn.execute(sa.text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+
+
+def _create_month(conn, timeframe: str, month: date) -> None:
+    table = f"candles_{timeframe}"
+    name = f"{table}_{month.year:04d}_{month.month:02d}"
+    lower, upper = month.isoformat(), _add_months(month, 1).isoformat()
+    conn.execute(sa.text(f"CREATE TABLE {name} (LIKE candles INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(
+        sa.text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}+00') TO ('{upper}+00')")
+    )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    op.drop_index("ix_candles_symbol_timeframe_ts", table_name="candles")
+    op.drop_index("ix_candles_timeframe_ts", table_name="candles")
+    conn.execute(sa.text("ALTER TABLE candles RENAME TO candles_unpartitioned"))
+    conn.execute(sa.text("ALTER TABLE candles_unpartitioned RENAME CONSTRAINT candles_pkey TO candles_unpartitioned_pkey"))
+
+    conn.execute(
+        sa.text(
+            """
+            CREATE TABLE candles (
+                symbol varchar NOT NULL,
+                timeframe varchar NOT NULL,
+                ts timestamptz NOT NULL,
+                open double precision NOT NULL,
+                high double precision NOT NULL,
+                low double precision NOT NULL,
+                close double precision NOT NULL,
+                volume double precision NOT NULL,
+                source varchar NOT NULL,
+                CONSTRAINT candles_pkey PRIMARY KEY (symbol, timeframe, ts)
+            ) PARTITION BY LIST (timeframe)
+            """
+        )
+    )
+    conn.execute(sa.text("CREATE TABLE candles_other PARTITION OF candles DEFAULT"))
+    op.create_index("ix_candles_timeframe_ts", "candles", ["timeframe", "ts"])
+
+    spans = {
+        row[0]: row[1]
+        for row in conn.execute(sa.text("SELECT timeframe, min(ts) FROM candles_unpartitioned GROUP BY timeframe"))
+    }
+    last = _add_months(_month_start(datetime.now(timezone.utc).date()), MONTHS_AHEAD)
+    for timeframe in TIMEFRAMES:
+        _create_timeframe(conn, timeframe)
+        first = spans.get(timeframe)
+        month = _month_start(first.astimezone(timezone.utc).date()) if first is not None else _add_months(last, -MONTHS_AHEAD)
+        while month <= last:
+            _create_month(conn, timeframe, month)
+            month = _add_months(month, 1)
+
+    conn.execute(sa.text(f"INSERT INTO candles ({COLUMNS}) SELECT {COLUMNS} FROM candles_unpartitioned"))
+    conn.execute(sa.text("DROP TABLE candles_unpartitioned"))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("ALTER TABLE candles RENAME TO candles_partitioned"))
+    conn.execute(sa.text("ALTER INDEX ix_candles_timeframe_ts RENAME TO ix_candles_partitioned_timeframe_ts"))
+    conn.execute(sa.text("ALTER TABLE candles_partitioned RENAME CONSTRAINT candles_pkey TO candles_partitioned_pkey"))
+    op.create_table(
+        "candles",
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("timeframe", sa.String(), nullable=False),
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("open", sa.Float(), nullable=False),
+        sa.Column("high", sa.Float(), nullable=False),
+        sa.Column("low", sa.Float(), nullable=False),
+        sa.Column("close", sa.Float(), nullable=False),
+        sa.Column("volume", sa.Float(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("symbol", "timeframe", "ts"),
+    )
+    conn.execute(sa.text(f"INSERT INTO candles ({COLUMNS}) SELECT {COLUMNS} FROM candles_partitioned"))
+    conn.execute(sa.text("DROP TABLE candles_partitioned CASCADE"))
+    op.create_index("ix_candles_symbol_timeframe_ts", "candles", ["symbol", "timeframe", "ts"])
+    op.create_index("ix_candles_timeframe_ts", "candles", ["timeframe", "ts"])
@@ -0,0 +1,34 @@
+"""latest snapshot pointer
+
+Revision ID: 0008_latest_snapshot
+Revises: 0007_partition_candles
+Create Date: 2026-10-17 00:00:01
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0008_latest_snapshot"
+down_revision = "0007_partition_candles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by the next compute cycle; until then reads fall back to the snapshot tables.
+    op.create_table(
+        "latest_snapshot",
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("timeframe", sa.String(), nullable=False),
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("checksum", sa.String(), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.PrimaryKeyConstraint("kind", "timeframe"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("latest_snapshot")
@@ -0,0 +1,41 @@
+"""delta scanner snapshots
+
+Revision ID: 0009_snapshot_deltas
+Revises: 0008_latest_snapshot
+Create Date: 2026-10-17 00:00:02
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_snapshot_deltas"
+down_revision = "0008_latest_snapshot"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing snapshots are complete, so every stored row is a keyframe.
+    op.add_column(
+        "scanner_snapshot",
+        sa.Column("keyframe", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+    )
+    op.add_column(
+        "scanner_snapshot",
+        sa.Column("removed", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+    op.create_index(
+        "ix_snapshot_keyframes",
+        "scanner_snapshot",
+        ["timeframe", "ts"],
+        postgresql_where=sa.text("keyframe"),
+    )
+
+
+def downgrade() -> None:
+    # Delta rows are not complete snapshots on their own; after a downgrade only
+    # keyframe cycles read back whole.
+    op.drop_index("ix_snapshot_keyframes", table_name="scanner_snapshot")
+    op.drop_column("scanner_snapshot", "removed")
+    op.drop_column("scanner_snapshot", "keyframe")
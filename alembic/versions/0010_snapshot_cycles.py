@@ -0,0 +1,38 @@
+"""record scanner snapshot cycle times
+
+Revision ID: 0010_snapshot_cycles
+Revises: 0009_snapshot_deltas
+Create Date: 2026-10-17 00:00:03
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_snapshot_cycles"
+down_revision = "0009_snapshot_deltas"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scanner_snapshot_cycle",
+        sa.Column("timeframe", sa.String(), nullable=False),
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("timeframe", "ts"),
+    )
+    # Every cycle stored so far wrote at least one row, so its time is already known.
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            """
+            INSERT INTO scanner_snapshot_cycle (timeframe, ts)
+            SELECT DISTINCT timeframe, ts FROM scanner_snapshot
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scanner_snapshot_cycle")
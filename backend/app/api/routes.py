@@ -39,6 +39,33 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/metrics/pipeline")
+def pipeline_metrics(container: Container = Depends(container_dep)) -> dict:
+    """Seconds from candle close to websocket broadcast, per timeframe."""
+    if container.pipeline_latency is None:
+        return {}
+    return container.pipeline_latency.snapshot()
+
+
+@router.get("/metrics/rate-limit")
+def rate_limit_metrics(container: Container = Depends(container_dep)) -> dict:
+    """Groww rate limiter reservations, waits, adaptive rate factor and circuit breakers."""
+    breaker_states = getattr(container.groww_client, "breaker_states", None)
+    return {
+        "rate_factor": container.rate_limiter.rate_factor,
+        "endpoints": container.rate_limiter.stats(),
+        "breakers": breaker_states() if breaker_states is not None else {},
+    }
+
+
+@router.get("/metrics/ingestion-plan")
+def ingestion_plan_metrics(container: Container = Depends(container_dep)) -> dict:
+    """Projected freshness per fetched timeframe for the current universe under the Groww budget."""
+    if container.ingest_planner is None:
+        return {}
+    return container.ingest_planner.report()
+
+
 @router.get("/scanner", response_model=ScannerResponse)
 def get_scanner(
     timeframe: str = Query("5m"),
@@ -130,6 +157,7 @@ def get_stock_relative_metrics(
         ticker_index_repo=container.ticker_index_repo,
         watch_index_repo=container.watch_index_repo,
         cache=container.redis_cache,
+        universe=container.universe,
     )
     payload = service.get_metrics(symbol, interval, lookback)
     return RelativeMetricsResponse(**_sanitize(payload))
@@ -150,6 +178,7 @@ def get_intraday_plan(
         cache=container.redis_cache,
         live_data=live_data,
         iv_tracker=_iv_tracker,
+        universe=container.universe,
     )
     now = datetime.now(timezone.utc)
     plan, trace = engine.generate_trade_plan(now, symbol.strip().upper())
@@ -239,6 +268,11 @@ def _ensure_default_index(symbols: List[str], default_symbol: str) -> List[str]:
     return symbols
 
 
+def _universe_changed(container: Container) -> None:
+    if container.universe is not None:
+        container.universe.bump()
+
+
 @router.post("/admin/stocks", response_model=WatchStock)
 def create_stock(payload: WatchStockCreate, container: Container = Depends(container_dep)) -> WatchStock:
     symbol = payload.symbol.strip().upper()
@@ -255,6 +289,7 @@ def create_stock(payload: WatchStockCreate, container: Container = Depends(conta
 
     stock = container.watch_stock_repo.create(symbol, payload.name, payload.active)
     container.ticker_index_repo.set_mappings(stock.symbol, requested_indices)
+    _universe_changed(container)
     return WatchStock(
         id=stock.id,
         symbol=stock.symbol,
@@ -305,6 +340,7 @@ def update_stock(
             _ensure_default_index(existing_indices, default_index),
         )
 
+    _universe_changed(container)
     current_indices = container.ticker_index_repo.get_indices_for_stock(new_symbol)
     updated_fields = container.watch_stock_repo.get_fields(stock_id)
     if updated_fields is None:
@@ -328,6 +364,7 @@ def delete_stock(stock_id: int, container: Container = Depends(container_dep)) -
         container.watch_stock_repo.delete(stock_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Stock not found")
+    _universe_changed(container)
     return {"status": "ok"}
 
 
@@ -342,6 +379,7 @@ def create_index(payload: WatchIndexCreate, container: Container = Depends(conta
     symbol = payload.symbol.strip().upper()
     data_symbol = payload.data_symbol.strip().upper() if payload.data_symbol else symbol
     index = container.watch_index_repo.create(symbol, payload.name, payload.active, data_symbol=data_symbol)
+    _universe_changed(container)
     return WatchIndex(
         id=index.id,
         symbol=index.symbol,
@@ -366,6 +404,7 @@ def update_index(
     index = container.watch_index_repo.update(index_id, symbol, payload.name, payload.active, data_symbol)
     if symbol and symbol != old_symbol:
         container.ticker_index_repo.move_index_symbol(old_symbol, symbol)
+    _universe_changed(container)
     return WatchIndex(
         id=index.id,
         symbol=index.symbol,
@@ -381,4 +420,5 @@ def delete_index(index_id: int, container: Container = Depends(container_dep)) -
         container.watch_index_repo.delete(index_id)
     except ValueError:
         raise HTTPException(status_code=404, detail="Index not found")
+    _universe_changed(container)
     return {"status": "ok"}
@@ -24,11 +24,20 @@ class Settings(BaseSettings):
     groww_segment: str = Field("CASH", alias="GROWW_SEGMENT")
 
     ingest_bars: int = Field(220, alias="INGEST_BARS")
+    ingest_overlap_bars: int = Field(2, alias="INGEST_OVERLAP_BARS")
+    ingest_workers: int = Field(8, alias="INGEST_WORKERS")
+    ingest_write_batch: int = Field(50, alias="INGEST_WRITE_BATCH")
     compute_bars: int = Field(200, alias="COMPUTE_BARS")
+    compute_workers: int = Field(0, alias="COMPUTE_WORKERS")
+    compute_parallel_min_symbols: int = Field(100, alias="COMPUTE_PARALLEL_MIN_SYMBOLS")
 
     scheduler_ingest_interval_sec: int = Field(45, alias="SCHEDULER_INGEST_INTERVAL_SEC")
     scheduler_compute_interval_sec: int = Field(60, alias="SCHEDULER_COMPUTE_INTERVAL_SEC")
     scheduler_timeframes: str = Field("5m,15m,1h,1d", alias="SCHEDULER_TIMEFRAMES")
+    ingest_native_timeframes: str = Field("5m", alias="INGEST_NATIVE_TIMEFRAMES")
+    scheduler_mode: str = Field("pipeline", alias="SCHEDULER_MODE")
+    scheduler_bar_close_grace_sec: float = Field(2.0, alias="SCHEDULER_BAR_CLOSE_GRACE_SEC")
+    universe_max_age_sec: int = Field(300, alias="UNIVERSE_MAX_AGE_SEC")
 
     market_tz: str = Field("Asia/Kolkata", alias="MARKET_TZ")
     market_open_time: str = Field("09:15", alias="MARKET_OPEN_TIME")
@@ -42,10 +51,36 @@ class Settings(BaseSettings):
 
     rate_limit_per_sec: int = Field(10, alias="RATE_LIMIT_PER_SEC")
     rate_limit_per_min: int = Field(300, alias="RATE_LIMIT_PER_MIN")
+    rate_limit_endpoints: str = Field("candles:10", alias="RATE_LIMIT_ENDPOINTS")
+    groww_breaker_failures: int = Field(5, alias="GROWW_BREAKER_FAILURES")
+    groww_breaker_cooldown_sec: float = Field(45.0, alias="GROWW_BREAKER_COOLDOWN_SEC")
+
+    candle_partition_months_ahead: int = Field(2, alias="CANDLE_PARTITION_MONTHS_AHEAD")
+    candle_retention: str = Field("", alias="CANDLE_RETENTION")
+    candle_retention_mode: str = Field("archive", alias="CANDLE_RETENTION_MODE")
+
+    snapshot_storage: str = Field("delta", alias="SNAPSHOT_STORAGE")
+    snapshot_delta_epsilon: float = Field(1e-3, alias="SNAPSHOT_DELTA_EPSILON")
+    snapshot_keyframe_every: int = Field(30, alias="SNAPSHOT_KEYFRAME_EVERY")
 
     def timeframes(self) -> List[str]:
         return [t.strip() for t in self.scheduler_timeframes.split(",") if t.strip()]
 
+    def derived_timeframes(self) -> List[str]:
+        """Scheduled timeframes resampled from 5m candles instead of fetched from Groww."""
+        native = {t.strip() for t in self.ingest_native_timeframes.split(",") if t.strip()}
+        if "5m" not in native:
+            return []
+        return [t for t in self.timeframes() if t not in native]
+
+    def ingest_timeframes(self) -> List[str]:
+        """Timeframes fetched from Groww: the native scheduled ones, plus 5m when any are derived."""
+        derived = self.derived_timeframes()
+        timeframes = [t for t in self.timeframes() if t not in derived]
+        if derived and "5m" not in timeframes:
+            timeframes.append("5m")
+        return timeframes
+
     def market_days_list(self) -> List[str]:
         return [d.strip().upper() for d in self.market_days.split(",") if d.strip()]
 
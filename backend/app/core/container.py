@@ -6,6 +6,7 @@ from typing import Optional
 from app.core.config import Settings
 from app.infra.cache.redis_cache import RedisCache
 from app.infra.db.session import Database
+from app.infra.db.partitions import CandlePartitions
 from app.infra.db.repositories import (
     CandleRepository,
     SnapshotRepository,
@@ -17,10 +18,16 @@ from app.infra.db.repositories import (
 from app.infra.groww.client import GrowwClientFactory, GrowwClient
 from app.services.broadcaster import Broadcaster
 from app.services.compute import ComputeService
+from app.services.compute_pool import ComputePool
+from app.services.dirty import DirtyTracker
+from app.services.groww_adaptive import AdaptiveGrowwClient, is_retryable
+from app.services.ingest_planner import IngestPlanner
 from app.services.ingestion import IngestionService
-from app.services.rate_limit import RateLimiter
+from app.services.pipeline_metrics import PipelineLatency
+from app.services.rate_limit import RateLimiter, parse_endpoint_limits
 from app.services.retries import RetryPolicy
 from app.services.scheduler import Scheduler
+from app.services.universe import UniverseCache
 
 
 @dataclass
@@ -41,16 +48,28 @@ class Container:
     ingestion_service: IngestionService
     compute_service: ComputeService
     scheduler: Scheduler
+    compute_pool: Optional[ComputePool] = None
+    dirty_tracker: Optional[DirtyTracker] = None
+    pipeline_latency: Optional[PipelineLatency] = None
+    universe: Optional[UniverseCache] = None
+    ingest_planner: Optional[IngestPlanner] = None
+    candle_partitions: Optional[CandlePartitions] = None
 
     async def start(self) -> None:
         import asyncio
         self.redis_cache.connect()
+        if self.universe is not None:
+            self.universe.start()
         self.broadcaster.set_loop(asyncio.get_running_loop())
         self.watch_index_repo.ensure_defaults(self.settings.benchmark_symbols_list())
         self.scheduler.start()
 
     async def stop(self) -> None:
         await self.scheduler.stop()
+        if self.compute_pool is not None:
+            self.compute_pool.shutdown()
+        if self.universe is not None:
+            self.universe.stop()
         self.redis_cache.close()
         self.db.dispose()
 
@@ -63,7 +82,12 @@ def build_container() -> Container:
     db = Database(settings.database_url)
 
     candle_repo = CandleRepository(db)
-    snapshot_repo = SnapshotRepository(db)
+    snapshot_repo = SnapshotRepository(
+        db,
+        mode=settings.snapshot_storage,
+        epsilon=settings.snapshot_delta_epsilon,
+        keyframe_every=settings.snapshot_keyframe_every,
+    )
     benchmark_repo = BenchmarkRepository(db)
     watch_stock_repo = WatchStockRepository(db)
     watch_index_repo = WatchIndexRepository(db)
@@ -74,10 +98,27 @@ def build_container() -> Container:
         max_per_sec=settings.rate_limit_per_sec,
         max_per_min=settings.rate_limit_per_min,
     )
-    retry_policy = RetryPolicy(max_attempts=4, base_delay=0.5, max_delay=6.0)
-
-    groww_client = GrowwClientFactory(settings).create()
+    for endpoint, max_per_sec in parse_endpoint_limits(settings.rate_limit_endpoints).items():
+        rate_limiter.add_endpoint(endpoint, max_per_sec)
+    retry_policy = RetryPolicy(max_attempts=4, base_delay=0.5, max_delay=6.0, retry_on=is_retryable)
+
+    groww_client = AdaptiveGrowwClient(
+        GrowwClientFactory(settings).create(),
+        rate_limiter,
+        failure_threshold=settings.groww_breaker_failures,
+        cooldown_sec=settings.groww_breaker_cooldown_sec,
+    )
     broadcaster = Broadcaster()
+    dirty_tracker = DirtyTracker()
+    pipeline_latency = PipelineLatency()
+    ingest_planner = IngestPlanner(settings, rate_limiter)
+    universe = UniverseCache(
+        watch_stock_repo,
+        watch_index_repo,
+        ticker_index_repo,
+        redis_cache,
+        max_age_sec=settings.universe_max_age_sec,
+    )
 
     ingestion_service = IngestionService(
         settings=settings,
@@ -89,8 +130,18 @@ def build_container() -> Container:
         watch_stock_repo=watch_stock_repo,
         watch_index_repo=watch_index_repo,
         ticker_index_repo=ticker_index_repo,
+        dirty_tracker=dirty_tracker,
+        universe=universe,
+        planner=ingest_planner,
     )
 
+    compute_pool = None
+    if settings.compute_workers > 1:
+        compute_pool = ComputePool(
+            workers=settings.compute_workers,
+            min_rows=settings.compute_parallel_min_symbols,
+        )
+
     compute_service = ComputeService(
         settings=settings,
         candle_repo=candle_repo,
@@ -101,12 +152,24 @@ def build_container() -> Container:
         watch_stock_repo=watch_stock_repo,
         watch_index_repo=watch_index_repo,
         ticker_index_repo=ticker_index_repo,
+        pool=compute_pool,
+        dirty_tracker=dirty_tracker,
+        latency=pipeline_latency,
+        universe=universe,
     )
 
+    candle_partitions = CandlePartitions(
+        db,
+        months_ahead=settings.candle_partition_months_ahead,
+        retention=settings.candle_retention,
+        mode=settings.candle_retention_mode,
+    )
     scheduler = Scheduler(
         settings=settings,
         ingestion=ingestion_service,
         compute=compute_service,
+        planner=ingest_planner,
+        partitions=candle_partitions,
     )
 
     return Container(
@@ -126,6 +189,12 @@ def build_container() -> Container:
         ingestion_service=ingestion_service,
         compute_service=compute_service,
         scheduler=scheduler,
+        compute_pool=compute_pool,
+        dirty_tracker=dirty_tracker,
+        pipeline_latency=pipeline_latency,
+        universe=universe,
+        ingest_planner=ingest_planner,
+        candle_partitions=candle_partitions,
     )
 
 
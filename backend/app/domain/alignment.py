@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from typing import Dict, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Optional, Sequence, Tuple
 import numpy as np
 
+INDICATOR_COLUMNS: Tuple[str, ...] = ("high", "low", "close", "volume")
+
 
 def align_ohlcv(
     symbol: Dict[str, np.ndarray],
@@ -29,3 +32,116 @@ def align_ohlcv(
     ben_aligned = slice_dict(bench, ben_idx)
 
     return sym_aligned, ben_aligned, common_ts
+
+
+@dataclass(frozen=True)
+class AlignedPanel:
+    """
+    Dense (n_symbols, n_bars) column matrices on one master timestamp grid.
+
+    ``valid[i, j]`` is True when symbol ``i`` has a bar at ``grid[j]``; column values
+    are NaN wherever ``valid`` is False.
+    """
+
+    grid: np.ndarray
+    symbols: Tuple[str, ...]
+    columns: Dict[str, np.ndarray]
+    valid: np.ndarray
+    rows: Dict[str, int] = field(repr=False)
+    full: np.ndarray = field(repr=False)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self.rows
+
+    def pair(
+        self,
+        symbol: str,
+        bench: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]:
+        """
+        Same result as ``align_ohlcv`` on the two original series, restricted to
+        ``columns`` (default: every panel column). Rows covering the whole grid are
+        returned as read-only-by-convention views into the panel.
+        """
+        i, j = self.rows[symbol], self.rows[bench]
+        if self.full[i] and self.full[j]:
+            # Both rows cover the whole grid: hand out views, no copy.
+            mask = slice(None)
+        else:
+            mask = self.valid[i] & self.valid[j]
+        names = self.columns if columns is None else columns
+        sym_aligned = {k: self.columns[k][i, mask] for k in names}
+        ben_aligned = {k: self.columns[k][j, mask] for k in names}
+        return sym_aligned, ben_aligned, self.grid[mask]
+
+
+def master_grid(series_by_symbol: Mapping[str, Mapping[str, np.ndarray]]) -> np.ndarray:
+    """Sorted union of every series' timestamps."""
+    stamps = [np.asarray(data["ts"], dtype="int64") for data in series_by_symbol.values()]
+    if not stamps:
+        return np.empty(0, dtype="int64")
+    return np.unique(np.concatenate(stamps))
+
+
+def align_many(
+    series_by_symbol: Mapping[str, Mapping[str, np.ndarray]],
+    grid: Optional[np.ndarray] = None,
+    columns: Sequence[str] = INDICATOR_COLUMNS,
+) -> AlignedPanel:
+    """
+    Scatter many OHLCV dicts onto one timestamp grid in a single pass.
+
+    ``grid`` defaults to ``master_grid(series_by_symbol)``; bars off the grid are
+    dropped. Only ``columns`` are copied, so unused fields such as ``open`` cost
+    nothing. Any pair can then be aligned with ``AlignedPanel.pair`` (a mask AND)
+    instead of an ``intersect1d`` plus two ``searchsorted`` calls per pair.
+    """
+    grid = master_grid(series_by_symbol) if grid is None else np.asarray(grid, dtype="int64")
+    symbols = tuple(series_by_symbol)
+    shape = (len(symbols), grid.size)
+
+    stamps = [np.asarray(series_by_symbol[symbol]["ts"], dtype="int64") for symbol in symbols]
+    lengths = [ts.size for ts in stamps]
+    all_ts = np.concatenate(stamps) if stamps else np.empty(0, dtype="int64")
+    rows = np.repeat(np.arange(len(symbols)), lengths)
+
+    # align_ohlcv keeps the first bar of a duplicated timestamp; do the same for any
+    # series that is not strictly increasing (rare, so found with one vectorized diff).
+    keep = np.ones(all_ts.size, dtype=bool)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(int)
+    step_back = np.flatnonzero(all_ts[1:] <= all_ts[:-1]) + 1
+    for row in np.unique(rows[step_back[rows[step_back] == rows[step_back - 1]]]):
+        start, stop = offsets[row], offsets[row + 1]
+        keep[start:stop] = False
+        keep[start + np.unique(all_ts[start:stop], return_index=True)[1]] = True
+
+    pos = np.searchsorted(grid, all_ts)
+    if grid.size:
+        on_grid = keep & (grid[np.minimum(pos, grid.size - 1)] == all_ts)
+    else:
+        on_grid = np.zeros(all_ts.size, dtype=bool)
+    flat = rows * grid.size + pos
+    if not on_grid.all():
+        flat = flat[on_grid]
+    else:
+        on_grid = None
+
+    valid = np.zeros(shape, dtype=bool)
+    valid.ravel()[flat] = True
+    matrices = {}
+    for name in columns:
+        matrix = np.full(shape, np.nan)
+        if symbols:
+            values = np.concatenate([np.asarray(series_by_symbol[symbol][name], dtype=float) for symbol in symbols])
+            matrix.ravel()[flat] = values if on_grid is None else values[on_grid]
+        matrices[name] = matrix
+
+    return AlignedPanel(
+        grid=grid,
+        symbols=symbols,
+        columns=matrices,
+        valid=valid,
+        rows={symbol: row for row, symbol in enumerate(symbols)},
+        full=valid.all(axis=1),
+    )
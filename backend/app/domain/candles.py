@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+OHLCV_COLUMNS: Tuple[str, ...] = ("open", "high", "low", "close", "volume")
+CANDLE_COLUMNS: Tuple[str, ...] = ("ts",) + OHLCV_COLUMNS
+
+
+class CandleBatch:
+    """
+    Columnar candles for one (symbol, timeframe): int64 epoch-second ``ts`` plus
+    float64 OHLCV arrays of equal length, sorted by ``ts``.
+
+    This is what the Groww client returns and what repositories, the cache and
+    compute exchange, so the hot path never builds a Python object per bar.
+    Slicing (``batch[i:j]``, ``batch[mask]``) returns a new batch over views where
+    NumPy allows it; treat batches as immutable.
+    """
+
+    __slots__ = ("ts", "open", "high", "low", "close", "volume", "source")
+
+    def __init__(
+        self,
+        ts: Sequence[int],
+        open: Sequence[float],
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        volume: Sequence[float],
+        source: str = "groww",
+    ) -> None:
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self.source = source
+        n = self.ts.shape[0]
+        for name in OHLCV_COLUMNS:
+            if getattr(self, name).shape != (n,):
+                raise ValueError(f"CandleBatch column {name} has shape {getattr(self, name).shape}, expected ({n},)")
+
+    @classmethod
+    def empty(cls, source: str = "groww") -> "CandleBatch":
+        return cls([], [], [], [], [], [], source=source)
+
+    @classmethod
+    def from_payload(cls, payload: Mapping[str, Sequence], source: str = "groww") -> "CandleBatch":
+        """Batch from a column mapping such as the ``candles:*`` cache payload."""
+        return cls(*(payload[name] for name in CANDLE_COLUMNS), source=source)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence], source: str = "groww") -> "CandleBatch":
+        """Batch from ``(ts, open, high, low, close, volume)`` tuples; ``ts`` may be epoch seconds or datetimes."""
+        rows = list(rows)
+        if not rows:
+            return cls.empty(source)
+        ts, open_, high, low, close, volume = zip(*rows)
+        if isinstance(ts[0], datetime):
+            ts = [int(t.timestamp()) for t in ts]
+        return cls(ts, open_, high, low, close, volume, source=source)
+
+    @classmethod
+    def concat(cls, batches: Sequence["CandleBatch"]) -> "CandleBatch":
+        """Batches joined in order; the source of the last non-empty batch wins."""
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        return cls(
+            *(np.concatenate([getattr(b, name) for b in batches]) for name in CANDLE_COLUMNS),
+            source=batches[-1].source,
+        )
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    def __getitem__(self, index) -> "CandleBatch":
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 or None)
+        return CandleBatch(*(getattr(self, name)[index] for name in CANDLE_COLUMNS), source=self.source)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CandleBatch):
+            return NotImplemented
+        return self.source == other.source and all(
+            np.array_equal(getattr(self, name), getattr(other, name)) for name in CANDLE_COLUMNS
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        span = f"{self.ts[0]}..{self.ts[-1]}" if len(self) else "empty"
+        return f"CandleBatch({len(self)} bars, {span}, source={self.source!r})"
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        return int(self.ts[-1]) if len(self) else None
+
+    def before(self, ts: int) -> "CandleBatch":
+        """Bars starting strictly before epoch second ``ts``."""
+        return self[: int(np.searchsorted(self.ts, ts, side="left"))]
+
+    def since(self, ts: int) -> "CandleBatch":
+        """Bars starting at or after epoch second ``ts``."""
+        return self[int(np.searchsorted(self.ts, ts, side="left")) :]
+
+    def tail(self, n: int) -> "CandleBatch":
+        return self[max(0, len(self) - n) :]
+
+    def merge(self, fresh: "CandleBatch", keep: int) -> "CandleBatch":
+        """These bars up to ``fresh``'s first bar, then ``fresh``, keeping the last ``keep``."""
+        if not len(fresh):
+            return self.tail(keep)
+        return CandleBatch.concat([self.before(int(fresh.ts[0])), fresh]).tail(keep)
+
+    def latest(self) -> Dict[str, float]:
+        """The newest bar as plain scalars (``ts`` in epoch seconds)."""
+        return {name: getattr(self, name)[-1].item() for name in CANDLE_COLUMNS}
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """The columns as the ``{"ts": ..., "open": ...}`` mapping compute works on; no copies."""
+        return {name: getattr(self, name) for name in CANDLE_COLUMNS}
+
+    def to_payload(self) -> Dict[str, List]:
+        """JSON-serialisable column lists, the ``candles:*`` cache format."""
+        return {name: getattr(self, name).tolist() for name in CANDLE_COLUMNS}
+
+    def datetimes(self) -> List[datetime]:
+        return [datetime.fromtimestamp(ts, tz=timezone.utc) for ts in self.ts.tolist()]
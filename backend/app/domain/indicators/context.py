@@ -0,0 +1,81 @@
+"""
+Per-cycle cache of ``SeriesContext`` objects.
+
+One compute cycle touches the same symbol several times: as a benchmark state, as the
+benchmark of many symbols, or against both a sector and the market in the intraday
+engine. Contexts are keyed by ``(symbol, timeframe, last_ts)`` plus a digest of the bar
+grid they were built on, so every consumer of the same aligned series shares one set of
+TR/ATR/move/volume arrays. Create a fresh cache per cycle; it never expires entries.
+When built over an ``AlignedPanel``, pairs found in the panel are aligned by mask
+instead of ``align_ohlcv``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.domain.alignment import AlignedPanel, align_ohlcv
+from app.domain.indicators.rrs_rrv_rve import SeriesContext
+
+ContextKey = Tuple[str, str, int, Hashable]
+
+
+class SeriesContextCache:
+    def __init__(self, panel: Optional[AlignedPanel] = None) -> None:
+        self.panel = panel
+        self._contexts: Dict[ContextKey, SeriesContext] = {}
+        self._pairs: Dict[Tuple[ContextKey, ContextKey], Tuple[Optional[SeriesContext], Optional[SeriesContext], np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def context(self, symbol: str, timeframe: str, data: Mapping[str, np.ndarray]) -> SeriesContext:
+        """Context for ``data`` (which must carry ``ts``), built once per key."""
+        key = _key(symbol, timeframe, data["ts"])
+        ctx = self._contexts.get(key)
+        if ctx is None:
+            ctx = SeriesContext.from_ohlcv(data)
+            self._contexts[key] = ctx
+        return ctx
+
+    def align(
+        self,
+        symbol: str,
+        bench_symbol: str,
+        timeframe: str,
+        sym_data: Mapping[str, np.ndarray],
+        bench_data: Mapping[str, np.ndarray],
+    ) -> Tuple[Optional[SeriesContext], Optional[SeriesContext], np.ndarray]:
+        """
+        Align ``sym_data`` to ``bench_data`` once and return contexts on the common grid.
+
+        Both contexts are ``None`` when the series share no timestamps. With a panel,
+        ``symbol``/``bench_symbol`` must name the panel rows built from exactly that data.
+        """
+        pair = (_key(symbol, timeframe, sym_data["ts"]), _key(bench_symbol, timeframe, bench_data["ts"]))
+        cached = self._pairs.get(pair)
+        if cached is not None:
+            return cached
+
+        if self.panel is not None and symbol in self.panel and bench_symbol in self.panel:
+            sym_aligned, ben_aligned, common_ts = self.panel.pair(symbol, bench_symbol)
+        else:
+            sym_aligned, ben_aligned, common_ts = align_ohlcv(sym_data, bench_data)
+        if common_ts.size == 0:
+            result = (None, None, common_ts)
+        else:
+            result = (
+                self.context(symbol, timeframe, {**sym_aligned, "ts": common_ts}),
+                self.context(bench_symbol, timeframe, {**ben_aligned, "ts": common_ts}),
+                common_ts,
+            )
+        self._pairs[pair] = result
+        return result
+
+
+def _key(symbol: str, timeframe: str, ts) -> ContextKey:
+    ts = np.asarray(ts, dtype="int64")
+    last_ts = int(ts[-1]) if ts.size else 0
+    return symbol, timeframe, last_ts, (ts.size, hash(ts.tobytes()))
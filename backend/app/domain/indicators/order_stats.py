@@ -0,0 +1,91 @@
+"""
+Sliding-window order statistics.
+
+``RollingOrderStats`` keeps the last ``window`` values plus a sorted copy of the
+non-NaN ones, so each push costs O(log w) comparisons and memory stays O(w).
+Quantiles use the same linear interpolation as ``np.nanquantile`` and the median
+matches ``np.nanmedian``. ``sorted_quantile`` and ``sorted_median`` also serve the
+blocked ``rolling_floor`` methods, which sort whole windows instead.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Deque, Iterable, List, Sequence
+
+
+class RollingOrderStats:
+    __slots__ = ("window", "_values", "_sorted")
+
+    def __init__(self, window: int, values: Iterable[float] = ()) -> None:
+        if window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        self.window = window
+        self._values: Deque[float] = deque()
+        self._sorted: List[float] = []
+        for value in values:
+            self.push(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def count(self) -> int:
+        """Number of non-NaN values currently in the window."""
+        return len(self._sorted)
+
+    def push(self, value: float) -> None:
+        value = float(value)
+        self._values.append(value)
+        if not math.isnan(value):
+            insort(self._sorted, value)
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if not math.isnan(old):
+                del self._sorted[bisect_left(self._sorted, old)]
+
+    def values(self) -> List[float]:
+        """Window contents in arrival order (NaNs included)."""
+        return list(self._values)
+
+    def quantile(self, q: float) -> float:
+        """Linear-interpolated quantile of the non-NaN values (``np.nanquantile``)."""
+        return sorted_quantile(self._sorted, q)
+
+    def median(self) -> float:
+        """Median of the non-NaN values (``np.nanmedian``)."""
+        return sorted_median(self._sorted)
+
+
+def sorted_quantile(values: Sequence[float], q: float) -> float:
+    """``np.nanquantile`` (linear method) of an already sorted, NaN-free sequence."""
+    n = len(values)
+    if n == 0:
+        return math.nan
+    virtual = (n - 1) * q
+    if virtual >= n - 1:
+        return values[-1]
+    if virtual < 0:
+        return values[0]
+    lo = math.floor(virtual)
+    gamma = virtual - lo
+    a = values[lo]
+    b = values[lo + 1]
+    diff = b - a
+    # Same two-sided lerp as numpy, which interpolates from the nearer endpoint.
+    if gamma >= 0.5:
+        return b - diff * (1 - gamma)
+    return a + diff * gamma
+
+
+def sorted_median(values: Sequence[float]) -> float:
+    """``np.nanmedian`` of an already sorted, NaN-free sequence."""
+    n = len(values)
+    if n == 0:
+        return math.nan
+    mid = n // 2
+    if n % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
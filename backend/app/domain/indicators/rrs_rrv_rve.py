@@ -7,6 +7,9 @@ Enhancements:
 - RMS variance proxy option for RRV/RVE.
 - Optional winsorization of diffs for robustness.
 - Optional percent-ATR normalization for RRS/RVE.
+- Batched ``*_batch`` variants over (n_symbols, n_bars) matrices.
+- Blocked ``rolling_floor`` methods that sort a bounded block of windows at a time.
+- ``SeriesContext`` memoizes TR/ATR/moves/volume transforms so indicators can share them.
 
 Recommended defaults for NIFTY50 (daily):
 - length=20..30, atr_period=14, power_clip=10
@@ -17,10 +20,12 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
 
 import numpy as np
 
+from app.domain.indicators.order_stats import sorted_median, sorted_quantile
+
 # -----------------------------
 # Numerical stability utilities
 # -----------------------------
@@ -52,43 +57,87 @@ def rolling_floor(
     q: float = 0.05,
     frac: float = 0.05,
 ) -> np.ndarray:
+    """
+    Rolling denominator floor along the last axis (1-D series or 2-D rows).
+
+    ``method`` is ``"quantile"`` (rolling ``q`` quantile) or ``"median"`` (rolling median
+    times ``frac``). ``"quantile_blocked"`` / ``"median_blocked"`` give the same values by
+    sorting ``_FLOOR_BLOCK_VALUES`` window elements at a time, so memory stays bounded on
+    long histories and NaN-bearing windows are not handed to NumPy's per-window nan path.
+    ``scripts/bench_rolling_floor.py`` compares the two.
+    """
     s = np.asarray(series, dtype=float)
-    n = s.size
-    if n == 0:
+    if s.size == 0:
         return s
+    n = s.shape[-1]
 
     abs_s = np.abs(s)
 
     # Fallback for short series
     if n < window:
-        base = np.nanmedian(abs_s)
-        if not np.isfinite(base) or base == 0:
-            base = np.nanmean(abs_s)
-        if not np.isfinite(base) or base == 0:
-            base = 1e-6
-        floor_val = base * (frac if method != "quantile" else frac)
-        return np.full_like(s, floor_val, dtype=float)
+        floor_val = _floor_base(abs_s) * (frac if method != "quantile" else frac)
+        return np.broadcast_to(floor_val, s.shape).copy()
+
+    if method in ("quantile_blocked", "median_blocked"):
+        return _rolling_floor_blocked(abs_s, method, window, q, frac)
 
     try:
         from numpy.lib.stride_tricks import sliding_window_view
 
-        windows = sliding_window_view(abs_s, window_shape=window)
+        windows = sliding_window_view(abs_s, window_shape=window, axis=-1)
         if method == "quantile":
             qvals = np.nanquantile(windows, q, axis=-1)
-            pad = np.full(window - 1, qvals[0])
-            return np.concatenate([pad, qvals])
+            pad = np.repeat(qvals[..., :1], window - 1, axis=-1)
+            return np.concatenate([pad, qvals], axis=-1)
         # median fallback
         med = np.nanmedian(windows, axis=-1)
-        pad = np.full(window - 1, med[0] * frac)
-        return np.concatenate([pad, med * frac])
+        pad = np.repeat(med[..., :1] * frac, window - 1, axis=-1)
+        return np.concatenate([pad, med * frac], axis=-1)
     except Exception:
         # conservative fallback
-        base = np.nanmedian(abs_s)
-        if not np.isfinite(base) or base == 0:
-            base = np.nanmean(abs_s)
-        if not np.isfinite(base) or base == 0:
-            base = 1e-6
-        return np.full_like(s, base * frac, dtype=float)
+        return np.broadcast_to(_floor_base(abs_s) * frac, s.shape).copy()
+
+
+# Window elements sorted per pass of the blocked floor (8 MB of float64).
+_FLOOR_BLOCK_VALUES = 1 << 20
+
+
+def _rolling_floor_blocked(abs_s: np.ndarray, method: str, window: int, q: float, frac: float) -> np.ndarray:
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    rows = abs_s.reshape(-1, abs_s.shape[-1])
+    windows = sliding_window_view(rows, window_shape=window, axis=-1)
+    n_windows = windows.shape[1]
+    block = max(1, _FLOOR_BLOCK_VALUES // (rows.shape[0] * window))
+    out = np.empty_like(rows)
+    for start in range(0, n_windows, block):
+        # NaNs sort last, so each window's finite values are a sorted prefix.
+        ordered = np.sort(windows[:, start : start + block], axis=-1)
+        count = np.count_nonzero(~np.isnan(ordered), axis=-1)
+        values = np.empty(count.shape)
+        for finite in np.unique(count):
+            hit = count == finite
+            # Windows with the same number of finite values share the interpolation
+            # indices, so the scalar helpers run over all of them column-wise.
+            columns = np.moveaxis(ordered[hit][:, :finite], -1, 0)
+            if method == "quantile_blocked":
+                values[hit] = sorted_quantile(columns, q)
+            else:
+                values[hit] = sorted_median(columns) * frac
+        out[:, window - 1 + start : window - 1 + start + ordered.shape[1]] = values
+    out[:, : window - 1] = out[:, window - 1 : window]
+    return out.reshape(abs_s.shape)
+
+
+def _floor_base(abs_s: np.ndarray) -> np.ndarray:
+    """Per-row median of ``abs_s``, falling back to the mean and then to 1e-6."""
+    base = np.nanmedian(abs_s, axis=-1, keepdims=True)
+    bad = ~np.isfinite(base) | (base == 0)
+    if bad.any():
+        base = np.where(bad, np.nanmean(abs_s, axis=-1, keepdims=True), base)
+        bad = ~np.isfinite(base) | (base == 0)
+        base = np.where(bad, 1e-6, base)
+    return base
 
 
 def clip_power(power: np.ndarray, pmax: float = 10.0) -> np.ndarray:
@@ -96,7 +145,15 @@ def clip_power(power: np.ndarray, pmax: float = 10.0) -> np.ndarray:
 
 
 def winsorize_diff(diff: np.ndarray, q_low: float = 0.01, q_high: float = 0.99) -> np.ndarray:
+    """Clip ``diff`` to its finite quantiles, row by row for 2-D input."""
     d = np.asarray(diff, dtype=float)
+    if d.ndim > 1:
+        finite = np.isfinite(d)
+        has_finite = finite.any(axis=-1, keepdims=True)
+        # Rows without finite values get dummy bounds and are passed through unchanged.
+        masked = np.where(has_finite, np.where(finite, d, np.nan), 0.0)
+        low, high = np.nanquantile(masked, [q_low, q_high], axis=-1, keepdims=True)
+        return np.where(has_finite, np.clip(d, low, high), d)
     finite = d[np.isfinite(d)]
     if finite.size == 0:
         return d
@@ -109,34 +166,54 @@ def winsorize_diff(diff: np.ndarray, q_low: float = 0.01, q_high: float = 0.99)
 # -----------------------------
 
 def wilders_rma(x: np.ndarray, length: int) -> np.ndarray:
-    """Wilder's RMA (ta.rma)."""
-    out = np.empty_like(x, dtype=float)
+    """
+    Wilder's RMA (ta.rma), smoothing along the last axis.
+
+    Solves ``y[i] = (1 - a) * y[i - 1] + a * x[i]`` with ``y[0] = x[0]`` and ``a = 1/length``
+    as a log-step prefix scan: pass ``k`` folds in the term ``2**k`` bars back, so only
+    ``ceil(log2(n))`` vectorized passes run. Every weight is a power of ``1 - a`` <= 1,
+    which keeps the result within a few ulps of the sequential recurrence.
+    """
+    x = np.asarray(x, dtype=float)
     alpha = 1.0 / length
-    out[0] = x[0]
-    for i in range(1, len(x)):
-        out[i] = out[i - 1] + alpha * (x[i] - out[i - 1])
+    out = alpha * x
+    out[..., 0] = x[..., 0]
+    decay = 1.0 - alpha
+    step = 1
+    while step < x.shape[-1]:
+        out[..., step:] += decay * out[..., :-step]
+        decay *= decay
+        step *= 2
     return out
 
 
 def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
-    prev_close = np.roll(close, 1)
-    prev_close[0] = close[0]
+    prev_close = np.roll(close, 1, axis=-1)
+    prev_close[..., 0] = close[..., 0]
     tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
     return tr
 
 
 def rolling_move(x: np.ndarray, length: int) -> np.ndarray:
     out = np.full_like(x, np.nan, dtype=float)
-    out[length:] = x[length:] - x[:-length]
+    out[..., length:] = x[..., length:] - x[..., :-length]
     return out
 
 
 def rolling_log_return(x: np.ndarray, length: int) -> np.ndarray:
     out = np.full_like(x, np.nan, dtype=float)
-    out[length:] = np.log(x[length:] / x[:-length])
+    out[..., length:] = np.log(x[..., length:] / x[..., :-length])
     return out
 
 
+def _sma(x: np.ndarray, n: int) -> np.ndarray:
+    """Centered SMA (``np.convolve(mode="same")``) along the last axis."""
+    w = np.ones(n) / n
+    if x.ndim == 1:
+        return np.convolve(x, w, mode="same")
+    return np.apply_along_axis(np.convolve, -1, x, w, mode="same")
+
+
 def _align_arrays(*arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
     min_len = min(arr.size for arr in arrays)
     return tuple(np.asarray(arr, dtype=float)[:min_len] for arr in arrays)
@@ -149,7 +226,7 @@ def _variance_proxy(
     winsorize: bool,
     winsor_q: Tuple[float, float],
 ) -> np.ndarray:
-    diff = np.diff(series, prepend=series[0])
+    diff = np.diff(series, axis=-1, prepend=series[..., :1])
     if winsorize:
         diff = winsorize_diff(diff, q_low=winsor_q[0], q_high=winsor_q[1])
     if var_mode == "abs":
@@ -159,6 +236,73 @@ def _variance_proxy(
     raise ValueError(f"Unsupported var_mode: {var_mode}")
 
 
+# -----------------------------
+# Shared per-series intermediates
+# -----------------------------
+
+class SeriesContext:
+    """
+    One instrument's aligned OHLCV arrays plus memoized intermediates.
+
+    Arrays are 1-D series or (n_symbols, n_bars) matrices. True range, Wilder ATR per
+    period, rolling moves and volume transforms are computed on first use and then
+    shared by every indicator that receives the same context. Cached arrays are
+    read-only; callers must not modify them in place.
+    """
+
+    __slots__ = ("high", "low", "close", "volume", "_memo")
+
+    def __init__(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+    ) -> None:
+        high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+        if close.ndim == 1:
+            high, low, close = _align_arrays(high, low, close)
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = None if volume is None else np.asarray(volume, dtype=float)
+        self._memo: Dict[Hashable, np.ndarray] = {}
+
+    @classmethod
+    def from_ohlcv(cls, data: Mapping[str, Any]) -> "SeriesContext":
+        return cls(data["high"], data["low"], data["close"], data.get("volume"))
+
+    @classmethod
+    def coerce(cls, data) -> "SeriesContext":
+        """Return ``data`` if it already is a context, else wrap the OHLCV mapping."""
+        return data if isinstance(data, cls) else cls.from_ohlcv(data)
+
+    def memo(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        value = self._memo.get(key)
+        if value is None:
+            value = compute()
+            value.flags.writeable = False
+            self._memo[key] = value
+        return value
+
+    def true_range(self) -> np.ndarray:
+        return self.memo(("tr",), lambda: true_range(self.high, self.low, self.close))
+
+    def atr(self, period: int) -> np.ndarray:
+        return self.memo(("atr", period), lambda: wilders_rma(self.true_range(), period))
+
+    def move(self, length: int, log: bool = False) -> np.ndarray:
+        """Rolling close move (log return when ``log``)."""
+        if log:
+            return self.memo(("log_move", length), lambda: rolling_log_return(self.close, length))
+        return self.memo(("move", length), lambda: rolling_move(self.close, length))
+
+    def volume_series(self, smooth: int, use_log: bool) -> np.ndarray:
+        if self.volume is None:
+            raise ValueError("SeriesContext has no volume")
+        return self.memo(("volume", smooth, use_log), lambda: _volume_series(self.volume, smooth, use_log))
+
+
 def rrs(
     symbol_ohlc,
     bench_ohlc,
@@ -171,18 +315,37 @@ def rrs(
     floor_q: float = 0.05,
     floor_frac: float = 0.05,
 ) -> np.ndarray:
-    sh, sl, sc = _align_arrays(symbol_ohlc["high"], symbol_ohlc["low"], symbol_ohlc["close"])
-    bh, bl, bc = _align_arrays(bench_ohlc["high"], bench_ohlc["low"], bench_ohlc["close"])
+    """
+    Real Relative Strength of ``symbol_ohlc`` vs ``bench_ohlc``.
 
-    if use_pct_atr:
-        sym_move = rolling_log_return(sc, length)
-        ben_move = rolling_log_return(bc, length)
-    else:
-        sym_move = rolling_move(sc, length)
-        ben_move = rolling_move(bc, length)
+    Either argument may be an OHLC mapping or a ``SeriesContext`` whose cached
+    moves and ATR are reused.
+    """
+    return _rrs_core(
+        SeriesContext.coerce(symbol_ohlc), SeriesContext.coerce(bench_ohlc), length,
+        use_pct_atr=use_pct_atr, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
 
-    sym_atr = wilders_rma(true_range(sh, sl, sc), length)
-    ben_atr = wilders_rma(true_range(bh, bl, bc), length)
+
+def _rrs_core(
+    sym: SeriesContext,
+    ben: SeriesContext,
+    length: int,
+    *,
+    use_pct_atr: bool,
+    pmax: float,
+    floor_window: int,
+    floor_method: str,
+    floor_q: float,
+    floor_frac: float,
+) -> np.ndarray:
+    sc, bc = sym.close, ben.close
+    sym_move = sym.move(length, log=use_pct_atr)
+    ben_move = ben.move(length, log=use_pct_atr)
+
+    sym_atr = sym.atr(length)
+    ben_atr = ben.atr(length)
 
     if use_pct_atr:
         sym_atr = safe_div(sym_atr, sc, rolling_floor(sc, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac))
@@ -214,26 +377,56 @@ def rrv(
     floor_q: float = 0.05,
     floor_frac: float = 0.05,
 ) -> np.ndarray:
-    def sma(x, n):
-        if n <= 1:
-            return x.astype(float)
-        w = np.ones(n) / n
-        return np.convolve(x, w, mode="same")
+    """
+    Real Relative Volume. Either volume argument may be a ``SeriesContext`` whose
+    cached smoothed/log volume is reused.
+    """
+    v_sym = _context_volume(symbol_vol, smooth, use_log)
+    v_ben = _context_volume(bench_vol, smooth, use_log)
+
+    v_sym, v_ben = _align_arrays(v_sym, v_ben)
+    return _relative_move_core(
+        v_sym, v_ben, length,
+        var_mode=var_mode, winsorize=winsorize, winsor_q=winsor_q, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
 
-    v_sym = sma(symbol_vol.astype(float), smooth)
-    v_ben = sma(bench_vol.astype(float), smooth)
 
+def _context_volume(vol, smooth: int, use_log: bool) -> np.ndarray:
+    if isinstance(vol, SeriesContext):
+        return vol.volume_series(smooth, use_log)
+    return _volume_series(vol, smooth, use_log)
+
+
+def _volume_series(vol: np.ndarray, smooth: int, use_log: bool) -> np.ndarray:
+    v = np.asarray(vol).astype(float)
+    if smooth > 1:
+        v = _sma(v, smooth)
     if use_log:
-        v_sym = np.log(np.maximum(v_sym, 1.0))
-        v_ben = np.log(np.maximum(v_ben, 1.0))
+        v = np.log(np.maximum(v, 1.0))
+    return v
 
-    v_sym, v_ben = _align_arrays(v_sym, v_ben)
 
-    sym_move = rolling_move(v_sym, length)
-    ben_move = rolling_move(v_ben, length)
+def _relative_move_core(
+    sym_series: np.ndarray,
+    ben_series: np.ndarray,
+    length: int,
+    *,
+    var_mode: str,
+    winsorize: bool,
+    winsor_q: Tuple[float, float],
+    pmax: float,
+    floor_window: int,
+    floor_method: str,
+    floor_q: float,
+    floor_frac: float,
+) -> np.ndarray:
+    """Shared RRV/RVE tail: benchmark-implied move vs. actual, in variance-proxy units."""
+    sym_move = rolling_move(sym_series, length)
+    ben_move = rolling_move(ben_series, length)
 
-    sym_var = _variance_proxy(v_sym, length, var_mode, winsorize, winsor_q)
-    ben_var = _variance_proxy(v_ben, length, var_mode, winsorize, winsor_q)
+    sym_var = _variance_proxy(sym_series, length, var_mode, winsorize, winsor_q)
+    ben_var = _variance_proxy(ben_series, length, var_mode, winsorize, winsor_q)
 
     ben_floor = rolling_floor(ben_var, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac)
     sym_floor = rolling_floor(sym_var, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac)
@@ -262,19 +455,42 @@ def rve(
     floor_q: float = 0.05,
     floor_frac: float = 0.05,
 ) -> np.ndarray:
-    sh, sl, sc = _align_arrays(symbol_ohlc["high"], symbol_ohlc["low"], symbol_ohlc["close"])
-    bh, bl, bc = _align_arrays(bench_ohlc["high"], bench_ohlc["low"], bench_ohlc["close"])
+    """
+    Real Relative Volatility Expansion. Either argument may be an OHLC mapping or a
+    ``SeriesContext`` whose cached ATR is reused.
+    """
+    return _rve_core(
+        SeriesContext.coerce(symbol_ohlc), SeriesContext.coerce(bench_ohlc), length, atr_period, smooth_atr,
+        use_pct_atr=use_pct_atr, var_mode=var_mode, winsorize=winsorize, winsor_q=winsor_q, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
 
-    sym_atr_raw = wilders_rma(true_range(sh, sl, sc), atr_period)
-    ben_atr_raw = wilders_rma(true_range(bh, bl, bc), atr_period)
+
+def _rve_core(
+    sym: SeriesContext,
+    ben: SeriesContext,
+    length: int,
+    atr_period: int,
+    smooth_atr: int,
+    *,
+    use_pct_atr: bool,
+    var_mode: str,
+    winsorize: bool,
+    winsor_q: Tuple[float, float],
+    pmax: float,
+    floor_window: int,
+    floor_method: str,
+    floor_q: float,
+    floor_frac: float,
+) -> np.ndarray:
+    sc, bc = sym.close, ben.close
+    sym_atr_raw = sym.atr(atr_period)
+    ben_atr_raw = ben.atr(atr_period)
 
     # optional smoothing
     if smooth_atr > 1:
-        def sma(x, n):
-            w = np.ones(n) / n
-            return np.convolve(x, w, mode="same")
-        sym_atr = sma(sym_atr_raw, smooth_atr)
-        ben_atr = sma(ben_atr_raw, smooth_atr)
+        sym_atr = _sma(sym_atr_raw, smooth_atr)
+        ben_atr = _sma(ben_atr_raw, smooth_atr)
     else:
         sym_atr, ben_atr = sym_atr_raw, ben_atr_raw
 
@@ -282,21 +498,138 @@ def rve(
         sym_atr = safe_div(sym_atr, sc, rolling_floor(sc, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac))
         ben_atr = safe_div(ben_atr, bc, rolling_floor(bc, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac))
 
-    sym_move = rolling_move(sym_atr, length)
-    ben_move = rolling_move(ben_atr, length)
+    return _relative_move_core(
+        sym_atr, ben_atr, length,
+        var_mode=var_mode, winsorize=winsorize, winsor_q=winsor_q, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
 
-    sym_var = _variance_proxy(sym_atr, length, var_mode, winsorize, winsor_q)
-    ben_var = _variance_proxy(ben_atr, length, var_mode, winsorize, winsor_q)
+# -----------------------------
+# Batched kernels (n_symbols x n_bars)
+# -----------------------------
 
-    ben_floor = rolling_floor(ben_var, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac)
-    sym_floor = rolling_floor(sym_var, window=floor_window, method=floor_method, q=floor_q, frac=floor_frac)
+def _batch_arrays(*arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+    out = tuple(np.asarray(arr, dtype=float) for arr in arrays)
+    for arr in out:
+        if arr.ndim != 2:
+            raise ValueError(f"Expected a (n_symbols, n_bars) matrix, got shape {arr.shape}")
+        if arr.shape != out[0].shape:
+            raise ValueError(f"Mismatched symbol matrix shapes: {arr.shape} vs {out[0].shape}")
+    return out
 
-    power = clip_power(safe_div(ben_move, ben_var, ben_floor), pmax=pmax)
-    expected = power * sym_var
-    diff = sym_move - expected
-    out = safe_div(diff, sym_var, sym_floor)
+
+def _bench_arrays(n_symbols: int, n_bars: int, *arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+    out = tuple(np.asarray(arr, dtype=float) for arr in arrays)
+    for arr in out:
+        if arr.shape not in ((n_bars,), (n_symbols, n_bars)):
+            raise ValueError(
+                f"Benchmark must be a ({n_bars},) row or a ({n_symbols}, {n_bars}) matrix, got shape {arr.shape}"
+            )
     return out
 
+
+def _batch_context(symbol_ohlc) -> SeriesContext:
+    if isinstance(symbol_ohlc, SeriesContext):
+        _batch_arrays(symbol_ohlc.high, symbol_ohlc.low, symbol_ohlc.close)
+        return symbol_ohlc
+    sh, sl, sc = _batch_arrays(symbol_ohlc["high"], symbol_ohlc["low"], symbol_ohlc["close"])
+    return SeriesContext(sh, sl, sc, symbol_ohlc.get("volume"))
+
+
+def _bench_context(n_symbols: int, n_bars: int, bench_ohlc) -> SeriesContext:
+    if isinstance(bench_ohlc, SeriesContext):
+        _bench_arrays(n_symbols, n_bars, bench_ohlc.high, bench_ohlc.low, bench_ohlc.close)
+        return bench_ohlc
+    bh, bl, bc = _bench_arrays(n_symbols, n_bars, bench_ohlc["high"], bench_ohlc["low"], bench_ohlc["close"])
+    return SeriesContext(bh, bl, bc, bench_ohlc.get("volume"))
+
+
+def rrs_batch(
+    symbol_ohlc,
+    bench_ohlc,
+    length: int,
+    *,
+    use_pct_atr: bool = False,
+    pmax: float = 10.0,
+    floor_window: int = 252,
+    floor_method: str = "quantile",
+    floor_q: float = 0.05,
+    floor_frac: float = 0.05,
+) -> np.ndarray:
+    """
+    RRS for a whole universe in one pass.
+
+    ``symbol_ohlc`` holds (n_symbols, n_bars) matrices; ``bench_ohlc`` holds either a
+    single (n_bars,) row shared by every symbol or per-symbol matrices. Row ``i`` of the
+    result equals ``rrs`` on row ``i`` of the inputs. Either side may also be a
+    ``SeriesContext`` of the same shape, so RRS and RVE can share one ATR pass.
+    """
+    sym = _batch_context(symbol_ohlc)
+    ben = _bench_context(*sym.close.shape, bench_ohlc)
+    return _rrs_core(
+        sym, ben, length,
+        use_pct_atr=use_pct_atr, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
+
+
+def rrv_batch(
+    symbol_vol: np.ndarray,
+    bench_vol: np.ndarray,
+    length: int,
+    smooth: int = 3,
+    use_log: bool = True,
+    *,
+    var_mode: str = "rms",
+    winsorize: bool = True,
+    winsor_q: Tuple[float, float] = (0.01, 0.99),
+    pmax: float = 10.0,
+    floor_window: int = 252,
+    floor_method: str = "quantile",
+    floor_q: float = 0.05,
+    floor_frac: float = 0.05,
+) -> np.ndarray:
+    """
+    RRV for a (n_symbols, n_bars) volume matrix against a benchmark row or matrix.
+    Either side may be a ``SeriesContext`` carrying volume.
+    """
+    (v_sym,) = _batch_arrays(_context_volume(symbol_vol, smooth, use_log))
+    (v_ben,) = _bench_arrays(*v_sym.shape, _context_volume(bench_vol, smooth, use_log))
+    return _relative_move_core(
+        v_sym,
+        v_ben,
+        length,
+        var_mode=var_mode, winsorize=winsorize, winsor_q=winsor_q, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
+
+
+def rve_batch(
+    symbol_ohlc,
+    bench_ohlc,
+    length: int,
+    atr_period: int = 14,
+    smooth_atr: int = 1,
+    *,
+    use_pct_atr: bool = False,
+    var_mode: str = "rms",
+    winsorize: bool = True,
+    winsor_q: Tuple[float, float] = (0.01, 0.99),
+    pmax: float = 10.0,
+    floor_window: int = 252,
+    floor_method: str = "quantile",
+    floor_q: float = 0.05,
+    floor_frac: float = 0.05,
+) -> np.ndarray:
+    """RVE for (n_symbols, n_bars) OHLC matrices against a benchmark row or matrix."""
+    sym = _batch_context(symbol_ohlc)
+    ben = _bench_context(*sym.close.shape, bench_ohlc)
+    return _rve_core(
+        sym, ben, length, atr_period, smooth_atr,
+        use_pct_atr=use_pct_atr, var_mode=var_mode, winsorize=winsorize, winsor_q=winsor_q, pmax=pmax,
+        floor_window=floor_window, floor_method=floor_method, floor_q=floor_q, floor_frac=floor_frac,
+    )
+
 # -----------------------------
 # Signals
 # -----------------------------
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass, replace
 from datetime import datetime, time
-from typing import Dict, List, Optional
+from typing import List, Optional
 
 from app.config.strategy import IntradayStrategyConfig
 from app.core.config import Settings
-from app.domain.alignment import align_ohlcv
-from app.domain.indicators.rrs_rrv_rve import rrs, rrv, rve
+from app.domain.alignment import align_many
+from app.domain.indicators.context import SeriesContextCache
+from app.domain.indicators.rrs_rrv_rve import SeriesContext, rrs, rrv, rve
 from app.domain.options.groww_chain_adapter import normalize_chain, compute_atm_iv
 from app.domain.options.iv_tracker import IvTracker
 from app.domain.strategy.contract_selector import (
@@ -21,6 +22,7 @@ from app.infra.cache.redis_cache import RedisCache
 from app.infra.db.repositories import CandleRepository, TickerIndexRepository, WatchIndexRepository
 from app.services.candles_repo import CandlesRepo
 from app.services.groww_live_data import GrowwLiveDataService
+from app.services.universe import UniverseCache
 
 
 @dataclass
@@ -43,6 +45,7 @@ class IntradayOptionsEngine:
         live_data: GrowwLiveDataService,
         iv_tracker: IvTracker,
         config: IntradayStrategyConfig | None = None,
+        universe: UniverseCache | None = None,
     ) -> None:
         self.settings = settings
         self.candle_repo = candle_repo
@@ -53,6 +56,7 @@ class IntradayOptionsEngine:
         self.live_data = live_data
         self.iv_tracker = iv_tracker
         self.config = config or IntradayStrategyConfig()
+        self.universe = universe
 
     def generate_trade_plans(self, now: datetime, symbols: List[str]) -> List[TradePlan]:
         plans: List[TradePlan] = []
@@ -147,7 +151,10 @@ class IntradayOptionsEngine:
         market = self.settings.nifty_symbol
 
         data_symbols = {symbol, sector, market}
-        mapping = self.watch_index_repo.get_active_mappings()
+        if self.universe is not None:
+            mapping = self.universe.get().index_map
+        else:
+            mapping = self.watch_index_repo.get_active_mappings()
         mapped = {s: mapping.get(s, s) for s in data_symbols}
 
         candles = self.candles_repo.get_candles(sorted(mapped.values()), self.config.timeframe, self.config.lookback)
@@ -157,11 +164,18 @@ class IntradayOptionsEngine:
         if sym_data is None or sec_data is None or mkt_data is None:
             return None
 
-        rrs_mkt = _compute_rrs(sym_data, mkt_data)
-        rrs_sec = _compute_rrs(sym_data, sec_data)
-        rrs_sector_vs_mkt = _compute_rrs(sec_data, mkt_data)
-        rrv_val = _compute_rrv(sym_data, mkt_data)
-        rve_val = _compute_rve(sym_data, mkt_data)
+        # One master grid for all three series; the symbol's TR/ATR/volume are shared.
+        contexts = SeriesContextCache(align_many(candles))
+        timeframe = self.config.timeframe
+        sym_mkt = contexts.align(mapped[symbol], mapped[market], timeframe, sym_data, mkt_data)
+        sym_sec = contexts.align(mapped[symbol], mapped[sector], timeframe, sym_data, sec_data)
+        sec_mkt = contexts.align(mapped[sector], mapped[market], timeframe, sec_data, mkt_data)
+
+        rrs_mkt = _compute_rrs(*sym_mkt)
+        rrs_sec = _compute_rrs(*sym_sec)
+        rrs_sector_vs_mkt = _compute_rrs(*sec_mkt)
+        rrv_val = _compute_rrv(*sym_mkt)
+        rve_val = _compute_rve(*sym_mkt)
 
         if None in (rrs_mkt, rrs_sec, rrs_sector_vs_mkt, rrv_val, rve_val):
             return None
@@ -246,7 +260,10 @@ class IntradayOptionsEngine:
         }
 
     def _sector_index(self, symbol: str) -> str:
-        indices = self.ticker_index_repo.get_indices_for_stock(symbol)
+        if self.universe is not None:
+            indices = self.universe.get().indices_for_stock(symbol)
+        else:
+            indices = self.ticker_index_repo.get_indices_for_stock(symbol)
         default = self.settings.nifty_symbol
         for idx in indices:
             if idx != default:
@@ -280,31 +297,24 @@ class IntradayOptionsEngine:
         return raw_chain, expiry_date
 
 
-def _compute_rrs(sym: Dict[str, np.ndarray], bench: Dict[str, np.ndarray]) -> Optional[float]:
-    sym_aligned, ben_aligned, common_ts = align_ohlcv(sym, bench)
+def _compute_rrs(sym: Optional[SeriesContext], bench: Optional[SeriesContext], common_ts: np.ndarray) -> Optional[float]:
     if common_ts.size < 30:
         return None
-    sym_ohlc = {k: sym_aligned[k] for k in ["high", "low", "close"]}
-    ben_ohlc = {k: ben_aligned[k] for k in ["high", "low", "close"]}
-    series = rrs(sym_ohlc, ben_ohlc, length=12)
+    series = rrs(sym, bench, length=12)
     return float(series[-1])
 
 
-def _compute_rrv(sym: Dict[str, np.ndarray], bench: Dict[str, np.ndarray]) -> Optional[float]:
-    sym_aligned, ben_aligned, common_ts = align_ohlcv(sym, bench)
+def _compute_rrv(sym: Optional[SeriesContext], bench: Optional[SeriesContext], common_ts: np.ndarray) -> Optional[float]:
     if common_ts.size < 30:
         return None
-    series = rrv(sym_aligned["volume"], ben_aligned["volume"], length=12, use_log=True)
+    series = rrv(sym, bench, length=12, use_log=True)
     return float(series[-1])
 
 
-def _compute_rve(sym: Dict[str, np.ndarray], bench: Dict[str, np.ndarray]) -> Optional[float]:
-    sym_aligned, ben_aligned, common_ts = align_ohlcv(sym, bench)
+def _compute_rve(sym: Optional[SeriesContext], bench: Optional[SeriesContext], common_ts: np.ndarray) -> Optional[float]:
     if common_ts.size < 30:
         return None
-    sym_ohlc = {k: sym_aligned[k] for k in ["high", "low", "close"]}
-    ben_ohlc = {k: ben_aligned[k] for k in ["high", "low", "close"]}
-    series = rve(sym_ohlc, ben_ohlc, length=12, atr_period=14, smooth_atr=1)
+    series = rve(sym, bench, length=12, atr_period=14, smooth_atr=1)
     return float(series[-1])
 
 
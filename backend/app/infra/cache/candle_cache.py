@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple
+
+from app.domain.candles import CandleBatch
+from app.infra.cache.candle_codec import decode_records, encode_records
+from app.infra.cache.redis_cache import RedisCache
+
+
+class CandleCache:
+    """
+    Candle windows in Redis, one sorted set per (symbol, timeframe) at
+    ``bars:{symbol}:{timeframe}``, scored by bar ``ts`` with fixed-width binary
+    records as members.
+
+    Writes usually carry only the bars that changed: everything from the first
+    written bar onwards is replaced, and the set is trimmed to ``depth`` bars. Readers take the
+    latest N bars of any number of symbols in one round trip. A missing key reads as
+    ``None`` so callers can fall back to the database.
+    """
+
+    def __init__(self, cache: RedisCache, depth: int) -> None:
+        self.cache = cache
+        self.depth = depth
+
+    @staticmethod
+    def key(symbol: str, timeframe: str) -> str:
+        return f"bars:{symbol}:{timeframe}"
+
+    def get(self, symbol: str, timeframe: str, count: Optional[int] = None) -> Optional[CandleBatch]:
+        return self.get_many([symbol], timeframe, count)[0]
+
+    def get_many(self, symbols: List[str], timeframe: str, count: Optional[int] = None) -> List[Optional[CandleBatch]]:
+        """Latest ``count`` (default ``depth``) bars per symbol, oldest first."""
+        keys = [self.key(symbol, timeframe) for symbol in symbols]
+        tails = self.cache.zset_tail_many(keys, count or self.depth)
+        return [decode_records(members) if members else None for members in tails]
+
+    def write_many(self, updates: Iterable[Tuple[str, str, CandleBatch, bool]]) -> None:
+        """
+        Apply ``(symbol, timeframe, candles, replace)`` updates in one transaction: the
+        window is rewritten from the first of ``candles`` onwards, or entirely when
+        ``replace`` is set.
+        """
+        payload = {
+            self.key(symbol, timeframe): (float("-inf") if replace else float(candles.ts[0]), encode_records(candles))
+            for symbol, timeframe, candles, replace in updates
+            if len(candles)
+        }
+        self.cache.zset_replace_tail_many(payload, self.depth)
@@ -0,0 +1,103 @@
+"""
+Binary encoding for cached candle windows (``candles:{symbol}:{timeframe}:{limit}``).
+
+Layout, all little-endian::
+
+    magic  b"CNDL"   4 bytes
+    version          uint8   (FORMAT_VERSION)
+    reserved         uint8
+    source length    uint16
+    bar count n      uint32
+    reserved         uint32
+    source           utf-8, zero-padded to a multiple of 8 bytes
+    ts               int64[n]   epoch seconds
+    open/high/low/close/volume   float64[n] each
+
+Columns start on 8-byte boundaries, so ``decode_candles`` returns arrays that are
+``np.frombuffer`` views of the cached bytes (read-only, no copy). Values written
+as JSON by older versions still decode.
+
+Sorted-set windows (``CandleCache``) store one fixed-width record per bar instead:
+``ts`` int64 then open/high/low/close/volume float64, little-endian, 48 bytes.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.domain.candles import CANDLE_COLUMNS, CandleBatch, OHLCV_COLUMNS
+
+MAGIC = b"CNDL"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sBBHII")
+_TS = np.dtype("<i8")
+_F64 = np.dtype("<f8")
+RECORD_DTYPE = np.dtype([("ts", _TS)] + [(name, _F64) for name in OHLCV_COLUMNS])
+
+
+def encode_candles(batch: CandleBatch) -> bytes:
+    source = batch.source.encode("utf-8")
+    padded = -(-len(source) // 8) * 8
+    parts = [
+        _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(source), len(batch), 0),
+        source.ljust(padded, b"\0"),
+        batch.ts.astype(_TS, copy=False).tobytes(),
+    ]
+    parts.extend(getattr(batch, name).astype(_F64, copy=False).tobytes() for name in OHLCV_COLUMNS)
+    return b"".join(parts)
+
+
+def decode_candles(data: bytes | bytearray | memoryview | str) -> CandleBatch:
+    """Batch from ``encode_candles`` output, or from a legacy JSON column payload."""
+    if is_legacy(data):
+        return CandleBatch.from_payload(json.loads(data))
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Candle payload too short: {len(data)} bytes")
+    magic, version, _, source_len, n, _ = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"Not a candle payload (magic {magic!r})")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported candle payload version {version}")
+
+    offset = _HEADER.size + -(-source_len // 8) * 8
+    expected = offset + n * 8 * (1 + len(OHLCV_COLUMNS))
+    if len(data) != expected:
+        raise ValueError(f"Candle payload is {len(data)} bytes, expected {expected} for {n} bars")
+    source = bytes(data[_HEADER.size : _HEADER.size + source_len]).decode("utf-8")
+
+    ts = np.frombuffer(data, dtype=_TS, count=n, offset=offset)
+    columns = [
+        np.frombuffer(data, dtype=_F64, count=n, offset=offset + 8 * n * (i + 1)) for i in range(len(OHLCV_COLUMNS))
+    ]
+    return CandleBatch(ts, *columns, source=source)
+
+
+def is_legacy(data: bytes | str) -> bool:
+    """True for values still in the pre-binary JSON format."""
+    return isinstance(data, str) or data[:1] == b"{"
+
+
+def decode_many(values: List[Optional[bytes]]) -> List[Optional[CandleBatch]]:
+    """``decode_candles`` over an MGET result, keeping misses as ``None``."""
+    return [None if value is None else decode_candles(value) for value in values]
+
+
+def encode_records(batch: CandleBatch) -> Dict[bytes, float]:
+    """One fixed-width record per bar, as sorted-set members scored by ``ts``."""
+    records = np.empty(len(batch), dtype=RECORD_DTYPE)
+    for name in CANDLE_COLUMNS:
+        records[name] = getattr(batch, name)
+    data = records.tobytes()
+    size = RECORD_DTYPE.itemsize
+    return {data[i * size : (i + 1) * size]: float(ts) for i, ts in enumerate(batch.ts.tolist())}
+
+
+def decode_records(members: List[bytes], source: str = "cache") -> CandleBatch:
+    """Batch from records in ``ts`` order; columns are strided views of one joined buffer."""
+    records = np.frombuffer(b"".join(members), dtype=RECORD_DTYPE)
+    return CandleBatch(*(records[name] for name in CANDLE_COLUMNS), source=source)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import redis
 
@@ -10,15 +10,22 @@ class RedisCache:
     def __init__(self, url: str) -> None:
         self.url = url
         self.client: Optional[redis.Redis] = None
+        # Same server, but values come back as bytes; used by the *_bytes methods.
+        self.bytes_client: Optional[redis.Redis] = None
 
     def connect(self) -> None:
         if self.client is None:
             self.client = redis.Redis.from_url(self.url, decode_responses=True)
+        if self.bytes_client is None:
+            self.bytes_client = redis.Redis.from_url(self.url, decode_responses=False)
 
     def close(self) -> None:
         if self.client is not None:
             self.client.close()
             self.client = None
+        if self.bytes_client is not None:
+            self.bytes_client.close()
+            self.bytes_client = None
 
     def get_json(self, key: str) -> Optional[dict]:
         if self.client is None:
@@ -28,6 +35,12 @@ class RedisCache:
             return None
         return json.loads(value)
 
+    def get_json_many(self, keys: List[str]) -> List[Optional[dict]]:
+        """Values for ``keys`` in order (``None`` for misses), in one MGET round trip."""
+        if self.client is None or not keys:
+            return [None] * len(keys)
+        return [None if value is None else json.loads(value) for value in self.client.mget(keys)]
+
     def set_json(self, key: str, value: Any, ttl: int | None = None) -> None:
         if self.client is None:
             return
@@ -37,15 +50,92 @@ class RedisCache:
         else:
             self.client.setex(key, ttl, payload)
 
+    def set_json_many(self, values: Dict[str, Any]) -> None:
+        """Write every key in one pipelined round trip."""
+        if self.client is None or not values:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, json.dumps(value, default=str))
+        pipe.execute()
+
     def set_bytes(self, key: str, value: bytes, ttl: int | None = None) -> None:
-        if self.client is None:
+        if self.bytes_client is None:
             return
         if ttl is None:
-            self.client.set(key, value)
+            self.bytes_client.set(key, value)
         else:
-            self.client.setex(key, ttl, value)
+            self.bytes_client.setex(key, ttl, value)
+
+    def set_bytes_many(self, values: Dict[str, bytes]) -> None:
+        """Write every key in one pipelined round trip."""
+        if self.bytes_client is None or not values:
+            return
+        pipe = self.bytes_client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, value)
+        pipe.execute()
 
     def get_bytes(self, key: str) -> Optional[bytes]:
+        if self.bytes_client is None:
+            return None
+        return self.bytes_client.get(key)
+
+    def get_bytes_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Raw values for ``keys`` in order (``None`` for misses), in one MGET round trip."""
+        if self.bytes_client is None or not keys:
+            return [None] * len(keys)
+        return self.bytes_client.mget(keys)
+
+    def zset_replace_tail_many(self, updates: Dict[str, Tuple[float, Dict[bytes, float]]], keep: int) -> None:
+        """
+        For each ``key: (from_score, members)``: drop members scored ``>= from_score``,
+        add ``members`` (member -> score) and trim to the ``keep`` highest scores.
+        Every key is updated in one MULTI/EXEC round trip.
+        """
+        if self.bytes_client is None or not updates:
+            return
+        pipe = self.bytes_client.pipeline(transaction=True)
+        for key, (from_score, members) in updates.items():
+            pipe.zremrangebyscore(key, from_score, "+inf")
+            if members:
+                pipe.zadd(key, members)
+            pipe.zremrangebyrank(key, 0, -(keep + 1))
+        pipe.execute()
+
+    def zset_tail_many(self, keys: List[str], count: int) -> List[List[bytes]]:
+        """The ``count`` highest-scored members of each key, lowest score first, in one round trip."""
+        if self.bytes_client is None or not keys:
+            return [[] for _ in keys]
+        pipe = self.bytes_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrange(key, -count, -1)
+        return pipe.execute()
+
+    def delete(self, *keys: str) -> None:
+        if self.client is None or not keys:
+            return
+        self.client.delete(*keys)
+
+    def scan_keys(self, pattern: str) -> Iterator[str]:
+        if self.client is None:
+            return iter(())
+        return self.client.scan_iter(match=pattern, count=1000)
+
+    def incr(self, key: str) -> Optional[int]:
+        if self.client is None:
+            return None
+        return int(self.client.incr(key))
+
+    def publish(self, channel: str, message: str) -> None:
+        if self.client is None:
+            return
+        self.client.publish(channel, message)
+
+    def subscribe(self, channel: str, handler: Callable[[dict], None]) -> Optional[Any]:
+        """Call ``handler`` for every message on ``channel`` from a daemon thread; returns the thread."""
         if self.client is None:
             return None
-        return self.client.get(key)
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: handler})
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 
 from sqlalchemy import Column, DateTime, Float, Integer, String, Index, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -22,9 +23,11 @@ class Candle(Base):
     volume = Column(Float, nullable=False)
     source = Column(String, nullable=False, default="groww")
 
+    # Partitioned by timeframe, then by month of ts (see app/infra/db/partitions.py);
+    # the primary key already covers (symbol, timeframe, ts) lookups.
     __table_args__ = (
-        Index("ix_candles_symbol_timeframe_ts", "symbol", "timeframe", "ts"),
         Index("ix_candles_timeframe_ts", "timeframe", "ts"),
+        {"postgresql_partition_by": "LIST (timeframe)"},
     )
 
 
@@ -49,10 +52,15 @@ class ScannerSnapshot(Base):
 
     best_signal = Column(String, nullable=False)
     benchmark_symbol = Column(String, nullable=False, default="NIFTY")
+    # Delta storage: keyframes hold every row of a cycle, other rows only changes;
+    # removed marks a symbol that left the universe.
+    keyframe = Column(Boolean, nullable=False, default=True)
+    removed = Column(Boolean, nullable=False, default=False)
 
     __table_args__ = (
         Index("ix_snapshot_symbol_timeframe_ts", "symbol", "timeframe", "ts"),
         Index("ix_snapshot_timeframe_ts", "timeframe", "ts"),
+        Index("ix_snapshot_keyframes", "timeframe", "ts", postgresql_where=keyframe.is_(True)),
     )
 
 
@@ -73,6 +81,31 @@ class BenchmarkState(Base):
     )
 
 
+class ScannerSnapshotCycle(Base):
+    """One row per scanner compute cycle, so delta snapshots keep the cycle time even when nothing changed."""
+
+    __tablename__ = "scanner_snapshot_cycle"
+
+    timeframe = Column(String, primary_key=True)
+    ts = Column(DateTime(timezone=True), primary_key=True)
+
+
+class LatestSnapshot(Base):
+    """
+    Pointer to the newest scanner snapshot or benchmark states per timeframe,
+    written in the same transaction as the rows, with the API payload pre-built.
+    """
+
+    __tablename__ = "latest_snapshot"
+
+    kind = Column(String, primary_key=True)
+    timeframe = Column(String, primary_key=True)
+    ts = Column(DateTime(timezone=True), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    checksum = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+
 class WatchStock(Base):
     __tablename__ = "watch_stocks"
 
@@ -0,0 +1,211 @@
+"""
+``candles`` is partitioned by ``LIST (timeframe)``, and each timeframe table by
+``RANGE (ts)`` into calendar months::
+
+    candles
+      candles_5m                PARTITION BY RANGE (ts)
+        candles_5m_2026_10      [2026-10-01, 2026-11-01) UTC
+        candles_5m_default      rows outside every month partition
+      candles_15m ...
+      candles_other             timeframes without their own table
+
+Reads filtered on ``timeframe`` and a ``ts`` lower bound only touch the newest
+months, and retention drops or archives a whole month with a single DDL statement.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.logging import get_logger
+from app.infra.db.session import Database
+
+
+KNOWN_TIMEFRAMES: Tuple[str, ...] = ("5m", "15m", "1h", "1d")
+ARCHIVE_SCHEMA = "candles_archive"
+
+_TIMEFRAME_RE = re.compile(r"^(\d+)([mhd])$")
+_UNIT_MINUTES = {"m": 1, "h": 60, "d": 1440}
+# NSE cash session length; a loose bound only costs scanning one more partition.
+_SESSION_MINUTES = 375
+# Calendar days of slack for weekends, holidays and data gaps.
+_LOOKBACK_SLACK_DAYS = 10
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def timeframe_table(timeframe: str) -> str:
+    """Name of the ``timeframe`` sub-table; only simple tags like ``5m`` or ``1h`` get one."""
+    if not _TIMEFRAME_RE.match(timeframe):
+        raise ValueError(f"Timeframe {timeframe!r} cannot name a partition")
+    return f"candles_{timeframe}"
+
+
+def partition_name(timeframe: str, month: date) -> str:
+    return f"{timeframe_table(timeframe)}_{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month of a ``candles_<tf>_YYYY_MM`` partition, ``None`` for default/other tables."""
+    match = re.search(r"_(\d{4})_(\d{2})$", name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def lookback_start(timeframe: str, limit: int, now: datetime) -> datetime:
+    """
+    A ``ts`` lower bound that comfortably holds the newest ``limit`` bars of
+    ``timeframe``, so latest-candle queries prune to the newest partitions.
+    """
+    match = _TIMEFRAME_RE.match(timeframe)
+    if match is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    minutes = int(match.group(1)) * _UNIT_MINUTES[match.group(2)]
+    bars_per_day = max(1, _SESSION_MINUTES // minutes) if minutes < 1440 else 1440 / minutes
+    trading_days = math.ceil(limit / bars_per_day)
+    calendar_days = math.ceil(trading_days * 7 / 5) + _LOOKBACK_SLACK_DAYS
+    return now - timedelta(days=calendar_days)
+
+
+def parse_retention(spec: str) -> Dict[str, int]:
+    """``"5m:6,15m:24"`` -> months of history kept per timeframe; unlisted timeframes are kept forever."""
+    retention: Dict[str, int] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        timeframe, _, months = item.partition(":")
+        timeframe_table(timeframe.strip())
+        if not months.strip().isdigit() or int(months) < 1:
+            raise ValueError(f"Invalid candle retention {item!r}; expected <timeframe>:<months>=1+")
+        retention[timeframe.strip()] = int(months)
+    return retention
+
+
+def create_timeframe_sql(timeframe: str) -> List[str]:
+    table = timeframe_table(timeframe)
+    return [
+        f"CREATE TABLE IF NOT EXISTS {table} PARTITION OF candles FOR VALUES IN ('{timeframe}') PARTITION BY RANGE (ts)",
+        f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT",
+    ]
+
+
+def create_month_sql(timeframe: str, month: date) -> List[str]:
+    """
+    Create the month partition, moving any rows that already landed in the default
+    partition for that month so the attach does not fail.
+    """
+    table = timeframe_table(timeframe)
+    name = partition_name(timeframe, month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    bounds = f"ts >= '{lower}+00' AND ts < '{upper}+00'"
+    return [
+        f"CREATE TABLE {name} (LIKE candles INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {bounds} RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}+00') TO ('{upper}+00')",
+    ]
+
+
+@dataclass
+class MaintenanceResult:
+    created: List[str]
+    dropped: List[str]
+    archived: List[str]
+
+
+class CandlePartitions:
+    """
+    Keeps ``candles`` month partitions ahead of the clock and applies retention.
+
+    ``maintain`` creates the current month and ``months_ahead`` more for every
+    timeframe, then retires month partitions older than each timeframe's retention:
+    ``drop`` removes them, ``archive`` detaches them into the ``candles_archive``
+    schema where they stay queryable but out of the hot table.
+    """
+
+    def __init__(self, db: Database, months_ahead: int = 2, retention: str = "", mode: str = "drop") -> None:
+        if mode not in ("drop", "archive"):
+            raise ValueError(f"Candle retention mode must be drop or archive, got {mode!r}")
+        self.db = db
+        self.months_ahead = months_ahead
+        self.retention = parse_retention(retention)
+        self.mode = mode
+        self.logger = get_logger(self.__class__.__name__)
+
+    def existing(self) -> Dict[str, List[str]]:
+        """Partition names per timeframe sub-table."""
+        stmt = text(
+            """
+            SELECT parent.relname, child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            JOIN pg_namespace ns ON ns.oid = child.relnamespace
+            WHERE parent.relname LIKE 'candles\\_%' AND ns.nspname = current_schema()
+            """
+        )
+        with self.db.session() as session:
+            rows = session.execute(stmt).all()
+        out: Dict[str, List[str]] = {}
+        for parent, child in rows:
+            out.setdefault(parent, []).append(child)
+        return out
+
+    def maintain(self, timeframes: Iterable[str] = KNOWN_TIMEFRAMES, today: Optional[date] = None) -> MaintenanceResult:
+        today = today or datetime.now(timezone.utc).date()
+        existing = self.existing()
+        current = month_start(today)
+        result = MaintenanceResult(created=[], dropped=[], archived=[])
+
+        with self.db.session() as session:
+            for timeframe in timeframes:
+                table = timeframe_table(timeframe)
+                have = set(existing.get(table, []))
+                if table not in existing:
+                    for stmt in create_timeframe_sql(timeframe):
+                        session.execute(text(stmt))
+                for offset in range(self.months_ahead + 1):
+                    month = add_months(current, offset)
+                    name = partition_name(timeframe, month)
+                    if name in have:
+                        continue
+                    for stmt in create_month_sql(timeframe, month):
+                        session.execute(text(stmt))
+                    result.created.append(name)
+
+                months = self.retention.get(timeframe)
+                if months is None:
+                    continue
+                cutoff = add_months(current, -months)
+                for name in sorted(have):
+                    month = partition_month(name)
+                    if month is None or month >= cutoff:
+                        continue
+                    if self.mode == "archive":
+                        session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+                        session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                        session.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+                        result.archived.append(name)
+                    else:
+                        session.execute(text(f"DROP TABLE {name}"))
+                        result.dropped.append(name)
+
+        self.logger.info(
+            "Candle partitions maintained",
+            extra={"created": result.created, "dropped": result.dropped, "archived": result.archived},
+        )
+        return result
@@ -1,104 +1,267 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
-
-from sqlalchemy import select, func, delete
+import hashlib
+import io
+import json
+import math
+from dataclasses import dataclass
+from threading import Lock
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, String, bindparam, cast, select, func, delete, true
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.domain.candles import CANDLE_COLUMNS, CandleBatch
 from app.infra.db.models import (
     Candle,
+    LatestSnapshot,
     ScannerSnapshot,
+    ScannerSnapshotCycle,
     BenchmarkState,
     WatchStock,
     WatchIndex,
     TickerIndex,
 )
+from app.infra.db.partitions import lookback_start
 from app.infra.db.session import Database
 
 
-class CandleRepository:
-    def __init__(self, db: Database) -> None:
-        self.db = db
+@dataclass
+class UpsertCounts:
+    """Rows a candle upsert inserted, changed, and found already identical."""
 
-    def upsert_candles(self, symbol: str, timeframe: str, candles: Iterable[dict]) -> None:
-        rows = []
-        for candle in candles:
-            rows.append(
-                {
-                    "symbol": symbol,
-                    "timeframe": timeframe,
-                    "ts": candle["ts"],
-                    "open": candle["open"],
-                    "high": candle["high"],
-                    "low": candle["low"],
-                    "close": candle["close"],
-                    "volume": candle["volume"],
-                    "source": candle.get("source", "groww"),
-                }
-            )
-        if not rows:
-            return
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
 
-        stmt = pg_insert(Candle).values(rows)
-        update_cols = {c: stmt.excluded[c] for c in ["open", "high", "low", "close", "volume", "source"]}
-        stmt = stmt.on_conflict_do_update(
-            index_elements=["symbol", "timeframe", "ts"],
-            set_=update_cols,
+    def __add__(self, other: "UpsertCounts") -> "UpsertCounts":
+        return UpsertCounts(
+            self.inserted + other.inserted,
+            self.updated + other.updated,
+            self.unchanged + other.unchanged,
         )
 
-        with self.db.session() as session:
-            session.execute(stmt)
 
-    def get_latest_candles(self, symbol: str, timeframe: str, limit: int) -> List[Candle]:
-        with self.db.session() as session:
-            stmt = (
-                select(Candle)
-                .where(Candle.symbol == symbol, Candle.timeframe == timeframe)
-                .order_by(Candle.ts.desc())
-                .limit(limit)
-            )
-            rows = session.execute(stmt).scalars().all()
-        return list(reversed(rows))
+def copy_payload(batches: Iterable[Tuple[str, str, CandleBatch]]) -> str:
+    """
+    ``COPY ... FROM STDIN`` text rows (symbol, timeframe, epoch, OHLCV, source), tab
+    separated. Floats use ``repr`` so they round-trip exactly.
+    """
+    lines: List[str] = []
+    for symbol, timeframe, candles in batches:
+        prefix = f"{symbol}\t{timeframe}\t"
+        suffix = f"\t{candles.source}"
+        columns = zip(
+            candles.ts.tolist(),
+            candles.open.tolist(),
+            candles.high.tolist(),
+            candles.low.tolist(),
+            candles.close.tolist(),
+            candles.volume.tolist(),
+        )
+        lines.extend(
+            f"{prefix}{ts}\t{open_!r}\t{high!r}\t{low!r}\t{close!r}\t{volume!r}{suffix}"
+            for ts, open_, high, low, close, volume in columns
+        )
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class CandleRepository:
+    def __init__(self, db: Database) -> None:
+        self.db = db
 
-    def get_latest_candles_batch(self, symbols: List[str], timeframe: str, limit: int) -> dict[str, List[Candle]]:
+    # Staging table for ``upsert_candles_many``; dropped when the transaction commits.
+    _STAGE_SQL = """
+        CREATE TEMP TABLE candles_stage (
+            seq bigserial,
+            symbol text NOT NULL,
+            timeframe text NOT NULL,
+            epoch bigint NOT NULL,
+            open double precision NOT NULL,
+            high double precision NOT NULL,
+            low double precision NOT NULL,
+            close double precision NOT NULL,
+            volume double precision NOT NULL,
+            source text NOT NULL
+        ) ON COMMIT DROP
+    """
+    _COPY_SQL = (
+        "COPY candles_stage (symbol, timeframe, epoch, open, high, low, close, volume, source) FROM STDIN"
+    )
+    # The last staged row wins per key; rows whose OHLCV already match are left alone,
+    # so unchanged bars cost no new tuple or WAL. ``xmax = 0`` marks a fresh insert.
+    _MERGE_SQL = """
+        WITH staged AS (
+            SELECT DISTINCT ON (symbol, timeframe, epoch)
+                symbol, timeframe, to_timestamp(epoch) AS ts, open, high, low, close, volume, source
+            FROM candles_stage
+            ORDER BY symbol, timeframe, epoch, seq DESC
+        ),
+        merged AS (
+            INSERT INTO candles AS c (symbol, timeframe, ts, open, high, low, close, volume, source)
+            SELECT symbol, timeframe, ts, open, high, low, close, volume, source FROM staged
+            ON CONFLICT (symbol, timeframe, ts) DO UPDATE SET
+                open = EXCLUDED.open,
+                high = EXCLUDED.high,
+                low = EXCLUDED.low,
+                close = EXCLUDED.close,
+                volume = EXCLUDED.volume,
+                source = EXCLUDED.source
+            WHERE (c.open, c.high, c.low, c.close, c.volume)
+                IS DISTINCT FROM (EXCLUDED.open, EXCLUDED.high, EXCLUDED.low, EXCLUDED.close, EXCLUDED.volume)
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT
+            (SELECT count(*) FROM staged),
+            count(*) FILTER (WHERE inserted),
+            count(*) FILTER (WHERE NOT inserted)
+        FROM merged
+    """
+
+    def upsert_candles(self, symbol: str, timeframe: str, candles: CandleBatch) -> UpsertCounts:
+        return self.upsert_candles_many([(symbol, timeframe, candles)])
+
+    def upsert_candles_many(self, batches: Iterable[Tuple[str, str, CandleBatch]]) -> UpsertCounts:
+        """
+        Upsert candles for several (symbol, timeframe) pairs in one transaction: the rows
+        are streamed into a temp table with ``COPY`` and merged with a single
+        ``INSERT ... ON CONFLICT DO UPDATE`` that only touches rows whose OHLCV changed.
+        A changed ``source`` alone does not rewrite a row.
+        """
+        payload = copy_payload(batches)
+        if not payload:
+            return UpsertCounts()
+
+        with self.db.session() as session:
+            cursor = session.connection().connection.cursor()
+            try:
+                cursor.execute(self._STAGE_SQL)
+                cursor.copy_expert(self._COPY_SQL, io.StringIO(payload))
+                cursor.execute(self._MERGE_SQL)
+                staged, inserted, updated = cursor.fetchone()
+            finally:
+                cursor.close()
+        return UpsertCounts(inserted=inserted, updated=updated, unchanged=staged - inserted - updated)
+
+    def get_latest_candles(self, symbol: str, timeframe: str, limit: int) -> CandleBatch:
+        return self.get_latest_candles_batch([symbol], timeframe, limit).get(symbol, CandleBatch.empty())
+
+    def get_latest_candles_batch(self, symbols: List[str], timeframe: str, limit: int) -> Dict[str, CandleBatch]:
+        """
+        Last ``limit`` candles per symbol, oldest first; symbols without candles are left out.
+
+        The query is bounded to a lookback that normally holds ``limit`` bars, so only
+        the newest month partitions are scanned. Symbols that come back short (new
+        listings, long gaps) are re-read without the bound.
+        """
         if not symbols:
             return {}
-        with self.db.session() as session:
-            row_number = func.row_number().over(
-                partition_by=Candle.symbol,
-                order_by=Candle.ts.desc(),
-            ).label("rn")
-            subq = (
-                select(Candle, row_number)
-                .where(Candle.symbol.in_(symbols), Candle.timeframe == timeframe)
-                .subquery()
-            )
-            stmt = (
-                select(subq)
-                .where(subq.c.rn <= limit)
-                .order_by(subq.c.symbol.asc(), subq.c.ts.asc())
-            )
-            rows = session.execute(stmt).all()
-        grouped: dict[str, List[Candle]] = {}
-        for row in rows:
-            candle = Candle(
-                symbol=row.symbol,
-                timeframe=row.timeframe,
-                ts=row.ts,
-                open=row.open,
-                high=row.high,
-                low=row.low,
-                close=row.close,
-                volume=row.volume,
-                source=row.source,
-            )
-            grouped.setdefault(row.symbol, []).append(candle)
-        return grouped
+        since = lookback_start(timeframe, limit, datetime.now(timezone.utc))
+        found = self._latest_candles(symbols, timeframe, limit, since)
+        short = [symbol for symbol in symbols if len(found.get(symbol, ())) < limit]
+        if short:
+            found.update(self._latest_candles(short, timeframe, limit, None))
+        return found
+
+    def _latest_candles(
+        self, symbols: List[str], timeframe: str, limit: int, since: Optional[datetime]
+    ) -> Dict[str, CandleBatch]:
+        symbols = list(dict.fromkeys(symbols))
+        with self.db.session() as session:
+            result = session.execute(latest_candles_query(timeframe, limit, since), {"symbols": symbols})
+            records = np.fromiter(map(tuple, result), dtype=LATEST_ROW_DTYPE)
+        return split_latest_rows(records, symbols)
+
+
+def latest_candles_query(timeframe: str, limit: int, since: Optional[datetime] = None):
+    """
+    ``LIMIT`` per symbol through ``JOIN LATERAL``, one backward scan of the
+    (symbol, timeframe, ts) primary key per symbol instead of numbering every row in
+    range. Symbols are bound as a single array (``:symbols``) and rows come back as
+    (symbol position, epoch, OHLCV) numbers only, ordered by position then time.
+    """
+    wanted = (
+        func.unnest(bindparam("symbols", type_=ARRAY(String)))
+        .table_valued("symbol", with_ordinality="idx")
+        .render_derived("wanted")
+    )
+    filters = [Candle.symbol == wanted.c.symbol, Candle.timeframe == timeframe]
+    if since is not None:
+        filters.append(Candle.ts >= since)
+    latest = (
+        select(
+            cast(func.extract("epoch", Candle.ts), BigInteger).label("epoch"),
+            Candle.open,
+            Candle.high,
+            Candle.low,
+            Candle.close,
+            Candle.volume,
+        )
+        .where(*filters)
+        .order_by(Candle.ts.desc())
+        .limit(limit)
+        .lateral("latest")
+    )
+    return (
+        select(wanted.c.idx, *latest.c)
+        .select_from(wanted)
+        .join(latest, true())
+        .order_by(wanted.c.idx, latest.c.epoch)
+    )
+
+
+LATEST_ROW_DTYPE = np.dtype(
+    [("idx", np.int64), ("ts", np.int64)] + [(name, np.float64) for name in ("open", "high", "low", "close", "volume")]
+)
+
+
+def split_latest_rows(records: np.ndarray, symbols: List[str]) -> Dict[str, CandleBatch]:
+    """Per-symbol batches over ``records`` (``LATEST_ROW_DTYPE``, grouped by 1-based symbol position)."""
+    if not len(records):
+        return {}
+    starts = np.flatnonzero(np.r_[True, records["idx"][1:] != records["idx"][:-1]])
+    ends = np.r_[starts[1:], len(records)]
+    columns = [records[name] for name in CANDLE_COLUMNS]
+    return {
+        symbols[int(records["idx"][start]) - 1]: CandleBatch(*(column[start:end] for column in columns), source="db")
+        for start, end in zip(starts.tolist(), ends.tolist())
+    }
 
 
 class SnapshotRepository:
-    def __init__(self, db: Database) -> None:
+    """
+    Scanner snapshots in ``scanner_snapshot``.
+
+    In ``delta`` mode (``SNAPSHOT_STORAGE``) a cycle only writes the rows whose signal,
+    score or benchmark changed, or whose metrics moved more than ``epsilon`` from the
+    last written value, plus ``removed`` tombstones for symbols that left the universe.
+    Every ``keyframe_every`` cycles, and on the first save of a process, every row is
+    written as a keyframe. Every cycle also records its time in ``scanner_snapshot_cycle``,
+    even when no row changed. ``get_snapshot_at`` rebuilds any snapshot from the newest
+    keyframe at or before it and the changes since. ``full`` mode writes every row each
+    cycle, each one a keyframe.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        mode: str = "delta",
+        epsilon: float = 1e-3,
+        keyframe_every: int = 30,
+    ) -> None:
+        if mode not in ("delta", "full"):
+            raise ValueError(f"Snapshot storage mode must be delta or full, got {mode!r}")
         self.db = db
+        self.mode = mode
+        self.epsilon = epsilon
+        self.keyframe_every = max(1, keyframe_every)
+        self._lock = Lock()
+        # Per timeframe: the last written item per symbol and cycles since the keyframe.
+        self._written: Dict[str, Dict[str, dict]] = {}
+        self._since_keyframe: Dict[str, int] = {}
 
     def save_snapshot(self, timeframe: str, ts, rows: Iterable[dict]) -> None:
         items = []
@@ -130,6 +293,54 @@ class SnapshotRepository:
         if not items:
             return
 
+        with self._lock:
+            written = self._written.get(timeframe)
+            cycles = self._since_keyframe.get(timeframe, 0)
+        keyframe = self.mode == "full" or written is None or cycles + 1 >= self.keyframe_every
+        if keyframe:
+            changes = [dict(item, keyframe=True, removed=False) for item in items]
+        else:
+            changes = [
+                dict(item, keyframe=False, removed=False)
+                for item in items
+                if snapshot_row_changed(written.get(item["symbol"]), item, self.epsilon)
+            ]
+            present = {item["symbol"] for item in items}
+            changes.extend(
+                dict(prev, ts=ts, keyframe=False, removed=True)
+                for symbol, prev in written.items()
+                if symbol not in present
+            )
+
+        # Same order as the rows fallback: best_signal, then symbol.
+        rows_payload = [
+            _snapshot_payload_row(item)
+            for item in sorted(items, key=lambda item: (item["best_signal"], item["symbol"]))
+        ]
+        payload = {"timeframe": timeframe, "ts": ts.isoformat(), "rows": rows_payload}
+        with self.db.session() as session:
+            if changes:
+                session.execute(self._insert(changes))
+            session.execute(
+                pg_insert(ScannerSnapshotCycle).values(timeframe=timeframe, ts=ts).on_conflict_do_nothing()
+            )
+            session.execute(latest_pointer_upsert("scanner", timeframe, ts, payload, len(rows_payload)))
+
+        with self._lock:
+            if keyframe:
+                self._written[timeframe] = {item["symbol"]: item for item in items}
+                self._since_keyframe[timeframe] = 0
+            else:
+                state = self._written[timeframe]
+                for change in changes:
+                    if change["removed"]:
+                        state.pop(change["symbol"], None)
+                    else:
+                        state[change["symbol"]] = change
+                self._since_keyframe[timeframe] = cycles + 1
+
+    @staticmethod
+    def _insert(items: List[dict]):
         stmt = pg_insert(ScannerSnapshot).values(items)
         update_cols = {c: stmt.excluded[c] for c in [
             "rrs_vs_nifty",
@@ -144,27 +355,53 @@ class SnapshotRepository:
             "signal_vs_bank",
             "best_signal",
             "benchmark_symbol",
+            "keyframe",
+            "removed",
         ]}
-        stmt = stmt.on_conflict_do_update(
+        return stmt.on_conflict_do_update(
             index_elements=["ts", "timeframe", "symbol"],
             set_=update_cols,
         )
-        with self.db.session() as session:
-            session.execute(stmt)
 
     def get_latest_snapshot(self, timeframe: str) -> Optional[dict]:
-        with self.db.session() as session:
-            ts_stmt = select(func.max(ScannerSnapshot.ts)).where(ScannerSnapshot.timeframe == timeframe)
-            ts = session.execute(ts_stmt).scalar()
-            if ts is None:
+        """The newest snapshot in API shape: one primary-key read of its ``latest_snapshot`` pointer."""
+        payload = _latest_payload("scanner", timeframe, self.db)
+        if payload is not None:
+            return payload
+        return self.get_snapshot_at(timeframe)
+
+    def get_snapshot_at(self, timeframe: str, at=None) -> Optional[dict]:
+        """
+        The snapshot as of ``at`` (default: newest), rebuilt from the last keyframe at
+        or before it plus each symbol's newest change since. ``ts`` is the time of the
+        last compute cycle at or before ``at``, not of the newest changed row.
+        """
+        with self.db.session() as session:
+            keyframe_stmt = select(func.max(ScannerSnapshot.ts)).where(
+                ScannerSnapshot.timeframe == timeframe,
+                ScannerSnapshot.keyframe.is_(True),
+            )
+            if at is not None:
+                keyframe_stmt = keyframe_stmt.where(ScannerSnapshot.ts <= at)
+            start = session.execute(keyframe_stmt).scalar()
+            if start is None:
                 return None
             rows_stmt = (
                 select(ScannerSnapshot)
-                .where(ScannerSnapshot.timeframe == timeframe, ScannerSnapshot.ts == ts)
-                .order_by(ScannerSnapshot.best_signal.asc(), ScannerSnapshot.symbol.asc())
+                .where(ScannerSnapshot.timeframe == timeframe, ScannerSnapshot.ts >= start)
+                .order_by(ScannerSnapshot.symbol.asc(), ScannerSnapshot.ts.desc())
+                .distinct(ScannerSnapshot.symbol)
             )
+            if at is not None:
+                rows_stmt = rows_stmt.where(ScannerSnapshot.ts <= at)
             rows = session.execute(rows_stmt).scalars().all()
 
+            cycle_stmt = select(func.max(ScannerSnapshotCycle.ts)).where(ScannerSnapshotCycle.timeframe == timeframe)
+            if at is not None:
+                cycle_stmt = cycle_stmt.where(ScannerSnapshotCycle.ts <= at)
+            # Snapshots stored before cycles were recorded only have their rows' times.
+            ts = max([session.execute(cycle_stmt).scalar() or start, *(row.ts for row in rows)])
+            live = sorted((row for row in rows if not row.removed), key=lambda row: (row.best_signal, row.symbol))
             payload_rows = [
                 {
                     "symbol": row.symbol,
@@ -175,7 +412,7 @@ class SnapshotRepository:
                     "rve": row.rve_vs_nifty,
                     "signal": row.signal_vs_nifty,
                 }
-                for row in rows
+                for row in live
             ]
 
             return {
@@ -185,6 +422,26 @@ class SnapshotRepository:
             }
 
 
+_SNAPSHOT_METRICS = ("rrs_vs_nifty", "rrv_vs_nifty", "rve_vs_nifty", "rrs_vs_bank", "rrv_vs_bank", "rve_vs_bank")
+_SNAPSHOT_LABELS = ("score_vs_nifty", "signal_vs_nifty", "score_vs_bank", "signal_vs_bank", "best_signal", "benchmark_symbol")
+
+
+def snapshot_row_changed(previous: Optional[dict], item: dict, epsilon: float) -> bool:
+    """True when ``item`` must be written: new symbol, any label changed, or a metric moved more than ``epsilon``."""
+    if previous is None:
+        return True
+    if any(previous[name] != item[name] for name in _SNAPSHOT_LABELS):
+        return True
+    for name in _SNAPSHOT_METRICS:
+        old, new = previous[name], item[name]
+        if math.isnan(old) or math.isnan(new):
+            if math.isnan(old) != math.isnan(new):
+                return True
+        elif abs(new - old) > epsilon:
+            return True
+    return False
+
+
 class BenchmarkRepository:
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -217,10 +474,32 @@ class BenchmarkRepository:
             index_elements=["ts", "timeframe", "benchmark"],
             set_=update_cols,
         )
+        iso = ts.isoformat()
+        states_payload = [
+            {
+                "benchmark": item["benchmark"],
+                "timeframe": timeframe,
+                "ts": iso,
+                "regime": item["regime"],
+                "trend": item["trend"],
+                "vol_expansion": item["vol_expansion"],
+                "participation": item["participation"],
+            }
+            for item in sorted(items, key=lambda item: item["benchmark"])
+        ]
+        payload = {"timeframe": timeframe, "ts": iso, "states": states_payload}
         with self.db.session() as session:
             session.execute(stmt)
+            session.execute(latest_pointer_upsert("benchmark", timeframe, ts, payload, len(states_payload)))
 
     def get_latest_states(self, timeframe: str) -> Optional[dict]:
+        """The newest benchmark states in API shape, from the ``latest_snapshot`` pointer."""
+        payload = _latest_payload("benchmark", timeframe, self.db)
+        if payload is not None:
+            return payload
+        return self._latest_states_from_rows(timeframe)
+
+    def _latest_states_from_rows(self, timeframe: str) -> Optional[dict]:
         with self.db.session() as session:
             ts_stmt = select(func.max(BenchmarkState.ts)).where(BenchmarkState.timeframe == timeframe)
             ts = session.execute(ts_stmt).scalar()
@@ -253,6 +532,61 @@ class BenchmarkRepository:
             }
 
 
+def _snapshot_payload_row(item: dict) -> dict:
+    """API row for a ``scanner_snapshot`` insert item."""
+    return {
+        "symbol": item["symbol"],
+        "timeframe": item["timeframe"],
+        "benchmark_symbol": item["benchmark_symbol"],
+        "rrs": item["rrs_vs_nifty"],
+        "rrv": item["rrv_vs_nifty"],
+        "rve": item["rve_vs_nifty"],
+        "signal": item["signal_vs_nifty"],
+    }
+
+
+def _finite(value):
+    """JSONB has no NaN/Infinity; store them as null, as the API serves them."""
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_finite(v) for v in value]
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    return value
+
+
+def latest_pointer_upsert(kind: str, timeframe: str, ts, payload: dict, row_count: int):
+    """
+    Point ``latest_snapshot`` at ``payload`` unless it already holds a newer ``ts``.
+    The checksum is a SHA-256 of the canonical JSON, so readers can tell payloads apart
+    without comparing them.
+    """
+    payload = _finite(payload)
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    values = {
+        "kind": kind,
+        "timeframe": timeframe,
+        "ts": ts,
+        "row_count": row_count,
+        "checksum": hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+        "payload": payload,
+    }
+    stmt = pg_insert(LatestSnapshot).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=["kind", "timeframe"],
+        set_={c: stmt.excluded[c] for c in ["ts", "row_count", "checksum", "payload"]},
+        where=LatestSnapshot.ts <= stmt.excluded.ts,
+    )
+
+
+def _latest_payload(kind: str, timeframe: str, db: Database) -> Optional[dict]:
+    with db.session() as session:
+        return session.execute(
+            select(LatestSnapshot.payload).where(LatestSnapshot.kind == kind, LatestSnapshot.timeframe == timeframe)
+        ).scalar()
+
+
 class WatchStockRepository:
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta
 from typing import Any, Iterable, List, Optional, Protocol
 
+import numpy as np
 import pyotp
 
 from app.core.config import Settings
 from app.core.logging import get_logger
+from app.domain.candles import CandleBatch
 
 
 class GrowwClient(Protocol):
@@ -19,7 +21,7 @@ class GrowwClient(Protocol):
         end_time: datetime,
         exchange: str,
         segment: str,
-    ) -> List[dict]:
+    ) -> CandleBatch:
         ...
 
 
@@ -107,7 +109,7 @@ class RealGrowwClient:
         end_time: datetime,
         exchange: str,
         segment: str,
-    ) -> List[dict]:
+    ) -> CandleBatch:
         interval = TIMEFRAME_INTERVALS.get(timeframe)
         if interval is None:
             raise ValueError(f"Unsupported timeframe: {timeframe}")
@@ -124,7 +126,7 @@ class RealGrowwClient:
 
         chunk_delta = timedelta(days=interval.max_days)
 
-        candles: List[dict] = []
+        chunks: List[CandleBatch] = []
         cursor = start_time
         while cursor < end_time:
             chunk_end = min(cursor + chunk_delta, end_time)
@@ -136,8 +138,9 @@ class RealGrowwClient:
                 start_time=cursor,
                 end_time=chunk_end,
             )
-            candles.extend(response)
+            chunks.append(response)
             cursor = chunk_end
+        candles = CandleBatch.concat(chunks)
 
         self.logger.info(
             "Fetch complete",
@@ -177,7 +180,7 @@ class RealGrowwClient:
         interval: CandleInterval,
         start_time: datetime,
         end_time: datetime,
-    ) -> List[dict]:
+    ) -> CandleBatch:
         start_time_ms = int(start_time.timestamp() * 1000)
         end_time_ms = int(end_time.timestamp() * 1000)
         response = self.client.get_historical_candle_data(
@@ -192,38 +195,30 @@ class RealGrowwClient:
         return self._normalize_candles(response)
 
     @staticmethod
-    def _normalize_candles(response: dict) -> List[dict]:
+    def _normalize_candles(response: dict) -> CandleBatch:
+        """
+        Columns from the ``[ts, open, high, low, close, volume]`` rows of a Groww
+        response. Rows with a missing or unparseable timestamp or price are dropped;
+        a missing volume counts as 0.
+        """
         payload = response.get("payload", response)
         raw_candles = payload.get("candles", []) if payload else []
-
-        candles: List[dict] = []
-        for row in raw_candles:
-            if len(row) < 6:
-                continue
-            if row[0] is None:
-                continue
-            try:
-                ts_epoch = int(row[0])
-            except (TypeError, ValueError):
-                continue
-            open_v = RealGrowwClient._safe_float(row[1])
-            high_v = RealGrowwClient._safe_float(row[2])
-            low_v = RealGrowwClient._safe_float(row[3])
-            close_v = RealGrowwClient._safe_float(row[4])
-            if None in (open_v, high_v, low_v, close_v):
-                continue
-            candles.append(
-                {
-                    "ts": datetime.fromtimestamp(ts_epoch, tz=timezone.utc),
-                    "open": open_v,
-                    "high": high_v,
-                    "low": low_v,
-                    "close": close_v,
-                    "volume": RealGrowwClient._safe_float(row[5], default=0.0),
-                    "source": "groww",
-                }
-            )
-        return candles
+        rows = [row[:6] for row in raw_candles if len(row) >= 6 and row[0] is not None]
+        if not rows:
+            return CandleBatch.empty()
+
+        # Object columns keep None/strings intact; float() per column maps bad values to NaN.
+        columns = np.array(rows, dtype=object).T
+        ts = _to_float(columns[0])
+        prices = np.stack([_to_float(columns[i]) for i in range(1, 5)])
+        volume = np.nan_to_num(_to_float(columns[5]), nan=0.0)
+        keep = ~np.isnan(ts) & ~np.isnan(prices).any(axis=0)
+        return CandleBatch(
+            ts[keep].astype(np.int64),
+            *prices[:, keep],
+            volume[keep],
+            source="groww",
+        )
 
     @staticmethod
     def _safe_float(value: Any, default: Optional[float] = None) -> Optional[float]:
@@ -233,3 +228,11 @@ class RealGrowwClient:
             return float(value)
         except (TypeError, ValueError):
             return default
+
+
+def _to_float(column: np.ndarray) -> np.ndarray:
+    try:
+        # None becomes NaN here; only unparseable strings need the slow path.
+        return column.astype(np.float64)
+    except (TypeError, ValueError):
+        return np.array([RealGrowwClient._safe_float(v, default=np.nan) for v in column], dtype=np.float64)
@@ -1,20 +1,22 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Optional
 import numpy as np
 
-from app.domain.indicators.rrs_rrv_rve import rolling_move, true_range, wilders_rma
+from app.domain.indicators.rrs_rrv_rve import SeriesContext, rolling_move
 
 
-def compute_benchmark_state(benchmark: str, data: Dict[str, np.ndarray]) -> dict:
-    close = data["close"]
-    high = data["high"]
-    low = data["low"]
+def compute_benchmark_state(
+    benchmark: str,
+    data: Dict[str, np.ndarray],
+    context: Optional[SeriesContext] = None,
+) -> dict:
+    ctx = context if context is not None else SeriesContext.from_ohlcv(data)
     volume = data["volume"]
 
     length = 12
-    trend_series = rolling_move(close, length)
-    atr_series = wilders_rma(true_range(high, low, close), length)
+    trend_series = ctx.move(length)
+    atr_series = ctx.atr(length)
     vol_expansion_series = rolling_move(atr_series, length)
     participation_series = rolling_move(volume, length)
 
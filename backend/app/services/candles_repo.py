@@ -4,8 +4,8 @@ from typing import Dict, List
 
 import numpy as np
 
+from app.infra.cache.candle_codec import decode_many, encode_candles
 from app.infra.cache.redis_cache import RedisCache
-from app.infra.db.models import Candle
 from app.infra.db.repositories import CandleRepository
 
 
@@ -16,50 +16,19 @@ class CandlesRepo:
 
     def get_candles(self, symbols: List[str], timeframe: str, limit: int) -> Dict[str, Dict[str, np.ndarray]]:
         results: Dict[str, Dict[str, np.ndarray]] = {}
+        keys = [f"candles:{symbol}:{timeframe}:{limit}" for symbol in symbols]
         missing = []
 
-        for symbol in symbols:
-            cache_key = f"candles:{symbol}:{timeframe}:{limit}"
-            cached = self.cache.get_json(cache_key)
+        for symbol, cached in zip(symbols, decode_many(self.cache.get_bytes_many(keys))):
             if cached is not None:
-                results[symbol] = {
-                    "ts": np.asarray(cached["ts"], dtype="int64"),
-                    "open": np.asarray(cached["open"], dtype=float),
-                    "high": np.asarray(cached["high"], dtype=float),
-                    "low": np.asarray(cached["low"], dtype=float),
-                    "close": np.asarray(cached["close"], dtype=float),
-                    "volume": np.asarray(cached["volume"], dtype=float),
-                }
+                results[symbol] = cached.arrays()
                 continue
             missing.append(symbol)
 
         if missing:
             batch = self.candle_repo.get_latest_candles_batch(missing, timeframe, limit)
-            for symbol, records in batch.items():
-                payload = _records_to_payload(records)
-                results[symbol] = payload
-                self.cache.set_json(
-                    f"candles:{symbol}:{timeframe}:{limit}",
-                    {
-                        "ts": payload["ts"].tolist(),
-                        "open": payload["open"].tolist(),
-                        "high": payload["high"].tolist(),
-                        "low": payload["low"].tolist(),
-                        "close": payload["close"].tolist(),
-                        "volume": payload["volume"].tolist(),
-                    },
-                    ttl=30,
-                )
+            for symbol, candles in batch.items():
+                results[symbol] = candles.arrays()
+                self.cache.set_bytes(f"candles:{symbol}:{timeframe}:{limit}", encode_candles(candles), ttl=30)
 
         return results
-
-
-def _records_to_payload(records: List[Candle]) -> Dict[str, np.ndarray]:
-    return {
-        "ts": np.asarray([int(r.ts.timestamp()) for r in records], dtype="int64"),
-        "open": np.asarray([r.open for r in records], dtype=float),
-        "high": np.asarray([r.high for r in records], dtype=float),
-        "low": np.asarray([r.low for r in records], dtype=float),
-        "close": np.asarray([r.close for r in records], dtype=float),
-        "volume": np.asarray([r.volume for r in records], dtype=float),
-    }
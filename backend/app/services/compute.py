@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import time
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import numpy as np
 
 from app.core.config import Settings
 from app.core.logging import get_logger
-from app.domain.alignment import align_ohlcv
-from app.domain.indicators.rrs_rrv_rve import classify, rrs, rrv, rve
+from app.domain.alignment import align_many
+from app.domain.indicators.context import SeriesContextCache
+from app.domain.indicators.rrs_rrv_rve import SeriesContext
+from app.infra.cache.candle_cache import CandleCache
 from app.infra.cache.redis_cache import RedisCache
 from app.infra.db.repositories import (
     CandleRepository,
@@ -19,6 +22,11 @@ from app.infra.db.repositories import (
     TickerIndexRepository,
 )
 from app.services.benchmarks import compute_benchmark_state
+from app.services.compute_pool import ComputePool, score_rows
+from app.services.dirty import DirtyTracker
+from app.services.pipeline_metrics import PipelineLatency
+from app.services.timeframes import TIMEFRAME_MINUTES
+from app.services.universe import UniverseCache, UniverseSnapshot
 
 
 class ComputeService:
@@ -33,64 +41,86 @@ class ComputeService:
         watch_stock_repo: WatchStockRepository,
         watch_index_repo: WatchIndexRepository,
         ticker_index_repo: TickerIndexRepository,
+        pool: Optional[ComputePool] = None,
+        dirty_tracker: Optional[DirtyTracker] = None,
+        latency: Optional[PipelineLatency] = None,
+        universe: Optional[UniverseCache] = None,
     ) -> None:
         self.settings = settings
         self.candle_repo = candle_repo
         self.snapshot_repo = snapshot_repo
         self.benchmark_repo = benchmark_repo
         self.cache = cache
+        self.candles = CandleCache(cache, settings.ingest_bars)
         self.broadcaster = broadcaster
         self.watch_stock_repo = watch_stock_repo
         self.watch_index_repo = watch_index_repo
         self.ticker_index_repo = ticker_index_repo
+        self.pool = pool
+        self.dirty_tracker = dirty_tracker
+        self.latency = latency
+        self.universe = universe
+        # (index_map, symbol -> benchmark) of the last full recompute, per timeframe.
+        self._selections: Dict[str, Tuple[Dict[str, str], Dict[str, str]]] = {}
         self.logger = get_logger(self.__class__.__name__)
 
     def compute_timeframe(self, timeframe: str) -> None:
+        dirty = self.dirty_tracker.drain(timeframe) if self.dirty_tracker is not None else None
+        try:
+            self._compute(timeframe, dirty)
+        except Exception:
+            # Put the drained symbols back so the next cycle retries them.
+            if dirty:
+                self.dirty_tracker.mark(timeframe, dirty)
+            raise
+
+    def _compute(self, timeframe: str, dirty: Optional[Set[str]]) -> None:
         now = datetime.now(timezone.utc)
 
         benchmark_states: List[dict] = []
         benchmark_data: Dict[str, Dict[str, np.ndarray]] = {}
+        contexts = SeriesContextCache()
 
-        index_map = self.watch_index_repo.get_active_mappings()
+        universe = self._universe()
+        index_map = dict(universe.index_map)
         if not index_map:
             index_map = {self.settings.nifty_symbol: self.settings.nifty_symbol}
 
-        for benchmark, data_symbol in sorted(index_map.items()):
-            data = self._load_candles(data_symbol, timeframe)
-            if data is None:
-                self.logger.warning(
-                    "Missing benchmark candles",
-                    extra={"timeframe": timeframe, "benchmark": benchmark, "data_symbol": data_symbol},
-                )
-                benchmark_states.append(
-                    {
-                        "benchmark": benchmark,
-                        "regime": "NO_DATA",
-                        "trend": 0.0,
-                        "vol_expansion": 0.0,
-                        "participation": 0.0,
-                    }
-                )
-                continue
-            benchmark_data[benchmark] = data
-            benchmark_states.append(compute_benchmark_state(benchmark, data))
-
-        symbols = self._symbols()
-        rows: List[dict] = []
-        mapping = self.ticker_index_repo.get_mappings()
+        symbols = list(universe.stock_symbols)
+        mapping = universe.stock_indices
+        selection = {symbol: self._select_benchmark_symbol(mapping.get(symbol, [])) for symbol in symbols}
+        previous = self._incremental_base(timeframe, dirty, index_map, selection)
+        if previous is not None:
+            if not dirty:
+                self.logger.info("No dirty symbols, skipping compute", extra={"timeframe": timeframe})
+                return
+            symbols = [symbol for symbol in symbols if symbol in dirty]
+
+        # One cache round trip (plus one query for misses) for the whole cycle.
+        needed = [index_map.get(selection[symbol], selection[symbol]) for symbol in symbols] + symbols
+        if previous is None:
+            needed = sorted(index_map.values()) + needed
+        candles = self._load_candles(needed, timeframe)
+        if previous is None:
+            benchmark_states = self._benchmark_states(timeframe, index_map, candles, benchmark_data, contexts)
+
+        # Candle series keyed by data symbol; benchmarks and stocks share one namespace.
+        series: Dict[str, Dict[str, np.ndarray]] = {
+            index_map.get(benchmark, benchmark): data for benchmark, data in benchmark_data.items()
+        }
+        selected: List[Tuple[str, str, str]] = []
 
         for symbol in symbols:
-            sym_data = self._load_candles(symbol, timeframe)
+            sym_data = candles.get(symbol)
             if sym_data is None:
                 self.logger.warning("Missing symbol candles", extra={"symbol": symbol, "timeframe": timeframe})
                 continue
 
-            index_symbols = mapping.get(symbol, [])
-            benchmark_symbol = self._select_benchmark_symbol(index_symbols)
+            benchmark_symbol = selection[symbol]
             data_symbol = index_map.get(benchmark_symbol, benchmark_symbol)
             benchmark = benchmark_data.get(benchmark_symbol)
             if benchmark is None:
-                benchmark = self._load_candles(data_symbol, timeframe)
+                benchmark = candles.get(data_symbol)
                 if benchmark is None:
                     self.logger.warning(
                         "Missing benchmark for symbol",
@@ -103,10 +133,33 @@ class ComputeService:
                     )
                     continue
                 benchmark_data[benchmark_symbol] = benchmark
-
-            row = self._compute_symbol(symbol, timeframe, sym_data, benchmark, benchmark_symbol)
-            if row is not None:
-                rows.append(row)
+                series[data_symbol] = benchmark
+
+            series[symbol] = sym_data
+            selected.append((symbol, benchmark_symbol, data_symbol))
+
+        # One master grid per cycle; each pair is then a mask AND instead of a set intersection.
+        panel = align_many(series)
+        pending: List[Tuple[str, str, Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]] = []
+        for symbol, benchmark_symbol, data_symbol in selected:
+            aligned = self._require_aligned(symbol, timeframe, *panel.pair(symbol, data_symbol))
+            if aligned is not None:
+                pending.append((symbol, benchmark_symbol, *aligned))
+
+        metrics = self._compute_batched(pending, timeframe, contexts)
+        rows: List[dict] = [
+            self._build_row(symbol, timeframe, benchmark_symbol, metrics[symbol])
+            for symbol, benchmark_symbol, *_ in pending
+        ]
+        recomputed = len(rows)
+        if previous is not None:
+            # Keep the untouched rows; dirty symbols that failed this time drop out.
+            rows.extend(
+                row for row in previous["rows"] if row["symbol"] in selection and row["symbol"] not in dirty
+            )
+            # Same pre-rank order as a full recompute, so ties rank identically.
+            order = {symbol: i for i, symbol in enumerate(selection)}
+            rows.sort(key=lambda r: order[r["symbol"]])
 
         sig_rank = {
             "TRIGGER_LONG": 0,
@@ -132,47 +185,116 @@ class ComputeService:
         self.cache.set_json(f"scanner:{timeframe}", payload)
         self.snapshot_repo.save_snapshot(timeframe, now, rows)
 
-        bench_payload = {
-            "timeframe": timeframe,
-            "ts": now.isoformat(),
-            "states": [
-                {
-                    "benchmark": s["benchmark"],
-                    "timeframe": timeframe,
-                    "ts": now.isoformat(),
-                    "regime": s["regime"],
-                    "trend": s["trend"],
-                    "vol_expansion": s["vol_expansion"],
-                    "participation": s["participation"],
-                }
-                for s in benchmark_states
-            ],
-        }
+        if previous is None:
+            bench_payload = {
+                "timeframe": timeframe,
+                "ts": now.isoformat(),
+                "states": [
+                    {
+                        "benchmark": s["benchmark"],
+                        "timeframe": timeframe,
+                        "ts": now.isoformat(),
+                        "regime": s["regime"],
+                        "trend": s["trend"],
+                        "vol_expansion": s["vol_expansion"],
+                        "participation": s["participation"],
+                    }
+                    for s in benchmark_states
+                ],
+            }
 
-        self.cache.set_json(f"benchmarks:{timeframe}", bench_payload)
-        self.benchmark_repo.save_states(timeframe, now, benchmark_states)
+            self.cache.set_json(f"benchmarks:{timeframe}", bench_payload)
+            self.benchmark_repo.save_states(timeframe, now, benchmark_states)
+            self._selections[timeframe] = (dict(index_map), selection)
 
         # Broadcast to websocket clients
         if self.broadcaster:
             self.broadcaster.publish_threadsafe(timeframe, payload)
+        bar_latency = self._record_latency(timeframe, pending)
 
         self.logger.info(
             "Compute complete",
-            extra={"timeframe": timeframe, "rows": len(rows)},
+            extra={
+                "timeframe": timeframe,
+                "rows": len(rows),
+                "recomputed": recomputed,
+                "mode": "full" if previous is None else "incremental",
+                "bar_close_latency_sec": bar_latency,
+            },
         )
 
-    def _compute_symbol(
+    def _record_latency(self, timeframe: str, pending: list) -> Optional[float]:
+        """Bar-close to broadcast latency for intraday timeframes (daily bars close off-grid)."""
+        minutes = TIMEFRAME_MINUTES.get(timeframe)
+        if self.latency is None or not pending or minutes is None or minutes >= 1440:
+            return None
+        latest_bar_ts = max(int(entry[4][-1]) for entry in pending)
+        return self.latency.observe(timeframe, latest_bar_ts, minutes, time.time())
+
+    def _incremental_base(
         self,
-        symbol: str,
         timeframe: str,
-        sym_data: Dict[str, np.ndarray],
-        benchmark: Dict[str, np.ndarray],
-        benchmark_symbol: str,
+        dirty: Optional[Set[str]],
+        index_map: Dict[str, str],
+        selection: Dict[str, str],
     ) -> Optional[dict]:
-        sym_vs_benchmark = self._compute_vs_benchmark(symbol, timeframe, sym_data, benchmark)
-        if sym_vs_benchmark is None:
+        """
+        Previous ``scanner:{timeframe}`` payload to merge dirty rows into, or None when
+        a full recompute is required: no dirty tracking, no previous payload, a changed
+        universe or benchmark mapping, or new candles for any benchmark.
+        """
+        if dirty is None:
+            return None
+        if self._selections.get(timeframe) != (index_map, selection):
+            return None
+        benchmark_data_symbols = set(index_map.values())
+        benchmark_data_symbols.update(index_map.get(b, b) for b in selection.values())
+        if dirty & benchmark_data_symbols:
             return None
+        previous = self.cache.get_json(f"scanner:{timeframe}")
+        if previous is None or "rows" not in previous:
+            return None
+        return previous
+
+    def _benchmark_states(
+        self,
+        timeframe: str,
+        index_map: Dict[str, str],
+        candles: Dict[str, Dict[str, np.ndarray]],
+        benchmark_data: Dict[str, Dict[str, np.ndarray]],
+        contexts: SeriesContextCache,
+    ) -> List[dict]:
+        benchmark_states: List[dict] = []
+        for benchmark, data_symbol in sorted(index_map.items()):
+            data = candles.get(data_symbol)
+            if data is None:
+                self.logger.warning(
+                    "Missing benchmark candles",
+                    extra={"timeframe": timeframe, "benchmark": benchmark, "data_symbol": data_symbol},
+                )
+                benchmark_states.append(
+                    {
+                        "benchmark": benchmark,
+                        "regime": "NO_DATA",
+                        "trend": 0.0,
+                        "vol_expansion": 0.0,
+                        "participation": 0.0,
+                    }
+                )
+                continue
+            benchmark_data[benchmark] = data
+            benchmark_states.append(
+                compute_benchmark_state(benchmark, data, contexts.context(benchmark, timeframe, data))
+            )
+        return benchmark_states
 
+    def _build_row(
+        self,
+        symbol: str,
+        timeframe: str,
+        benchmark_symbol: str,
+        sym_vs_benchmark: dict,
+    ) -> dict:
         signal = sym_vs_benchmark["signal"]
 
         return {
@@ -196,14 +318,14 @@ class ComputeService:
             "best_signal": signal,
         }
 
-    def _compute_vs_benchmark(
+    def _require_aligned(
         self,
         symbol: str,
         timeframe: str,
-        sym_data: Dict[str, np.ndarray],
-        bench_data: Dict[str, np.ndarray],
-    ) -> Optional[dict]:
-        sym_aligned, bench_aligned, common_ts = align_ohlcv(sym_data, bench_data)
+        sym_aligned: Dict[str, np.ndarray],
+        bench_aligned: Dict[str, np.ndarray],
+        common_ts: np.ndarray,
+    ) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]]:
         min_aligned = 6 if timeframe == "5m" else 30
         if common_ts.size < min_aligned:
             self.logger.warning(
@@ -211,30 +333,60 @@ class ComputeService:
                 extra={"symbol": symbol, "timeframe": timeframe, "aligned": int(common_ts.size), "required": min_aligned},
             )
             return None
+        return sym_aligned, bench_aligned, common_ts
 
-        sym_ohlc = {k: sym_aligned[k] for k in ["high", "low", "close"]}
-        ben_ohlc = {k: bench_aligned[k] for k in ["high", "low", "close"]}
-
-        rrs_series = rrs(sym_ohlc, ben_ohlc, length=12)
-        rrv_series = rrv(sym_aligned["volume"], bench_aligned["volume"], length=12, smooth=3, use_log=True)
-        rve_series = rve(sym_ohlc, ben_ohlc, length=12, atr_period=14, smooth_atr=1)
-
-        rrs_val = float(rrs_series[-1])
-        rrv_val = float(rrv_series[-1])
-        rve_val = float(rve_series[-1])
-
-        signal = classify(rrs_val, rrv_val, rve_val, rrs_series)
-
-        return {
-            "symbol": symbol,
-            "rrs": rrs_val,
-            "rrv": rrv_val,
-            "rve": rve_val,
-            "signal": signal,
-        }
+    def _compute_batched(
+        self,
+        pending: List[Tuple[str, str, Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray]],
+        timeframe: str,
+        contexts: SeriesContextCache,
+    ) -> Dict[str, dict]:
+        """
+        Run the batched kernels once per (benchmark, aligned timestamps) group.
+
+        Symbols in a group share the exact same benchmark slice, so stacking them into a
+        matrix gives the same numbers as computing each pair on its own. The benchmark
+        context comes from ``contexts``, so a slice that covers the full benchmark series
+        reuses the ATR already computed for its benchmark state, and RRS/RVE share one
+        true-range pass per matrix. With a ``ComputePool`` the groups are sharded across
+        worker processes; the scores are identical either way.
+        """
+        groups: Dict[Tuple[str, bytes], List[int]] = {}
+        for i, (_, benchmark_symbol, _, _, common_ts) in enumerate(pending):
+            groups.setdefault((benchmark_symbol, common_ts.tobytes()), []).append(i)
+
+        members_list = list(groups.values())
+        contexts_list = []
+        for members in members_list:
+            _, benchmark_symbol, _, bench_aligned, common_ts = pending[members[0]]
+            sym_ctx = SeriesContext(
+                *(np.vstack([pending[i][2][k] for i in members]) for k in ["high", "low", "close", "volume"])
+            )
+            ben_ctx = contexts.context(benchmark_symbol, timeframe, {**bench_aligned, "ts": common_ts})
+            contexts_list.append((sym_ctx, ben_ctx))
+
+        if self.pool is not None:
+            scores = self.pool.score_groups(contexts_list)
+        else:
+            scores = [score_rows(sym_ctx, ben_ctx) for sym_ctx, ben_ctx in contexts_list]
+
+        results: Dict[str, dict] = {}
+        for members, group_scores in zip(members_list, scores):
+            for i, (rrs_val, rrv_val, rve_val, signal) in zip(members, group_scores):
+                symbol = pending[i][0]
+                results[symbol] = {
+                    "symbol": symbol,
+                    "rrs": rrs_val,
+                    "rrv": rrv_val,
+                    "rve": rve_val,
+                    "signal": signal,
+                }
+        return results
 
-    def _symbols(self) -> List[str]:
-        return self.watch_stock_repo.get_active_symbols()
+    def _universe(self) -> UniverseSnapshot:
+        if self.universe is not None:
+            return self.universe.get()
+        return UniverseSnapshot.load(0, self.watch_stock_repo, self.watch_index_repo, self.ticker_index_repo)
 
     def _select_benchmark_symbol(self, index_symbols: List[str]) -> str:
         default_symbol = self.settings.nifty_symbol
@@ -245,23 +397,19 @@ class ComputeService:
                 return symbol
         return default_symbol
 
-    def _load_candles(self, symbol: str, timeframe: str) -> Optional[Dict[str, np.ndarray]]:
-        payload = self.cache.get_json(f"candles:{symbol}:{timeframe}")
-        if payload is None:
-            records = self.candle_repo.get_latest_candles(symbol, timeframe, self.settings.compute_bars)
-            if not records:
-                return None
-            payload = {
-                "ts": [int(r.ts.timestamp()) for r in records],
-                "open": [r.open for r in records],
-                "high": [r.high for r in records],
-                "low": [r.low for r in records],
-                "close": [r.close for r in records],
-                "volume": [r.volume for r in records],
-            }
-
-        aligned = {}
-        for key, value in payload.items():
-            dtype = "int64" if key == "ts" else float
-            aligned[key] = np.asarray(value, dtype=dtype)
-        return aligned
+    def _load_candles(self, symbols: Iterable[str], timeframe: str) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Candles for every symbol that has data: one pipelined read of the whole cached
+        windows (up to ``ingest_bars``), then a single windowed query for the latest
+        ``compute_bars`` of the misses. Symbols with no candles are left out.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        cached = self.candles.get_many(symbols, timeframe)
+        batches = {symbol: batch for symbol, batch in zip(symbols, cached) if batch is not None}
+
+        missing = [symbol for symbol in symbols if symbol not in batches]
+        if missing:
+            found = self.candle_repo.get_latest_candles_batch(missing, timeframe, self.settings.compute_bars)
+            batches.update((symbol, batch) for symbol, batch in found.items() if len(batch))
+
+        return {symbol: batch.arrays() for symbol, batch in batches.items()}
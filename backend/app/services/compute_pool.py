@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.domain.indicators.rrs_rrv_rve import SeriesContext, classify, rrs_batch, rrv_batch, rve_batch
+
+RowScore = Tuple[float, float, float, str]
+
+# Column order of every block written to shared memory.
+_COLUMNS = ("high", "low", "close", "volume")
+
+
+def score_rows(sym: SeriesContext, ben: SeriesContext) -> List[RowScore]:
+    """Latest (rrs, rrv, rve, signal) for every row of a symbol matrix vs one benchmark."""
+    rrs_matrix = rrs_batch(sym, ben, length=12)
+    rrv_matrix = rrv_batch(sym, ben, length=12, smooth=3, use_log=True)
+    rve_matrix = rve_batch(sym, ben, length=12, atr_period=14, smooth_atr=1)
+
+    out: List[RowScore] = []
+    for row in range(rrs_matrix.shape[0]):
+        rrs_val = float(rrs_matrix[row, -1])
+        rrv_val = float(rrv_matrix[row, -1])
+        rve_val = float(rve_matrix[row, -1])
+        out.append((rrs_val, rrv_val, rve_val, classify(rrs_val, rrv_val, rve_val, rrs_matrix[row])))
+    return out
+
+
+class ComputePool:
+    """
+    Shards batched indicator rows across worker processes.
+
+    Each call packs every (symbol matrix, benchmark row) group into one shared-memory
+    block, so workers read the candles in place instead of unpickling them; only the
+    per-row scores travel back. Rows are independent in the batch kernels, so any
+    row split gives byte-identical results to ``score_rows`` on the whole group.
+    """
+
+    def __init__(self, workers: int, min_rows: int = 100) -> None:
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        self.workers = workers
+        self.min_rows = min_rows
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.logger = get_logger(self.__class__.__name__)
+
+    def score_groups(self, groups: Sequence[Tuple[SeriesContext, SeriesContext]]) -> List[List[RowScore]]:
+        total_rows = sum(sym.close.shape[0] for sym, _ in groups)
+        if total_rows < self.min_rows or self.workers < 2:
+            return [score_rows(sym, ben) for sym, ben in groups]
+
+        sizes = [(sym.close.shape[0], sym.close.shape[1]) for sym, _ in groups]
+        for (sym, ben), (_, n_bars) in zip(groups, sizes):
+            if ben.close.shape != (n_bars,):
+                raise ValueError(f"Benchmark must be a ({n_bars},) row, got shape {ben.close.shape}")
+
+        n_floats = sum(len(_COLUMNS) * (n_rows + 1) * n_bars for n_rows, n_bars in sizes)
+        shm = shared_memory.SharedMemory(create=True, size=max(n_floats, 1) * 8)
+        try:
+            buf = np.ndarray((n_floats,), dtype=float, buffer=shm.buf)
+            tasks = []
+            offset = 0
+            chunk = max(1, -(-total_rows // self.workers))
+            for g, ((sym, ben), (n_rows, n_bars)) in enumerate(zip(groups, sizes)):
+                sym_offset = offset
+                buf[offset : offset + len(_COLUMNS) * n_rows * n_bars] = np.stack(
+                    [_column(sym, name) for name in _COLUMNS]
+                ).ravel()
+                offset += len(_COLUMNS) * n_rows * n_bars
+                ben_offset = offset
+                buf[offset : offset + len(_COLUMNS) * n_bars] = np.stack([_column(ben, name) for name in _COLUMNS]).ravel()
+                offset += len(_COLUMNS) * n_bars
+                for start in range(0, n_rows, chunk):
+                    tasks.append((g, shm.name, sym_offset, ben_offset, n_rows, n_bars, start, min(start + chunk, n_rows)))
+            del buf
+
+            executor = self._get_executor()
+            futures = [(task[0], executor.submit(_score_shard, *task[1:])) for task in tasks]
+            results: List[List[RowScore]] = [[] for _ in groups]
+            for g, future in futures:
+                results[g].extend(future.result())
+            return results
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn keeps workers free of the parent's threads, sockets and event loop.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self.logger.info("Compute pool started", extra={"workers": self.workers})
+        return self._executor
+
+
+def _column(ctx: SeriesContext, name: str) -> np.ndarray:
+    value = getattr(ctx, name)
+    if value is None:
+        raise ValueError(f"SeriesContext has no {name}")
+    return value
+
+
+def _score_shard(
+    shm_name: str,
+    sym_offset: int,
+    ben_offset: int,
+    n_rows: int,
+    n_bars: int,
+    start: int,
+    stop: int,
+) -> List[RowScore]:
+    shm = _attach(shm_name)
+    try:
+        sym_block = np.ndarray((len(_COLUMNS), n_rows, n_bars), dtype=float, buffer=shm.buf, offset=sym_offset * 8)
+        ben_block = np.ndarray((len(_COLUMNS), n_bars), dtype=float, buffer=shm.buf, offset=ben_offset * 8)
+        sym = SeriesContext(*sym_block[:, start:stop])
+        ben = SeriesContext(*ben_block)
+        scores = score_rows(sym, ben)
+        del sym, ben, sym_block, ben_block
+        return scores
+    finally:
+        shm.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block; pool workers share the parent's
+        # resource tracker, so the duplicate registration is a no-op.
+        return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from threading import Lock
+from typing import Dict, Iterable, Set, Tuple
+
+
+class DirtyTracker:
+    """
+    Per-timeframe set of symbols whose latest candle changed since compute last ran.
+
+    Ingestion reports the newest candle of every fetch through ``observe``; compute
+    takes the accumulated set with ``drain``. The first observation of a symbol always
+    counts as a change.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._dirty: Dict[str, Set[str]] = {}
+        self._latest: Dict[Tuple[str, str], tuple] = {}
+
+    def observe(self, timeframe: str, symbol: str, candle: dict) -> bool:
+        """Record ``candle`` as the latest bar; return True if it differs from the last one."""
+        bar = (candle["ts"], candle["open"], candle["high"], candle["low"], candle["close"], candle["volume"])
+        with self._lock:
+            if self._latest.get((timeframe, symbol)) == bar:
+                return False
+            self._latest[(timeframe, symbol)] = bar
+            self._dirty.setdefault(timeframe, set()).add(symbol)
+            return True
+
+    def mark(self, timeframe: str, symbols: Iterable[str]) -> None:
+        with self._lock:
+            self._dirty.setdefault(timeframe, set()).update(symbols)
+
+    def drain(self, timeframe: str) -> Set[str]:
+        with self._lock:
+            return self._dirty.pop(timeframe, set())
+
+    def pending(self, timeframe: str) -> int:
+        with self._lock:
+            return len(self._dirty.get(timeframe, ()))
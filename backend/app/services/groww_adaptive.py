@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from enum import Enum
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+from app.core.logging import get_logger
+from app.domain.candles import CandleBatch
+from app.infra.groww.client import GrowwClient
+from app.services.rate_limit import RateLimiter
+
+
+class ErrorKind(str, Enum):
+    THROTTLED = "throttled"
+    TRANSIENT = "transient"
+    AUTH = "auth"
+    PERMANENT = "permanent"
+
+    @property
+    def retryable(self) -> bool:
+        return self in (ErrorKind.THROTTLED, ErrorKind.TRANSIENT)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling Groww while an endpoint's breaker is open."""
+
+
+def classify_error(exc: BaseException) -> ErrorKind:
+    """Map an SDK/HTTP exception to how callers should react to it."""
+    if isinstance(exc, CircuitOpenError):
+        return ErrorKind.PERMANENT
+    status = _status_code(exc)
+    if status is not None:
+        if status == 429:
+            return ErrorKind.THROTTLED
+        if status in (401, 403):
+            return ErrorKind.AUTH
+        if status == 408 or status >= 500:
+            return ErrorKind.TRANSIENT
+        if 400 <= status < 500:
+            return ErrorKind.PERMANENT
+    message = str(exc).lower()
+    if "429" in message or "too many requests" in message or "rate limit" in message:
+        return ErrorKind.THROTTLED
+    if isinstance(exc, (TimeoutError, ConnectionError, OSError)):
+        return ErrorKind.TRANSIENT
+    if isinstance(exc, (ValueError, TypeError, KeyError)):
+        return ErrorKind.PERMANENT
+    return ErrorKind.TRANSIENT
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return classify_error(exc).retryable
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for holder in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "status", "code"):
+            value = getattr(holder, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and fails fast for
+    ``cooldown_sec``; then lets a single trial call through (half-open) and closes
+    on its success or re-opens on its failure.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_sec: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self._clock = clock
+        self._lock = Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at < self.cooldown_sec:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at < self.cooldown_sec or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a call that says nothing about the endpoint's health, leaving the state as is."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True if this opened (or re-opened) the breaker."""
+        with self._lock:
+            self._failures += 1
+            reopened = self._trial_in_flight
+            self._trial_in_flight = False
+            if reopened or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                return True
+            return False
+
+
+class AimdRate:
+    """
+    Additive-increase / multiplicative-decrease of a ``RateLimiter``'s rate factor.
+
+    Each 429 halves the rate (at most once per ``decrease_interval_sec``, so one burst
+    of throttled calls counts once); each success adds ``increase`` back up to 1.0.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        decrease: float = 0.5,
+        increase: float = 0.02,
+        floor: float = 0.1,
+        decrease_interval_sec: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limiter = limiter
+        self.decrease = decrease
+        self.increase = increase
+        self.floor = floor
+        self.decrease_interval_sec = decrease_interval_sec
+        self._clock = clock
+        self._lock = Lock()
+        self._last_decrease: Optional[float] = None
+
+    def on_throttled(self) -> None:
+        with self._lock:
+            now = self._clock()
+            if self._last_decrease is not None and now - self._last_decrease < self.decrease_interval_sec:
+                return
+            self._last_decrease = now
+            self.limiter.set_rate_factor(max(self.floor, self.limiter.rate_factor * self.decrease))
+
+    def on_success(self) -> None:
+        # Read-modify-write under the same lock as on_throttled: ingestion workers
+        # report concurrently, and an unlocked increase could undo a decrease.
+        with self._lock:
+            factor = self.limiter.rate_factor
+            if factor < 1.0:
+                self.limiter.set_rate_factor(min(1.0, factor + self.increase))
+
+
+class AdaptiveGrowwClient:
+    """
+    Wraps a ``GrowwClient`` with error classification, AIMD rate control and a
+    circuit breaker per endpoint. Retries stay with the caller's ``RetryPolicy``
+    (use ``is_retryable`` as its ``retry_on``); this layer only decides how each
+    outcome feeds back into the rate and the breaker. Other attributes (``client``,
+    ``groww_module``) pass through to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        inner: GrowwClient,
+        rate_limiter: RateLimiter,
+        failure_threshold: int = 5,
+        cooldown_sec: float = 45.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.inner = inner
+        self.aimd = AimdRate(rate_limiter, clock=clock)
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = Lock()
+        self.logger = get_logger(self.__class__.__name__)
+
+    def fetch_candles(
+        self,
+        trading_symbol: str,
+        timeframe: str,
+        start_time: datetime,
+        end_time: datetime,
+        exchange: str,
+        segment: str,
+    ) -> CandleBatch:
+        return self._call(
+            "candles",
+            self.inner.fetch_candles,
+            trading_symbol=trading_symbol,
+            timeframe=timeframe,
+            start_time=start_time,
+            end_time=end_time,
+            exchange=exchange,
+            segment=segment,
+        )
+
+    def breaker_states(self) -> Dict[str, str]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {endpoint: breaker.state for endpoint, breaker in breakers.items()}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def _breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.cooldown_sec, self._clock)
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def _call(self, endpoint: str, func: Callable[..., Any], **kwargs) -> Any:
+        breaker = self._breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Groww {endpoint} circuit open")
+        try:
+            result = func(**kwargs)
+        except Exception as exc:
+            kind = classify_error(exc)
+            if kind == ErrorKind.THROTTLED:
+                self.aimd.on_throttled()
+            if kind != ErrorKind.PERMANENT and breaker.record_failure():
+                self.logger.warning(
+                    "Groww circuit opened",
+                    extra={"endpoint": endpoint, "error_kind": kind.value, "cooldown_sec": self.cooldown_sec},
+                )
+            elif kind == ErrorKind.PERMANENT:
+                # A bad request says nothing about the endpoint's health: neither reset
+                # the failure count nor close a half-open breaker, just free its trial slot.
+                breaker.release_trial()
+            raise
+        breaker.record_success()
+        self.aimd.on_success()
+        return result
@@ -12,7 +12,8 @@ from app.domain.options.groww_chain_adapter import normalize_chain
 class GrowwLiveDataService:
     def __init__(self, settings: Settings, groww_client: GrowwClient) -> None:
         self.settings = settings
-        self.groww_client = groww_client
+        # Live calls use the SDK directly, so look through the adaptive wrapper.
+        self.groww_client = getattr(groww_client, "inner", groww_client)
 
     def fetch_live(
         self,
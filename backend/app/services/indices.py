@@ -1,23 +1,30 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
 from app.core.config import Settings
 from app.infra.db.repositories import TickerIndexRepository
+from app.services.universe import UniverseCache
 
 
 def get_associated_indices(
     symbol: str,
     settings: Settings,
     ticker_index_repo: TickerIndexRepository,
+    universe: Optional[UniverseCache] = None,
 ) -> List[str]:
     """
     Always include NIFTY first, then any additional indices from ticker_index.
     Deduplicate and keep stable ordering (NIFTY first, others sorted).
+    Reads mappings from ``universe`` when given instead of querying ticker_index.
     """
     cleaned_symbol = symbol.strip().upper()
     default_symbol = settings.nifty_symbol
-    extra = [s.strip().upper() for s in ticker_index_repo.get_indices_for_stock(cleaned_symbol) if s]
+    if universe is not None:
+        stock_indices = universe.get().indices_for_stock(cleaned_symbol)
+    else:
+        stock_indices = ticker_index_repo.get_indices_for_stock(cleaned_symbol)
+    extra = [s.strip().upper() for s in stock_indices if s]
 
     dedup = []
     seen = set()
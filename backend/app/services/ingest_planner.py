@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import Settings
+from app.services.market_hours import bar_start, is_trading_day, next_bar_close, session_close, session_open
+from app.services.rate_limit import RateLimiter
+from app.services.timeframes import timeframe_to_minutes
+
+
+class IngestPlanner:
+    """
+    Decides when each fetched timeframe is due and in what order symbols are fetched.
+
+    A timeframe is due just after its bar closes (``SCHEDULER_BAR_CLOSE_GRACE_SEC``
+    later); daily bars close at the session close. Within a run a symbol is only
+    fetched if its watermark is behind the newest closed bar, and benchmarks go
+    first so the series every comparison depends on are the freshest. ``report``
+    projects how stale the tail of the universe gets under the Groww budget.
+    """
+
+    def __init__(self, settings: Settings, rate_limiter: Optional[RateLimiter] = None) -> None:
+        self.settings = settings
+        self.rate_limiter = rate_limiter
+        self._lock = Lock()
+        self._symbols = 0
+        self._benchmarks = 0
+
+    def next_close(self, now: datetime, timeframe: str) -> datetime:
+        """First bar close of ``timeframe`` strictly after ``now``; the last bar of a session closes at the session close."""
+        minutes = timeframe_to_minutes(timeframe)
+        closes = session_close(now, self.settings)
+        if minutes >= 1440:
+            day = now
+            while not is_trading_day(day, self.settings) or session_close(day, self.settings) <= now:
+                day = session_open(day, self.settings) + timedelta(days=1)
+            return session_close(day, self.settings)
+        close = next_bar_close(now, minutes, self.settings)
+        if now < closes < close:
+            return closes
+        return close
+
+    def next_run(self, now: datetime, timeframe: str) -> datetime:
+        return self.next_close(now, timeframe) + timedelta(seconds=self.settings.scheduler_bar_close_grace_sec)
+
+    def last_closed_bar(self, now: datetime, timeframe: str) -> datetime:
+        """
+        Start of the newest bar that has closed by ``now``, as ingestion's watermark
+        counts it. Daily bars are taken from local midnight, so both midnight- and
+        open-stamped daily candles count.
+        """
+        minutes = timeframe_to_minutes(timeframe)
+        trading = is_trading_day(now, self.settings)
+        closes = session_close(now, self.settings)
+        if minutes >= 1440:
+            day = now if trading and now >= closes else self._previous_trading_day(now)
+            return session_open(day, self.settings).replace(hour=0, minute=0)
+        if trading and now >= closes:
+            return bar_start(closes - timedelta(seconds=1), minutes, self.settings)
+        if trading and now >= session_open(now, self.settings) + timedelta(minutes=minutes):
+            return bar_start(now - timedelta(minutes=minutes), minutes, self.settings)
+        last_close = session_close(self._previous_trading_day(now), self.settings)
+        return bar_start(last_close - timedelta(seconds=1), minutes, self.settings)
+
+    def _previous_trading_day(self, now: datetime) -> datetime:
+        day = session_open(now, self.settings) - timedelta(days=1)
+        while not is_trading_day(day, self.settings):
+            day -= timedelta(days=1)
+        return day
+
+    def is_due(self, watermark: Optional[int], timeframe: str, now: datetime) -> bool:
+        return watermark is None or watermark < self.last_closed_bar(now, timeframe).timestamp()
+
+    def order(self, symbols: Iterable[str], benchmarks: Iterable[str]) -> List[str]:
+        """``symbols`` with the benchmarks among them first, in benchmark order."""
+        symbols = list(symbols)
+        present = set(symbols)
+        first = list(dict.fromkeys(b for b in benchmarks if b in present))
+        leading = set(first)
+        ordered = first + [s for s in symbols if s not in leading]
+        with self._lock:
+            self._symbols, self._benchmarks = len(ordered), len(first)
+        return ordered
+
+    def calls_per_sec(self) -> float:
+        rate = min(float(self.settings.rate_limit_per_sec), self.settings.rate_limit_per_min / 60.0)
+        if self.rate_limiter is not None:
+            rate *= self.rate_limiter.rate_factor
+        return rate
+
+    def report(self, symbols: Optional[int] = None, benchmarks: Optional[int] = None) -> dict:
+        """
+        Projected freshness per fetched timeframe for a universe of ``symbols``
+        (defaulting to the last one ordered).
+
+        Timeframes closing together are swept shortest first, so a timeframe's sweep
+        waits for every shorter one. ``worst_lag_sec`` is how long after its bar close
+        the last symbol is fetched; when a sweep outlasts the bar, the tail of the
+        universe falls ``stale_bars`` behind.
+        """
+        with self._lock:
+            symbols = self._symbols if symbols is None else symbols
+            benchmarks = self._benchmarks if benchmarks is None else benchmarks
+        rate = self.calls_per_sec()
+        grace = self.settings.scheduler_bar_close_grace_sec
+        timeframes = sorted(self.settings.ingest_timeframes(), key=timeframe_to_minutes)
+
+        out: Dict[str, dict] = {}
+        queued = 0
+        demand = 0.0
+        for timeframe in timeframes:
+            bar_sec = timeframe_to_minutes(timeframe) * 60
+            if bar_sec >= 86400:
+                today = datetime.now(timezone.utc)
+                bar_sec = (session_close(today, self.settings) - session_open(today, self.settings)).total_seconds()
+            sweep_sec = (queued + symbols) / rate
+            demand += symbols / timeframe_to_minutes(timeframe)
+            out[timeframe] = {
+                "symbols": symbols,
+                "sweep_sec": round(sweep_sec, 3),
+                "benchmark_lag_sec": round(grace + (queued + benchmarks) / rate, 3),
+                "worst_lag_sec": round(grace + sweep_sec, 3),
+                "max_fresh_symbols": int(bar_sec * rate) - queued,
+                "stale_bars": max(0, math.ceil(sweep_sec / bar_sec) - 1),
+            }
+            queued += symbols
+
+        budget = rate * 60.0
+        return {
+            "calls_per_min_budget": round(budget, 3),
+            "calls_per_min_needed": round(demand, 3),
+            "utilization": round(demand / budget, 3) if budget else None,
+            "over_budget": demand > budget or any(tf["stale_bars"] > 0 for tf in out.values()),
+            "timeframes": out,
+        }
@@ -1,19 +1,32 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from typing import Dict, List
-
-import numpy as np
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from app.core.config import Settings
 from app.core.logging import get_logger
-from app.infra.db.repositories import CandleRepository, WatchStockRepository, WatchIndexRepository, TickerIndexRepository
+from app.domain.candles import CandleBatch
+from app.infra.db.repositories import (
+    CandleRepository,
+    TickerIndexRepository,
+    UpsertCounts,
+    WatchIndexRepository,
+    WatchStockRepository,
+)
+from app.infra.cache.candle_cache import CandleCache
 from app.infra.cache.redis_cache import RedisCache
 from app.infra.groww.client import GrowwClient, TIMEFRAME_INTERVALS
+from app.services.dirty import DirtyTracker
+from app.services.ingest_planner import IngestPlanner
+from app.services.market_hours import bar_start, session_close
 from app.services.rate_limit import RateLimiter
+from app.services.resample import BASE_TIMEFRAME, bar_starts, resample_candles
 from app.services.retries import RetryPolicy
 from app.services.timeframes import timeframe_to_minutes
+from app.services.universe import UniverseCache
 
 
 class IngestionService:
@@ -28,6 +41,9 @@ class IngestionService:
         watch_stock_repo: WatchStockRepository,
         watch_index_repo: WatchIndexRepository,
         ticker_index_repo: TickerIndexRepository,
+        dirty_tracker: Optional[DirtyTracker] = None,
+        universe: Optional[UniverseCache] = None,
+        planner: Optional[IngestPlanner] = None,
     ) -> None:
         self.settings = settings
         self.groww_client = groww_client
@@ -38,19 +54,37 @@ class IngestionService:
         self.watch_stock_repo = watch_stock_repo
         self.watch_index_repo = watch_index_repo
         self.ticker_index_repo = ticker_index_repo
+        self.dirty_tracker = dirty_tracker
+        self.universe = universe
+        self.planner = planner
+        self.candles = CandleCache(cache, settings.ingest_bars)
+        # (symbol, derived timeframe) pairs already backfilled natively this process.
+        self._backfilled: Set[Tuple[str, str]] = set()
         self.logger = get_logger(self.__class__.__name__)
 
-    def run_once(self, timeframe: str) -> None:
+    def run_once(self, timeframe: str, due_only: bool = False) -> int:
+        """
+        Fetch ``timeframe`` for every symbol. A 5m run also refreshes every derived
+        timeframe (``INGEST_NATIVE_TIMEFRAMES``) by resampling; calling this for a
+        derived timeframe fetches it natively, which reconciles the resampled bars.
+
+        Fetches run on ``INGEST_WORKERS`` threads, all drawing from the shared rate
+        limiter; results are written to the DB and cache in batches as they complete.
+        With a planner, benchmarks are fetched first and ``due_only`` skips symbols
+        whose watermark already covers the newest closed bar. Returns the number of
+        symbols fetched successfully; failed fetches are logged and skipped.
+        """
         symbols = self._symbols()
         interval = TIMEFRAME_INTERVALS.get(timeframe)
         if interval is None:
             self.logger.warning("Unknown timeframe", extra={"timeframe": timeframe})
-            return
+            return 0
 
         now = datetime.now(ZoneInfo(self.settings.market_tz))
-        minutes = timeframe_to_minutes(timeframe)
-        bars = min(self.settings.ingest_bars, int(interval.max_days * 24 * 60 / minutes))
-        start_time = now - timedelta(minutes=bars * minutes)
+        start_time = self._window_start(timeframe, now)
+        derived = self.settings.derived_timeframes() if timeframe == BASE_TIMEFRAME else []
+        plans = self._plan(symbols, timeframe, start_time, now, due_only)
+        workers = max(1, self.settings.ingest_workers)
 
         self.logger.info(
             "Ingestion start",
@@ -59,56 +93,298 @@ class IngestionService:
                 "symbols": len(symbols),
                 "start_time": start_time.isoformat(),
                 "end_time": now.isoformat(),
+                "derived": derived,
+                "incremental": sum(1 for _, _, cached in plans if cached is not None),
+                "workers": workers,
+                "skipped": len(symbols) - len(plans),
             },
         )
+        if self.planner is not None:
+            report = self.planner.report()
+            if report["over_budget"]:
+                self.logger.warning("Ingestion over rate budget", extra={"timeframe": timeframe, **report})
 
-        for symbol in symbols:
-            try:
-                self.rate_limiter.acquire()
-                candles = self.retry_policy.run(
-                    self.groww_client.fetch_candles,
-                    trading_symbol=symbol,
-                    timeframe=timeframe,
-                    start_time=start_time,
-                    end_time=now,
-                    exchange=self.settings.groww_exchange,
-                    segment=self.settings.groww_segment,
-                )
-                if not candles:
-                    self.logger.warning("No candles returned", extra={"symbol": symbol, "timeframe": timeframe})
+        pending: List[_Writes] = []
+        counts = UpsertCounts()
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as executor:
+            futures = [
+                executor.submit(self._ingest_symbol, symbol, timeframe, since, cached, now, derived)
+                for symbol, since, cached in plans
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
                     continue
+                fetched += 1
+                pending.append(result)
+                if len(pending) >= self.settings.ingest_write_batch:
+                    counts += self._flush(pending, timeframe)
+                    pending = []
+        counts += self._flush(pending, timeframe)
 
-                self.candle_repo.upsert_candles(symbol, timeframe, candles)
-                cache_payload = self._to_cache_payload(candles)
-                self.cache.set_json(f"candles:{symbol}:{timeframe}", cache_payload)
-                self.logger.info(
-                    "Ingestion success",
-                    extra={"symbol": symbol, "timeframe": timeframe, "candles": len(candles)},
-                )
+        self.logger.info(
+            "Ingestion complete",
+            extra={
+                "timeframe": timeframe,
+                "inserted": counts.inserted,
+                "updated": counts.updated,
+                "unchanged": counts.unchanged,
+            },
+        )
+        return fetched
+
+    def _plan(
+        self, symbols: List[str], timeframe: str, start_time: datetime, now: datetime, due_only: bool = False
+    ) -> List[Tuple[str, datetime, Optional[CandleBatch]]]:
+        """(symbol, fetch start, cached window) per symbol to fetch, reading watermarks and windows in bulk."""
+        watermarks = self.cache.get_json_many([f"watermark:{symbol}:{timeframe}" for symbol in symbols])
+        if due_only and self.planner is not None:
+            due = [
+                (symbol, watermark)
+                for symbol, watermark in zip(symbols, watermarks)
+                if self.planner.is_due(watermark, timeframe, now)
+            ]
+            symbols = [symbol for symbol, _ in due]
+            watermarks = [watermark for _, watermark in due]
+        warm = [
+            symbol
+            for symbol, watermark in zip(symbols, watermarks)
+            if watermark is not None and watermark >= start_time.timestamp()
+        ]
+        windows = dict(zip(warm, self.candles.get_many(warm, timeframe)))
+        # Re-request a few bars before the watermark so revised bars are corrected.
+        overlap = self.settings.ingest_overlap_bars * timeframe_to_minutes(timeframe) * 60
+
+        plans = []
+        for symbol, watermark in zip(symbols, watermarks):
+            cached = windows.get(symbol)
+            if cached is None:
+                plans.append((symbol, start_time, None))
+            else:
+                since = datetime.fromtimestamp(watermark - overlap, tz=now.tzinfo)
+                plans.append((symbol, since, cached))
+        return plans
+
+    def _ingest_symbol(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: datetime,
+        cached: Optional[CandleBatch],
+        now: datetime,
+        derived: List[str],
+    ) -> Optional["_Writes"]:
+        """Fetch one symbol and build its writes; runs on a worker thread and never writes itself."""
+        try:
+            candles = self._fetch(symbol, timeframe, since, now)
+            if not candles:
+                self.logger.warning("No candles returned", extra={"symbol": symbol, "timeframe": timeframe})
+                return None
+
+            writes = _Writes(symbols=1)
+            window = self._merge(cached, candles)
+            # A warm window only needs the fetched tail rewritten; a full fetch replaces it.
+            writes.add(symbol, timeframe, candles, replace=cached is None)
+            watermark = self._watermark(window, timeframe_to_minutes(timeframe), now, session_close(now, self.settings))
+            if watermark is not None:
+                writes.cache[f"watermark:{symbol}:{timeframe}"] = watermark
+            for target in derived:
+                self._derive(writes, symbol, target, window, int(candles.ts[0]), now)
+            self.logger.info(
+                "Ingestion success",
+                extra={
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "candles": len(candles),
+                    "mode": "full" if cached is None else "incremental",
+                },
+            )
+            return writes
+        except Exception as exc:
+            self.logger.exception(
+                "Ingestion failed",
+                extra={"symbol": symbol, "timeframe": timeframe, "error": str(exc)},
+            )
+            return None
+
+    def _flush(self, pending: List["_Writes"], timeframe: str) -> UpsertCounts:
+        """
+        Write a batch of per-symbol writes together. If the batch fails, retry each
+        symbol on its own so one bad row or a transient error only loses that symbol;
+        its watermark is not advanced, so the next cycle refetches it.
+        """
+        if not pending:
+            return UpsertCounts()
+        batch = _Writes()
+        for writes in pending:
+            batch.extend(writes)
+        try:
+            return self._write(batch)
+        except Exception as exc:
+            self.logger.exception(
+                "Ingestion batch write failed",
+                extra={"timeframe": timeframe, "symbols": batch.symbols, "error": str(exc)},
+            )
+        counts = UpsertCounts()
+        for writes in pending:
+            try:
+                counts += self._write(writes)
             except Exception as exc:
                 self.logger.exception(
-                    "Ingestion failed",
+                    "Ingestion write failed",
+                    extra={"symbol": writes.upserts[0][0], "timeframe": timeframe, "error": str(exc)},
+                )
+        return counts
+
+    def _write(self, writes: "_Writes") -> UpsertCounts:
+        """DB first, then candles, watermarks and the dirty set, so compute never sees uncached bars."""
+        counts = self.candle_repo.upsert_candles_many(writes.upserts)
+        self.candles.write_many(writes.bars)
+        self.cache.set_json_many(writes.cache)
+        if self.dirty_tracker is not None:
+            for timeframe, symbol, candle in writes.latest:
+                self.dirty_tracker.observe(timeframe, symbol, candle)
+        return counts
+
+    def _window_start(self, timeframe: str, now: datetime) -> datetime:
+        interval = TIMEFRAME_INTERVALS[timeframe]
+        minutes = timeframe_to_minutes(timeframe)
+        bars = min(self.settings.ingest_bars, int(interval.max_days * 24 * 60 / minutes))
+        return now - timedelta(minutes=bars * minutes)
+
+    def _fetch(self, symbol: str, timeframe: str, start_time: datetime, end_time: datetime) -> CandleBatch:
+        candles = self.retry_policy.run(self._fetch_once, symbol, timeframe, start_time, end_time)
+        if timeframe_to_minutes(timeframe) >= 1440 and timeframe in self.settings.derived_timeframes():
+            # Groww may stamp daily bars at local midnight; resampled ones sit at the
+            # session open. Restamp so one trading day is one bar in the derived series.
+            candles = CandleBatch(
+                bar_starts(candles.ts, 1440, self.settings) if len(candles) else candles.ts,
+                candles.open,
+                candles.high,
+                candles.low,
+                candles.close,
+                candles.volume,
+                source=candles.source,
+            )
+        return candles
+
+    def _fetch_once(self, symbol: str, timeframe: str, start_time: datetime, end_time: datetime) -> CandleBatch:
+        # Every attempt, retries included, spends rate-limit budget.
+        self.rate_limiter.acquire("candles")
+        return self.groww_client.fetch_candles(
+            trading_symbol=symbol,
+            timeframe=timeframe,
+            start_time=start_time,
+            end_time=end_time,
+            exchange=self.settings.groww_exchange,
+            segment=self.settings.groww_segment,
+        )
+
+    def _merge(self, cached: Optional[CandleBatch], fresh: CandleBatch) -> CandleBatch:
+        """Replace cached bars from the first fresh bar onwards, keeping the last ``ingest_bars``."""
+        if cached is None:
+            return fresh
+        return cached.merge(fresh, self.settings.ingest_bars)
+
+    @staticmethod
+    def _watermark(window: CandleBatch, minutes: int, now: datetime, closes: datetime) -> Optional[int]:
+        """Start of the newest complete bar; forming bars are refetched next cycle. Every bar is complete after the close."""
+        closed_before = now.timestamp() if now >= closes else now.timestamp() - minutes * 60
+        complete = window.before(int(closed_before) + 1)
+        return complete.last_ts
+
+    def _derive(
+        self,
+        writes: "_Writes",
+        symbol: str,
+        timeframe: str,
+        base: CandleBatch,
+        changed_from: int,
+        now: datetime,
+    ) -> None:
+        """Rebuild ``timeframe`` bars touched by 5m candles from ``changed_from`` and merge them over history."""
+        changed = datetime.fromtimestamp(changed_from, tz=timezone.utc)
+        first_bar = bar_start(changed, timeframe_to_minutes(timeframe), self.settings)
+        bars = resample_candles(base.since(int(first_bar.timestamp())), timeframe, self.settings)
+        if not len(bars):
+            return
+        history, cached = self._history(symbol, timeframe, int(bars.ts[0]))
+        if len(history) + len(bars) < self.settings.compute_bars and (symbol, timeframe) not in self._backfilled:
+            # Not enough stored bars yet: backfill once with a native fetch. A failed
+            # fetch keeps this cycle's resampled bars and is retried next cycle.
+            try:
+                fetched = self._fetch(symbol, timeframe, self._window_start(timeframe, now), now)
+            except Exception as exc:
+                self.logger.warning(
+                    "Derived backfill failed",
                     extra={"symbol": symbol, "timeframe": timeframe, "error": str(exc)},
                 )
+            else:
+                self._backfilled.add((symbol, timeframe))
+                history, cached = fetched.before(int(bars.ts[0])), False
+                writes.upserts.append((symbol, timeframe, history))
 
-        self.logger.info("Ingestion complete", extra={"timeframe": timeframe})
+        if cached:
+            writes.add(symbol, timeframe, bars)
+        else:
+            window = CandleBatch.concat([history, bars]).tail(self.settings.ingest_bars)
+            writes.add(symbol, timeframe, bars, replace=True, window=window)
+
+    def _history(self, symbol: str, timeframe: str, before_ts: int) -> Tuple[CandleBatch, bool]:
+        """Stored bars before ``before_ts``, and whether they came from the cache."""
+        cached = self.candles.get(symbol, timeframe)
+        if cached is None:
+            stored = self.candle_repo.get_latest_candles(symbol, timeframe, self.settings.ingest_bars)
+            return stored.before(before_ts), False
+        return cached.before(before_ts), True
 
     def _symbols(self) -> List[str]:
-        stock_symbols = self.watch_stock_repo.get_active_symbols()
-        index_symbols = self.watch_index_repo.get_active_data_symbols()
+        if self.universe is not None:
+            universe = self.universe.get()
+            stock_symbols, index_symbols = universe.stock_symbols, universe.index_data_symbols
+        else:
+            stock_symbols = self.watch_stock_repo.get_active_symbols()
+            index_symbols = self.watch_index_repo.get_active_data_symbols()
+        benchmarks = self.settings.benchmark_symbols_list()
         symbols = set(stock_symbols)
         symbols.update(index_symbols)
-        symbols.update(self.settings.benchmark_symbols_list())
+        symbols.update(benchmarks)
+        if self.planner is not None:
+            return self.planner.order(sorted(symbols), benchmarks + sorted(index_symbols))
         return sorted(symbols)
 
-    @staticmethod
-    def _to_cache_payload(candles: List[dict]) -> Dict[str, List[float]]:
-        ts = np.array([int(c["ts"].timestamp()) for c in candles], dtype="int64")
-        return {
-            "ts": ts.tolist(),
-            "open": [c["open"] for c in candles],
-            "high": [c["high"] for c in candles],
-            "low": [c["low"] for c in candles],
-            "close": [c["close"] for c in candles],
-            "volume": [c["volume"] for c in candles],
-        }
+
+@dataclass
+class _Writes:
+    """DB rows, cache entries and dirty-set observations collected from fetched symbols."""
+
+    symbols: int = 0
+    upserts: List[Tuple[str, str, CandleBatch]] = field(default_factory=list)
+    bars: List[Tuple[str, str, CandleBatch, bool]] = field(default_factory=list)
+    cache: Dict[str, Any] = field(default_factory=dict)
+    latest: List[Tuple[str, str, dict]] = field(default_factory=list)
+
+    def add(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: CandleBatch,
+        replace: bool = False,
+        window: Optional[CandleBatch] = None,
+    ) -> None:
+        """
+        Upsert ``candles`` and report the newest one. The cached window gets ``candles``
+        from their first bar onwards, or is replaced by ``window`` (default ``candles``)
+        when ``replace`` is set.
+        """
+        self.upserts.append((symbol, timeframe, candles))
+        self.bars.append((symbol, timeframe, candles if window is None else window, replace))
+        self.latest.append((timeframe, symbol, candles.latest()))
+
+    def extend(self, other: "_Writes") -> None:
+        self.symbols += other.symbols
+        self.upserts.extend(other.upserts)
+        self.bars.extend(other.bars)
+        self.cache.update(other.cache)
+        self.latest.extend(other.latest)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from zoneinfo import ZoneInfo
 
 from app.core.config import Settings
@@ -33,6 +33,46 @@ def is_market_open(now: datetime, settings: Settings) -> bool:
     return open_time <= local.time() <= close_time
 
 
+def session_open(now: datetime, settings: Settings) -> datetime:
+    """Session open (market timezone) on the local trading date of ``now``."""
+    tz = ZoneInfo(settings.market_tz)
+    local = now.astimezone(tz)
+    return datetime.combine(local.date(), _parse_time(settings.market_open_time), tzinfo=tz)
+
+
+def session_close(now: datetime, settings: Settings) -> datetime:
+    """Session close (market timezone) on the local trading date of ``now``."""
+    tz = ZoneInfo(settings.market_tz)
+    local = now.astimezone(tz)
+    return datetime.combine(local.date(), _parse_time(settings.market_close_time), tzinfo=tz)
+
+
+def is_trading_day(now: datetime, settings: Settings) -> bool:
+    allowed_days = {DAY_MAP[d] for d in settings.market_days_list() if d in DAY_MAP}
+    return now.astimezone(ZoneInfo(settings.market_tz)).weekday() in allowed_days
+
+
+def bar_start(ts: datetime, minutes: int, settings: Settings) -> datetime:
+    """
+    Start of the ``minutes`` bar containing ``ts``. Intraday bars are anchored at the
+    session open (so 1h bars start at 09:15, 10:15, ...); daily bars start at the open.
+    """
+    opened = session_open(ts, settings)
+    if minutes >= 1440:
+        return opened
+    elapsed = (ts - opened).total_seconds()
+    bars = max(0, int(elapsed // (minutes * 60)))
+    return opened + timedelta(minutes=bars * minutes)
+
+
+def next_bar_close(now: datetime, minutes: int, settings: Settings) -> datetime:
+    """First bar boundary after ``now``, with intraday bars anchored at the session open."""
+    opened = session_open(now, settings)
+    elapsed = (now - opened).total_seconds()
+    bars = int(elapsed // (minutes * 60)) + 1
+    return opened + timedelta(minutes=bars * minutes)
+
+
 def _parse_time(value: str) -> time:
     hour, minute = value.split(":")
     return time(int(hour), int(minute))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, Optional
+
+
+class PipelineLatency:
+    """
+    Bar-close to broadcast latency per timeframe.
+
+    Only the first broadcast that includes a newly closed bar is recorded, so
+    recomputes of a still-forming bar do not inflate the numbers.
+    """
+
+    def __init__(self, window: int = 500) -> None:
+        self.window = window
+        self._lock = Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._last_close: Dict[str, float] = {}
+
+    def observe(self, timeframe: str, latest_bar_ts: int, minutes: int, published_at: float) -> Optional[float]:
+        """
+        Record latency for the newest closed bar given the latest bar start in the data.
+
+        A bar starting at ``ts`` closes at ``ts + minutes``; if that is still in the
+        future the bar is forming and the newest closed bar ended at ``ts``.
+        """
+        bar_close = float(latest_bar_ts + minutes * 60)
+        if bar_close > published_at:
+            bar_close = float(latest_bar_ts)
+        with self._lock:
+            if bar_close <= self._last_close.get(timeframe, float("-inf")):
+                return None
+            self._last_close[timeframe] = bar_close
+            latency = published_at - bar_close
+            self._samples.setdefault(timeframe, deque(maxlen=self.window)).append(latency)
+            return latency
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            out = {}
+            for timeframe, samples in self._samples.items():
+                ordered = sorted(samples)
+                out[timeframe] = {
+                    "last_bar_close": self._last_close[timeframe],
+                    "last_sec": samples[-1],
+                    "samples": len(ordered),
+                    "p50_sec": _percentile(ordered, 0.50),
+                    "p95_sec": _percentile(ordered, 0.95),
+                    "max_sec": ordered[-1],
+                }
+            return out
+
+
+def _percentile(ordered, q: float) -> float:
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
@@ -1,42 +1,197 @@
 from __future__ import annotations
 
+import asyncio
 import time
-from collections import deque
+from dataclasses import dataclass
 from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from app.core.logging import get_logger
+
+
+class TokenBucket:
+    """
+    ``capacity`` tokens refilled at ``rate`` per second.
+
+    Tokens are reserved rather than waited for: ``available_at`` says when the next
+    token exists and ``consume`` takes it at that (possibly future) time, so a backlog
+    of reservations is just ``updated`` running ahead of the clock.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"TokenBucket needs rate > 0 and capacity >= 1, got {rate}, {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated: Optional[float] = None
+
+    def available_at(self, now: float) -> float:
+        if self.updated is None:
+            return now
+        at = max(now, self.updated)
+        tokens = self._tokens_at(at)
+        if tokens >= 1:
+            return at
+        return at + (1 - tokens) / self.rate
+
+    def consume(self, at: float) -> None:
+        self.tokens = (self._tokens_at(at) if self.updated is not None else self.capacity) - 1
+        self.updated = at
+
+    def refund(self) -> None:
+        """Return one reserved token, e.g. when its caller gave up waiting."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def settle(self, now: float) -> None:
+        """Credit tokens accrued at the current rate up to ``now``, before the rate changes."""
+        if self.updated is None:
+            return
+        at = max(now, self.updated)
+        self.tokens = self._tokens_at(at)
+        self.updated = at
+
+    def _tokens_at(self, at: float) -> float:
+        return min(self.capacity, self.tokens + (at - self.updated) * self.rate)
+
+
+def parse_endpoint_limits(spec: str) -> Dict[str, float]:
+    """``"candles:8,quote:5"`` -> calls per second allowed per endpoint, on top of the global limits."""
+    limits: Dict[str, float] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        endpoint, _, rate = item.partition(":")
+        try:
+            value = float(rate)
+        except ValueError:
+            value = 0.0
+        if not endpoint.strip() or value <= 0:
+            raise ValueError(f"Invalid endpoint rate limit {item!r}; expected <endpoint>:<calls per sec> > 0")
+        limits[endpoint.strip()] = value
+    return limits
+
+
+@dataclass
+class WaitStats:
+    acquired: int = 0
+    throttled: int = 0
+    total_wait_sec: float = 0.0
+    max_wait_sec: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.acquired += 1
+        if wait > 0:
+            self.throttled += 1
+            self.total_wait_sec += wait
+            self.max_wait_sec = max(self.max_wait_sec, wait)
 
 
 class RateLimiter:
-    def __init__(self, max_per_sec: int, max_per_min: int) -> None:
+    """
+    Per-second and per-minute token buckets, plus optional per-endpoint buckets.
+
+    A caller reserves one token from every applicable bucket under the lock, at the
+    earliest time all of them allow, then sleeps (or awaits) outside the lock. Slots
+    are handed out in reservation order, so waiters are served FIFO and never hold
+    up callers that only need to reserve. ``burst`` is the bucket capacity; the
+    default of 1 spaces calls evenly at the configured rate.
+    """
+
+    def __init__(
+        self,
+        max_per_sec: int,
+        max_per_min: int,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self.max_per_sec = max_per_sec
         self.max_per_min = max_per_min
+        self._clock = clock
         self._lock = Lock()
-        self._calls_sec = deque()
-        self._calls_min = deque()
+        self._buckets: List[TokenBucket] = [
+            TokenBucket(max_per_sec, min(burst, max_per_sec)),
+            TokenBucket(max_per_min / 60.0, min(burst, max_per_min)),
+        ]
+        self._base_rates = [bucket.rate for bucket in self._buckets]
+        self.rate_factor = 1.0
+        self._endpoint_buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, WaitStats] = {}
+        self.logger = get_logger(self.__class__.__name__)
+
+    def add_endpoint(self, endpoint: str, max_per_sec: float, burst: int = 1) -> None:
+        """Apply an extra limit to calls made with ``endpoint``, on top of the global ones."""
+        with self._lock:
+            self._endpoint_buckets[endpoint] = TokenBucket(max_per_sec, burst)
+
+    def set_rate_factor(self, factor: float) -> None:
+        """
+        Scale the per-second and per-minute rates, e.g. to back off after throttling.
+        Tokens earned so far are credited at the old rate; only the future uses the new one.
+        """
+        if factor <= 0:
+            raise ValueError(f"rate factor must be > 0, got {factor}")
+        with self._lock:
+            now = self._clock()
+            self.rate_factor = factor
+            for bucket, base in zip(self._buckets, self._base_rates):
+                bucket.settle(now)
+                bucket.rate = base * factor
+
+    def acquire(self, endpoint: Optional[str] = None) -> float:
+        """Block until a call is allowed; returns the seconds waited."""
+        wait = self._reserve(endpoint)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, endpoint: Optional[str] = None) -> float:
+        """
+        ``acquire`` for event-loop code; the wait is an ``asyncio.sleep``. A caller
+        cancelled while waiting hands its reserved token back.
+        """
+        wait = self._reserve(endpoint)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._release(endpoint)
+                raise
+        return wait
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "acquired": s.acquired,
+                    "throttled": s.throttled,
+                    "total_wait_sec": s.total_wait_sec,
+                    "max_wait_sec": s.max_wait_sec,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def _applicable(self, endpoint: Optional[str]) -> List[TokenBucket]:
+        buckets = list(self._buckets)
+        if endpoint in self._endpoint_buckets:
+            buckets.append(self._endpoint_buckets[endpoint])
+        return buckets
+
+    def _release(self, endpoint: Optional[str]) -> None:
+        with self._lock:
+            for bucket in self._applicable(endpoint):
+                bucket.refund()
 
-    def acquire(self) -> None:
+    def _reserve(self, endpoint: Optional[str]) -> float:
         with self._lock:
-            now = time.monotonic()
-            self._cleanup(now)
-
-            if len(self._calls_sec) >= self.max_per_sec:
-                sleep_for = 1.0 - (now - self._calls_sec[0])
-                if sleep_for > 0:
-                    time.sleep(sleep_for)
-                now = time.monotonic()
-                self._cleanup(now)
-
-            if len(self._calls_min) >= self.max_per_min:
-                sleep_for = 60.0 - (now - self._calls_min[0])
-                if sleep_for > 0:
-                    time.sleep(sleep_for)
-                now = time.monotonic()
-                self._cleanup(now)
-
-            self._calls_sec.append(now)
-            self._calls_min.append(now)
-
-    def _cleanup(self, now: float) -> None:
-        while self._calls_sec and (now - self._calls_sec[0]) > 1.0:
-            self._calls_sec.popleft()
-        while self._calls_min and (now - self._calls_min[0]) > 60.0:
-            self._calls_min.popleft()
+            now = self._clock()
+            buckets = self._applicable(endpoint)
+            at = max(bucket.available_at(now) for bucket in buckets)
+            for bucket in buckets:
+                bucket.consume(at)
+            wait = at - now
+            self._stats.setdefault(endpoint or "default", WaitStats()).record(wait)
+        if wait > 1.0:
+            self.logger.info("Rate limited", extra={"endpoint": endpoint, "wait_sec": round(wait, 3)})
+        return wait
@@ -6,12 +6,14 @@ from typing import Dict, List, Optional
 import numpy as np
 
 from app.core.config import Settings
-from app.domain.alignment import align_ohlcv
+from app.domain.alignment import align_many
+from app.domain.indicators.context import SeriesContextCache
 from app.domain.indicators.rrs_rrv_rve import classify, rrs, rrv, rve
 from app.infra.cache.redis_cache import RedisCache
 from app.infra.db.repositories import CandleRepository, TickerIndexRepository, WatchIndexRepository
 from app.services.candles_repo import CandlesRepo
 from app.services.indices import get_associated_indices
+from app.services.universe import UniverseCache
 
 
 class RelativeMetricsService:
@@ -22,11 +24,13 @@ class RelativeMetricsService:
         ticker_index_repo: TickerIndexRepository,
         watch_index_repo: WatchIndexRepository,
         cache: RedisCache,
+        universe: Optional[UniverseCache] = None,
     ) -> None:
         self.settings = settings
         self.ticker_index_repo = ticker_index_repo
         self.watch_index_repo = watch_index_repo
         self.cache = cache
+        self.universe = universe
         self.candles_repo = CandlesRepo(candle_repo, cache)
 
     def get_metrics(self, symbol: str, timeframe: str, lookback: int) -> dict:
@@ -36,8 +40,11 @@ class RelativeMetricsService:
             return cached
 
         stock_symbol = symbol.strip().upper()
-        indices = get_associated_indices(stock_symbol, self.settings, self.ticker_index_repo)
-        index_map = self.watch_index_repo.get_active_mappings()
+        indices = get_associated_indices(stock_symbol, self.settings, self.ticker_index_repo, self.universe)
+        if self.universe is not None:
+            index_map = self.universe.get().index_map
+        else:
+            index_map = self.watch_index_repo.get_active_mappings()
 
         data_symbols = {stock_symbol}
         for idx in indices:
@@ -46,6 +53,7 @@ class RelativeMetricsService:
         candles = self.candles_repo.get_candles(sorted(data_symbols), timeframe, lookback)
         stock_data = candles.get(stock_symbol)
 
+        contexts = SeriesContextCache(align_many(candles))
         rows: List[dict] = []
         for idx in indices:
             data_symbol = index_map.get(idx, idx)
@@ -65,7 +73,14 @@ class RelativeMetricsService:
                 )
                 continue
 
-            metric = compute_relative_metrics(stock_data, bench_data)
+            metric = compute_relative_metrics(
+                stock_data,
+                bench_data,
+                contexts=contexts,
+                stock_symbol=stock_symbol,
+                bench_symbol=data_symbol,
+                timeframe=timeframe,
+            )
             if metric is None:
                 rows.append(
                     {
@@ -106,17 +121,28 @@ class RelativeMetricsService:
 def compute_relative_metrics(
     stock_data: Dict[str, np.ndarray],
     bench_data: Dict[str, np.ndarray],
+    *,
+    contexts: Optional[SeriesContextCache] = None,
+    stock_symbol: str = "stock",
+    bench_symbol: str = "benchmark",
+    timeframe: str = "",
 ) -> Optional[dict]:
-    sym_aligned, ben_aligned, common_ts = align_ohlcv(stock_data, bench_data)
+    """
+    Latest RRS/RRV/RVE of ``stock_data`` vs ``bench_data``.
+
+    Pass a shared ``contexts`` cache (with the symbols and timeframe that identify the
+    series) to reuse the stock's ATR and volume transforms across several benchmarks.
+    Contexts are keyed by symbol, so the two names must differ for different data.
+    """
+    if contexts is None:
+        contexts = SeriesContextCache()
+    sym_ctx, ben_ctx, common_ts = contexts.align(stock_symbol, bench_symbol, timeframe, stock_data, bench_data)
     if common_ts.size < 30:
         return None
 
-    sym_ohlc = {k: sym_aligned[k] for k in ["high", "low", "close"]}
-    ben_ohlc = {k: ben_aligned[k] for k in ["high", "low", "close"]}
-
-    rrs_series = rrs(sym_ohlc, ben_ohlc, length=12)
-    rrv_series = rrv(sym_aligned["volume"], ben_aligned["volume"], length=12, smooth=3, use_log=True)
-    rve_series = rve(sym_ohlc, ben_ohlc, length=12, atr_period=14, smooth_atr=1)
+    rrs_series = rrs(sym_ctx, ben_ctx, length=12)
+    rrv_series = rrv(sym_ctx, ben_ctx, length=12, smooth=3, use_log=True)
+    rve_series = rve(sym_ctx, ben_ctx, length=12, atr_period=14, smooth_atr=1)
 
     rrs_val = float(rrs_series[-1])
     rrv_val = float(rrv_series[-1])
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.config import Settings
+from app.domain.candles import CandleBatch
+from app.services.market_hours import session_open
+from app.services.timeframes import timeframe_to_minutes
+
+BASE_TIMEFRAME = "5m"
+
+_EPOCH = date(1970, 1, 1)
+
+
+def resample_candles(candles: CandleBatch, timeframe: str, settings: Settings) -> CandleBatch:
+    """
+    Aggregate 5m candles (sorted by ts) into ``timeframe`` bars aligned to NSE sessions.
+
+    The first bar is dropped when the input starts after its open, since bars before
+    the window are missing from it. The last bar may still be forming, the same as a
+    native fetch during the session.
+    """
+    if not len(candles):
+        return CandleBatch.empty(source="resample")
+    starts = bar_starts(candles.ts, timeframe_to_minutes(timeframe), settings)
+    if candles.ts[0] > starts[0]:
+        partial = int(np.searchsorted(starts, starts[0], side="right"))
+        candles, starts = candles[partial:], starts[partial:]
+        if not len(candles):
+            return CandleBatch.empty(source="resample")
+
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:] - 1, len(starts) - 1]
+    return CandleBatch(
+        starts[first],
+        candles.open[first],
+        np.maximum.reduceat(candles.high, first),
+        np.minimum.reduceat(candles.low, first),
+        candles.close[last],
+        np.add.reduceat(candles.volume, first),
+        source="resample",
+    )
+
+
+def bar_starts(ts: np.ndarray, minutes: int, settings: Settings) -> np.ndarray:
+    """
+    Epoch-second start of the ``minutes`` bar containing each ``ts``, the vector form
+    of ``market_hours.bar_start``: anchored at the session open of the bar's local
+    date, and the open itself for daily bars.
+    """
+    tz = ZoneInfo(settings.market_tz)
+    offsets = np.array([_utc_offset(int(t), tz) for t in (ts[0], ts[-1])])
+    if offsets[0] == offsets[1]:
+        local_days = (ts + offsets[0]) // 86400
+    else:
+        # The window crosses a UTC offset change; resolve each bar's local date.
+        local_days = (ts + np.array([_utc_offset(int(t), tz) for t in ts.tolist()])) // 86400
+    days, index = np.unique(local_days, return_inverse=True)
+    noons = [datetime.combine(_EPOCH + timedelta(days=int(day)), time(12), tzinfo=tz) for day in days]
+    opens = np.array([session_open(noon, settings).timestamp() for noon in noons], dtype=np.int64)[index]
+    if minutes >= 1440:
+        return opens
+    step = minutes * 60
+    return opens + np.maximum(0, (ts - opens) // step) * step
+
+
+def _utc_offset(ts: int, tz: ZoneInfo) -> int:
+    return int(datetime.fromtimestamp(ts, tz=tz).utcoffset().total_seconds())
@@ -1,25 +1,46 @@
 from __future__ import annotations
 
+import random
 import time
-from typing import Callable, TypeVar
+from typing import Callable, Optional, TypeVar
 
 T = TypeVar("T")
 
 
 class RetryPolicy:
-    def __init__(self, max_attempts: int, base_delay: float, max_delay: float) -> None:
+    """
+    Retries with decorrelated jitter: each delay is drawn from
+    ``uniform(base_delay, 3 * previous_delay)`` and capped at ``max_delay``, so
+    callers that failed together do not retry in lockstep. ``retry_on`` decides
+    which exceptions are worth another attempt; by default all are.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        retry_on: Optional[Callable[[Exception], bool]] = None,
+    ) -> None:
         self.max_attempts = max_attempts
         self.base_delay = base_delay
         self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def next_delay(self, previous: float) -> float:
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
 
     def run(self, func: Callable[..., T], *args, **kwargs) -> T:
         attempt = 0
+        delay = self.base_delay
         while True:
             try:
                 return func(*args, **kwargs)
-            except Exception:
+            except Exception as exc:
                 attempt += 1
                 if attempt >= self.max_attempts:
                     raise
-                delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+                if self.retry_on is not None and not self.retry_on(exc):
+                    raise
+                delay = self.next_delay(delay)
                 time.sleep(delay)
@@ -1,34 +1,86 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timezone
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 from app.core.config import Settings
 from app.core.logging import get_logger
-from app.services.market_hours import is_market_open
+from app.infra.db.partitions import CandlePartitions
+from app.services.ingest_planner import IngestPlanner
+from app.services.market_hours import is_market_open, next_bar_close
+from app.services.resample import BASE_TIMEFRAME
+from app.services.timeframes import TIMEFRAME_MINUTES
+
+# How long after the session close a planned pipeline keeps running for the last bars.
+_CLOSE_TAIL_SEC = 60
+# Candle partitions are created months ahead, so a daily pass is plenty.
+_PARTITION_MAINTENANCE_SEC = 86400
 
 
 class Scheduler:
-    def __init__(self, settings: Settings, ingestion, compute) -> None:
+    """
+    Runs ingestion and compute per timeframe.
+
+    In ``pipeline`` mode (``SCHEDULER_MODE``) ingestion wakes shortly after each bar
+    close and a finished ingestion cycle signals the matching compute; the compute
+    interval only acts as a fallback timer. ``timer`` mode runs both loops on their
+    fixed intervals.
+
+    With a planner, pipeline-mode ingestion only fetches symbols that are behind the
+    newest closed bar; the ingest interval then just retries bars Groww had not
+    published yet, and daily bars are fetched once after the session close.
+
+    With ``partitions``, candle partition maintenance and retention run at start-up
+    and then daily.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        ingestion,
+        compute,
+        planner: Optional[IngestPlanner] = None,
+        partitions: Optional[CandlePartitions] = None,
+    ) -> None:
         self.settings = settings
         self.ingestion = ingestion
         self.compute = compute
+        self.planner = planner
+        self.partitions = partitions
         self._tasks: List[asyncio.Task] = []
         self._stop_event = asyncio.Event()
         self._ingest_lock = asyncio.Lock()
         self._compute_lock = asyncio.Lock()
+        self._ingested: Dict[str, asyncio.Event] = {}
         self.logger = get_logger(self.__class__.__name__)
 
+    @property
+    def pipeline(self) -> bool:
+        return self.settings.scheduler_mode == "pipeline"
+
     def start(self) -> None:
         if self._tasks:
             return
         self._stop_event.clear()
 
-        for timeframe in self.settings.timeframes():
-            self.logger.info("Scheduler loop start", extra={"timeframe": timeframe})
+        timeframes = self.settings.timeframes()
+        # Derived timeframes are refreshed by the 5m ingestion loop, not fetched themselves.
+        derived = self.settings.derived_timeframes()
+        ingest = self.settings.ingest_timeframes()
+
+        for timeframe in set(timeframes) | set(ingest):
+            self._ingested[timeframe] = asyncio.Event()
+        for timeframe in ingest:
             self._tasks.append(asyncio.create_task(self._ingest_loop(timeframe)))
+        for timeframe in timeframes:
+            self.logger.info(
+                "Scheduler loop start",
+                extra={"timeframe": timeframe, "mode": self.settings.scheduler_mode, "derived": timeframe in derived},
+            )
             self._tasks.append(asyncio.create_task(self._compute_loop(timeframe)))
+        if self.partitions is not None:
+            self._tasks.append(asyncio.create_task(self._partition_loop()))
 
     async def stop(self) -> None:
         self._stop_event.set()
@@ -41,20 +93,75 @@ class Scheduler:
         interval = self.settings.scheduler_ingest_interval_sec
         while not self._stop_event.is_set():
             now = datetime.now(timezone.utc)
-            if is_market_open(now, self.settings):
+            if self._session_active(now):
                 async with self._ingest_lock:
-                    await asyncio.to_thread(self.ingestion.run_once, timeframe)
+                    if self.pipeline and self.planner is not None:
+                        await asyncio.to_thread(self.ingestion.run_once, timeframe, True)
+                    else:
+                        await asyncio.to_thread(self.ingestion.run_once, timeframe)
+                if self.pipeline:
+                    self._ingested[timeframe].set()
+                    if timeframe == BASE_TIMEFRAME:
+                        for derived in self.settings.derived_timeframes():
+                            self._ingested[derived].set()
             else:
                 self.logger.info("Market closed, skipping ingestion", extra={"timeframe": timeframe})
-            await asyncio.sleep(interval)
+            await asyncio.sleep(self._ingest_delay(timeframe, interval))
 
     async def _compute_loop(self, timeframe: str) -> None:
         interval = self.settings.scheduler_compute_interval_sec
         while not self._stop_event.is_set():
+            if self.pipeline:
+                trigger = await self._wait_for_ingestion(timeframe, interval)
+            else:
+                trigger = "timer"
             now = datetime.now(timezone.utc)
-            if is_market_open(now, self.settings):
+            if self._session_active(now):
                 async with self._compute_lock:
+                    self.logger.info("Compute triggered", extra={"timeframe": timeframe, "trigger": trigger})
                     await asyncio.to_thread(self.compute.compute_timeframe, timeframe)
             else:
                 self.logger.info("Market closed, skipping compute", extra={"timeframe": timeframe})
-            await asyncio.sleep(interval)
+            if not self.pipeline:
+                await asyncio.sleep(interval)
+
+    async def _partition_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.to_thread(self.partitions.maintain)
+            except Exception as exc:
+                self.logger.exception("Candle partition maintenance failed", extra={"error": str(exc)})
+            await asyncio.sleep(_PARTITION_MAINTENANCE_SEC)
+
+    async def _wait_for_ingestion(self, timeframe: str, timeout: float) -> str:
+        event = self._ingested[timeframe]
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            trigger = "ingestion"
+        except asyncio.TimeoutError:
+            trigger = "fallback"
+        event.clear()
+        return trigger
+
+    def _session_active(self, now: datetime) -> bool:
+        """Market hours, extended past the close with a planner so the session's last bars are still collected."""
+        if is_market_open(now, self.settings):
+            return True
+        if not self.pipeline or self.planner is None:
+            return False
+        tail = timedelta(seconds=self.settings.scheduler_bar_close_grace_sec + _CLOSE_TAIL_SEC)
+        return is_market_open(now - tail, self.settings)
+
+    def _ingest_delay(self, timeframe: str, interval: float) -> float:
+        """Sleep until the next bar close (plus grace) when that comes before ``interval``."""
+        minutes = TIMEFRAME_MINUTES.get(timeframe)
+        if not self.pipeline or minutes is None:
+            return interval
+        now = datetime.now(timezone.utc)
+        if self.planner is not None:
+            until_run = (self.planner.next_run(now, timeframe) - now).total_seconds()
+            return max(0.0, min(interval, until_run))
+        if minutes >= 1440:
+            return interval
+        until_close = (next_bar_close(now, minutes, self.settings) - now).total_seconds()
+        return max(0.0, min(interval, until_close + self.settings.scheduler_bar_close_grace_sec))
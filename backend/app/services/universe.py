@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.infra.cache.redis_cache import RedisCache
+from app.infra.db.repositories import TickerIndexRepository, WatchIndexRepository, WatchStockRepository
+
+VERSION_KEY = "universe:version"
+CHANNEL = "universe:changed"
+
+
+@dataclass(frozen=True)
+class UniverseSnapshot:
+    """Active watchlist and index mappings as of one ``universe:version``."""
+
+    version: int
+    stock_symbols: Tuple[str, ...]
+    # Active index symbol -> symbol its candles are stored under.
+    index_map: Dict[str, str]
+    # Stock symbol -> sorted index symbols from ticker_index.
+    stock_indices: Dict[str, List[str]]
+
+    @property
+    def index_data_symbols(self) -> List[str]:
+        return list(self.index_map.values())
+
+    def indices_for_stock(self, symbol: str) -> List[str]:
+        return list(self.stock_indices.get(symbol, []))
+
+    @classmethod
+    def load(
+        cls,
+        version: int,
+        watch_stock_repo: WatchStockRepository,
+        watch_index_repo: WatchIndexRepository,
+        ticker_index_repo: TickerIndexRepository,
+    ) -> "UniverseSnapshot":
+        return cls(
+            version=version,
+            stock_symbols=tuple(watch_stock_repo.get_active_symbols()),
+            index_map=dict(watch_index_repo.get_active_mappings()),
+            stock_indices={stock: sorted(indices) for stock, indices in ticker_index_repo.get_mappings().items()},
+        )
+
+
+class UniverseCache:
+    """
+    Process-local ``UniverseSnapshot``, loaded on first use and reused until invalidated.
+
+    Admin writes call ``bump``, which increments ``universe:version`` in Redis and
+    publishes it on ``universe:changed``; every process listening on that channel drops
+    its snapshot and reloads on the next ``get``. ``max_age_sec`` bounds staleness if a
+    message is missed (e.g. while Redis was down).
+    """
+
+    def __init__(
+        self,
+        watch_stock_repo: WatchStockRepository,
+        watch_index_repo: WatchIndexRepository,
+        ticker_index_repo: TickerIndexRepository,
+        cache: RedisCache,
+        max_age_sec: float = 300.0,
+    ) -> None:
+        self.watch_stock_repo = watch_stock_repo
+        self.watch_index_repo = watch_index_repo
+        self.ticker_index_repo = ticker_index_repo
+        self.cache = cache
+        self.max_age_sec = max_age_sec
+        self._lock = Lock()
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._loaded_at = 0.0
+        # Bumped on every invalidation; a load started before one is not kept.
+        self._generation = 0
+        self._snapshot_generation = -1
+        self._listener: Any = None
+        self.logger = get_logger(self.__class__.__name__)
+
+    def get(self) -> UniverseSnapshot:
+        with self._lock:
+            snapshot = self._snapshot
+            generation = self._generation
+            if (
+                snapshot is not None
+                and self._snapshot_generation == generation
+                and time.monotonic() - self._loaded_at < self.max_age_sec
+            ):
+                return snapshot
+
+        version = self.cache.get_json(VERSION_KEY) or 0
+        snapshot = UniverseSnapshot.load(int(version), self.watch_stock_repo, self.watch_index_repo, self.ticker_index_repo)
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._snapshot_generation = generation
+                self._loaded_at = time.monotonic()
+        self.logger.info(
+            "Universe loaded",
+            extra={"version": snapshot.version, "stocks": len(snapshot.stock_symbols), "indices": len(snapshot.index_map)},
+        )
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    def bump(self) -> None:
+        """Record a watchlist/mapping change here and in every subscribed process."""
+        self.invalidate()
+        version = self.cache.incr(VERSION_KEY)
+        self.cache.publish(CHANNEL, str(version or 0))
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = self.cache.subscribe(CHANNEL, self._on_message)
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _on_message(self, message: dict) -> None:
+        self.invalidate()
+        self.logger.info("Universe invalidated", extra={"version": message.get("data")})
@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.domain.candles import CandleBatch
+from app.infra.cache.candle_codec import decode_candles, encode_candles
+
+BARS = [50, 220, 2_000]
+SYMBOLS = 500
+
+
+def _batch(n: int, rng: np.random.Generator) -> CandleBatch:
+    close = 1000.0 + np.cumsum(rng.normal(0.0, 2.0, n))
+    return CandleBatch(
+        1_700_000_000 + 300 * np.arange(n),
+        close + rng.normal(0.0, 0.5, n),
+        close + rng.random(n) * 3,
+        close - rng.random(n) * 3,
+        close,
+        rng.integers(1_000, 500_000, n).astype(float),
+    )
+
+
+def _decode_json(data: bytes) -> dict:
+    """What compute did before: json.loads plus one np.asarray per column."""
+    payload = json.loads(data)
+    return {key: np.asarray(value, dtype="int64" if key == "ts" else float) for key, value in payload.items()}
+
+
+def _best_of(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def run() -> None:
+    rng = np.random.default_rng(0)
+    print(
+        f"{'bars':>6} {'json B':>9} {'binary B':>9} {'size':>6} "
+        f"{'json dec (us)':>14} {'bin dec (us)':>13} {'speedup':>8}"
+    )
+    for n in BARS:
+        batch = _batch(n, rng)
+        as_json = json.dumps(batch.to_payload()).encode()
+        as_binary = encode_candles(batch)
+        assert decode_candles(as_binary) == batch
+        number = max(10, 200_000 // n)
+        json_t = _best_of(lambda: _decode_json(as_json), number)
+        bin_t = _best_of(lambda: decode_candles(as_binary), number)
+        print(
+            f"{n:>6} {len(as_json):>9} {len(as_binary):>9} {len(as_binary) / len(as_json):>5.0%} "
+            f"{json_t * 1e6:>14.1f} {bin_t * 1e6:>13.1f} {json_t / bin_t:>7.1f}x"
+        )
+
+    # One compute cycle's MGET result: SYMBOLS windows of 220 bars.
+    windows = [_batch(220, rng) for _ in range(SYMBOLS)]
+    as_json = [json.dumps(b.to_payload()).encode() for b in windows]
+    as_binary = [encode_candles(b) for b in windows]
+    json_t = _best_of(lambda: [_decode_json(v) for v in as_json], 3)
+    bin_t = _best_of(lambda: [decode_candles(v) for v in as_binary], 3)
+    print(
+        f"{SYMBOLS}x220 cycle: json {sum(map(len, as_json)) / 1e6:.2f} MB in {json_t * 1e3:.1f} ms, "
+        f"binary {sum(map(len, as_binary)) / 1e6:.2f} MB in {bin_t * 1e3:.2f} ms, {json_t / bin_t:.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import sys
+import timeit
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import BigInteger, cast, delete, func, select
+
+from app.core.config import Settings
+from app.domain.candles import CandleBatch
+from app.infra.db.models import Candle
+from app.infra.db.repositories import LATEST_ROW_DTYPE, CandleRepository, split_latest_rows
+from app.infra.db.session import Database
+
+SYMBOLS = 500
+BARS = 200
+PREFIX = "__BENCH_"
+
+
+def _rows(rng: np.random.Generator) -> List[tuple]:
+    """(symbol, epoch, OHLCV) rows grouped by symbol, as the windowed query returns them."""
+    rows = []
+    for i in range(SYMBOLS):
+        close = 1000.0 + np.cumsum(rng.normal(0.0, 2.0, BARS))
+        ts = 1_700_000_000 + 300 * np.arange(BARS)
+        columns = (ts, close, close + 1, close - 1, close, np.full(BARS, 1e5))
+        rows.extend((f"{PREFIX}{i:04d}",) + row for row in zip(*(column.tolist() for column in columns)))
+    return rows
+
+
+def _split_window_rows(rows: List[tuple]) -> Dict[str, CandleBatch]:
+    """The previous decode: one float matrix from the row tuples, split at symbol changes in Python."""
+    symbol_col = [row[0] for row in rows]
+    values = np.array([row[1:] for row in rows], dtype=np.float64)
+    starts = [0] + [i for i in range(1, len(symbol_col)) if symbol_col[i] != symbol_col[i - 1]]
+    ends = starts[1:] + [len(symbol_col)]
+    return {
+        symbol_col[start]: CandleBatch(values[start:end, 0].astype(np.int64), *values[start:end, 1:].T, source="db")
+        for start, end in zip(starts, ends)
+    }
+
+
+def _window_query(symbols: List[str], timeframe: str, limit: int):
+    """The previous plan: ROW_NUMBER() over every row of the requested symbols."""
+    row_number = func.row_number().over(partition_by=Candle.symbol, order_by=Candle.ts.desc()).label("rn")
+    subq = (
+        select(
+            Candle.symbol,
+            cast(func.extract("epoch", Candle.ts), BigInteger).label("epoch"),
+            Candle.open,
+            Candle.high,
+            Candle.low,
+            Candle.close,
+            Candle.volume,
+            row_number,
+        )
+        .where(Candle.symbol.in_(symbols), Candle.timeframe == timeframe)
+        .subquery()
+    )
+    return (
+        select(subq.c.symbol, subq.c.epoch, subq.c.open, subq.c.high, subq.c.low, subq.c.close, subq.c.volume)
+        .where(subq.c.rn <= limit)
+        .order_by(subq.c.symbol.asc(), subq.c.epoch.asc())
+    )
+
+
+def _best_of(target, number: int = 1, repeat: int = 5) -> float:
+    return min(timeit.repeat(target, number=number, repeat=repeat)) / number
+
+
+def bench_decode(rng: np.random.Generator) -> None:
+    rows = _rows(rng)
+    symbols = list(dict.fromkeys(row[0] for row in rows))
+    position = {symbol: i + 1 for i, symbol in enumerate(symbols)}
+    numeric = [(position[row[0]],) + row[1:] for row in rows]
+
+    old = _split_window_rows(rows)
+    new = split_latest_rows(np.fromiter(iter(numeric), dtype=LATEST_ROW_DTYPE), symbols)
+    assert old.keys() == new.keys() and all(old[s] == new[s] for s in symbols)
+
+    old_t = _best_of(lambda: _split_window_rows(rows))
+    new_t = _best_of(lambda: split_latest_rows(np.fromiter(iter(numeric), dtype=LATEST_ROW_DTYPE), symbols))
+    print(f"decode {SYMBOLS}x{BARS}: matrix split {old_t * 1e3:.1f} ms, structured fromiter {new_t * 1e3:.1f} ms")
+
+
+def bench_db(rng: np.random.Generator) -> None:
+    """Seeds ``__BENCH_*`` symbols into the configured database, times both paths, then removes them."""
+    db = Database(Settings().database_url)
+    repo = CandleRepository(db)
+    rows = _rows(rng)
+    symbols = list(dict.fromkeys(row[0] for row in rows))
+    batches = [
+        (symbol, "5m", CandleBatch.from_rows([row[1:] for row in rows[i * BARS : (i + 1) * BARS]]))
+        for i, symbol in enumerate(symbols)
+    ]
+    repo.upsert_candles_many(batches)
+    try:
+        def window() -> Dict[str, CandleBatch]:
+            with db.session() as session:
+                return _split_window_rows([tuple(r) for r in session.execute(_window_query(symbols, "5m", BARS))])
+
+        # Unbounded, as both plans would read for data older than the lookback.
+        def lateral() -> Dict[str, CandleBatch]:
+            return repo._latest_candles(symbols, "5m", BARS, None)
+
+        assert window().keys() == lateral().keys()
+        old_t = _best_of(window, repeat=3)
+        new_t = _best_of(lateral, repeat=3)
+        print(
+            f"db {SYMBOLS}x{BARS}: row_number {old_t * 1e3:.1f} ms, "
+            f"lateral + fromiter {new_t * 1e3:.1f} ms, {old_t / new_t:.1f}x"
+        )
+    finally:
+        with db.session() as session:
+            session.execute(delete(Candle).where(Candle.symbol.like(f"{PREFIX}%")))
+        db.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latest-candle read benchmark")
+    parser.add_argument("--db", action="store_true", help="also time both queries against DATABASE_URL")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    bench_decode(rng)
+    if args.db:
+        bench_db(rng)
+
+
+if __name__ == "__main__":
+    main()
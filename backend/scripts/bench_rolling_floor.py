@@ -0,0 +1,47 @@
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.domain.indicators.rrs_rrv_rve import rolling_floor
+
+WINDOW = 252
+# (label, shape, leading NaN bars): the NaN head mimics rolling moves before warm-up.
+CASES = [
+    ("daily 1x2500", (1, 2_500), 0),
+    ("daily 1x2500 nan head", (1, 2_500), 20),
+    ("batch 50x1000", (50, 1_000), 0),
+    ("batch 50x1000 nan head", (50, 1_000), 20),
+]
+
+
+def _best_of(func, number: int = 1, repeat: int = 3) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def run() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'case':>24} {'method':>9} {'windowed (ms)':>14} {'blocked (ms)':>13} {'speedup':>8}")
+    for label, shape, nan_head in CASES:
+        series = np.abs(rng.normal(0.0, 5.0, shape))
+        series[:, :nan_head] = np.nan
+        for method in ("quantile", "median"):
+            blocked = f"{method}_blocked"
+            assert np.array_equal(
+                rolling_floor(series, method=method, window=WINDOW),
+                rolling_floor(series, method=blocked, window=WINDOW),
+                equal_nan=True,
+            )
+            windowed_t = _best_of(lambda: rolling_floor(series, method=method, window=WINDOW))
+            blocked_t = _best_of(lambda: rolling_floor(series, method=blocked, window=WINDOW))
+            print(
+                f"{label:>24} {method:>9} {windowed_t * 1e3:>14.1f} {blocked_t * 1e3:>13.1f} "
+                f"{windowed_t / blocked_t:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,47 @@
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.domain.indicators.rrs_rrv_rve import wilders_rma
+
+SIZES = [200, 2_000, 20_000]
+LENGTH = 14
+
+
+def _wilders_rma_loop(x: np.ndarray, length: int) -> np.ndarray:
+    """The original per-element recurrence, kept as the reference implementation."""
+    out = np.empty_like(x, dtype=float)
+    alpha = 1.0 / length
+    out[0] = x[0]
+    for i in range(1, len(x)):
+        out[i] = out[i - 1] + alpha * (x[i] - out[i - 1])
+    return out
+
+
+def _best_of(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def run() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'bars':>8} {'loop (us)':>12} {'scan (us)':>12} {'speedup':>9} {'max abs err':>12}")
+    for n in SIZES:
+        x = np.abs(rng.normal(0.0, 5.0, n))
+        number = max(1, 20_000 // n)
+        loop_t = _best_of(lambda: _wilders_rma_loop(x, LENGTH), number)
+        scan_t = _best_of(lambda: wilders_rma(x, LENGTH), number * 10)
+        err = float(np.max(np.abs(_wilders_rma_loop(x, LENGTH) - wilders_rma(x, LENGTH))))
+        print(f"{n:>8} {loop_t * 1e6:>12.1f} {scan_t * 1e6:>12.1f} {loop_t / scan_t:>8.1f}x {err:>12.2e}")
+
+    matrix = np.abs(rng.normal(0.0, 5.0, (500, 200)))
+    loop_t = _best_of(lambda: [_wilders_rma_loop(row, LENGTH) for row in matrix], 1)
+    scan_t = _best_of(lambda: wilders_rma(matrix, LENGTH), 20)
+    print(f"500x200 matrix: loop {loop_t * 1e3:.1f} ms, scan {scan_t * 1e3:.2f} ms, {loop_t / scan_t:.0f}x")
+
+
+if __name__ == "__main__":
+    run()
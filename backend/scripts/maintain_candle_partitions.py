@@ -0,0 +1,28 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.core.config import Settings
+from app.infra.db.partitions import CandlePartitions
+from app.infra.db.session import Database
+
+
+def main() -> None:
+    settings = Settings()
+    db = Database(settings.database_url)
+    try:
+        partitions = CandlePartitions(
+            db,
+            months_ahead=settings.candle_partition_months_ahead,
+            retention=settings.candle_retention,
+            mode=settings.candle_retention_mode,
+        )
+        result = partitions.maintain()
+        print(f"Created {result.created}, dropped {result.dropped}, archived {result.archived}")
+    finally:
+        db.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.core.config import Settings
+from app.infra.cache.candle_cache import CandleCache
+from app.infra.cache.candle_codec import decode_candles
+from app.infra.cache.redis_cache import RedisCache
+
+# Old ingestion windows are candles:{symbol}:{timeframe} strings (JSON or binary);
+# the candles:{symbol}:{timeframe}:{limit} keys are a 30s read cache and stay.
+PATTERN = "candles:*"
+BATCH = 500
+
+
+def migrate(cache: RedisCache, depth: int | None = None) -> int:
+    """Move string candle windows into ``bars:*`` sorted sets; returns how many keys moved."""
+    candles = CandleCache(cache, depth or Settings().ingest_bars)
+    converted = 0
+    keys: List[str] = []
+    for key in cache.scan_keys(PATTERN):
+        if key.count(":") != 2:
+            continue
+        keys.append(key)
+        if len(keys) >= BATCH:
+            converted += _convert(cache, candles, keys)
+            keys = []
+    return converted + _convert(cache, candles, keys)
+
+
+def _convert(cache: RedisCache, candles: CandleCache, keys: List[str]) -> int:
+    values = cache.get_bytes_many(keys)
+    updates = []
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        _, symbol, timeframe = key.split(":")
+        updates.append((symbol, timeframe, decode_candles(value), True))
+    candles.write_many(updates)
+    cache.delete(*[key for key, value in zip(keys, values) if value is not None])
+    return len(updates)
+
+
+def main() -> None:
+    settings = Settings()
+    cache = RedisCache(settings.redis_url)
+    cache.connect()
+    try:
+        print(f"Moved {migrate(cache, settings.ingest_bars)} candle windows to sorted sets")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
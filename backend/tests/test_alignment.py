@@ -1,6 +1,6 @@
 import numpy as np
 
-from app.domain.alignment import align_ohlcv
+from app.domain.alignment import align_many, align_ohlcv
 
 
 def test_align_ohlcv_intersection():
@@ -24,3 +24,53 @@ def test_align_ohlcv_intersection():
     assert common.tolist() == [3, 4]
     assert sym_a["close"].shape[0] == 2
     assert ben_a["close"].shape[0] == 2
+
+
+def _series(ts, seed):
+    rng = np.random.default_rng(seed)
+    n = len(ts)
+    return {
+        "ts": np.asarray(ts, dtype="int64"),
+        "open": rng.random(n),
+        "high": rng.random(n) + 2,
+        "low": rng.random(n),
+        "close": rng.random(n) + 1,
+        "volume": rng.random(n) * 100,
+    }
+
+
+def test_align_many_pairs_match_align_ohlcv():
+    series = {
+        "A": _series([1, 2, 3, 5, 8, 9], 0),
+        "B": _series([2, 3, 4, 5, 9], 1),
+        "C": _series([3, 3, 5, 7, 9], 2),
+        "D": _series([20, 21], 3),
+    }
+    panel = align_many(series)
+    assert panel.grid.tolist() == [1, 2, 3, 4, 5, 7, 8, 9, 20, 21]
+    assert "open" not in panel.columns
+    assert panel.valid.sum(axis=1).tolist() == [6, 5, 4, 2]
+
+    for a in series:
+        for b in series:
+            sym_a, ben_a, common = panel.pair(a, b)
+            ref_sym, ref_ben, ref_common = align_ohlcv(series[a], series[b])
+            np.testing.assert_array_equal(common, ref_common)
+            if common.size == 0:
+                continue
+            for key in ("high", "low", "close", "volume"):
+                np.testing.assert_array_equal(sym_a[key], ref_sym[key])
+                np.testing.assert_array_equal(ben_a[key], ref_ben[key])
+
+
+def test_align_many_explicit_grid_and_columns():
+    series = {"A": _series([1, 2, 3], 0), "B": _series([2, 3, 4], 1)}
+    panel = align_many(series, grid=np.array([2, 3, 4]), columns=("close",))
+
+    assert list(panel.columns) == ["close"]
+    assert panel.valid.tolist() == [[True, True, False], [True, True, True]]
+    assert np.isnan(panel.columns["close"][0, 2])
+    np.testing.assert_array_equal(panel.columns["close"][0, :2], series["A"]["close"][1:])
+    sym_a, _, common = panel.pair("A", "B")
+    assert common.tolist() == [2, 3]
+    assert list(sym_a) == ["close"]
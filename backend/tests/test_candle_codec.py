@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from app.domain.candles import CandleBatch
+from app.infra.cache.candle_codec import (
+    FORMAT_VERSION,
+    RECORD_DTYPE,
+    decode_candles,
+    decode_records,
+    encode_candles,
+    encode_records,
+    is_legacy,
+)
+from scripts.migrate_candle_cache import migrate
+from tests.test_ingestion_incremental import _ingestion
+from tests.test_candles import _batch
+
+
+def test_round_trip_decodes_in_place():
+    batch = _batch(3, 50, source="resample")
+    data = encode_candles(batch)
+    assert len(data) == 16 + 8 + 50 * 6 * 8
+    assert data[4] == FORMAT_VERSION
+
+    decoded = decode_candles(data)
+    assert decoded == batch
+    for column in (decoded.ts, decoded.close, decoded.volume):
+        assert not column.flags.owndata and not column.flags.writeable and column.flags.aligned
+    assert decode_candles(encode_candles(CandleBatch.empty())) == CandleBatch.empty()
+
+
+def test_rejects_foreign_or_damaged_payloads():
+    data = encode_candles(_batch(0, 5))
+    with pytest.raises(ValueError):
+        decode_candles(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        decode_candles(data[:4] + bytes([FORMAT_VERSION + 1]) + data[5:])
+    with pytest.raises(ValueError):
+        decode_candles(data[:-8])
+
+
+def test_records_round_trip_in_ts_order():
+    batch = _batch(3, 20)
+    records = encode_records(batch)
+    assert len(records) == 20 and {len(member) for member in records} == {RECORD_DTYPE.itemsize}
+    assert list(records.values()) == batch.ts.astype(float).tolist()
+    assert decode_records(list(records)).to_payload() == batch.to_payload()
+
+
+def test_ingestion_appends_only_the_fetched_tail():
+    ingestion, client = _ingestion()
+    cache = ingestion.cache
+    ingestion.run_once("5m")
+    first = cache.store["bars:TCS:5m"]
+
+    writes = []
+    write_many = cache.zset_replace_tail_many
+    cache.zset_replace_tail_many = lambda updates, keep: (writes.append(updates), write_many(updates, keep))
+    client.windows.clear()
+    ingestion.run_once("5m")
+    count = [count for symbol, _, count in client.windows if symbol == "TCS"][0]
+    from_score, members = writes[0]["bars:TCS:5m"]
+    assert len(members) == count <= 4
+    assert from_score == min(members.values())
+    # Bars before the refetched tail are untouched and the ring keeps its depth.
+    window = ingestion.candles.get("TCS", "5m")
+    assert len(window) == 60
+    kept = [member for member, score in first.items() if score < from_score][-(60 - count) :]
+    assert list(cache.store["bars:TCS:5m"])[: 60 - count] == kept
+
+
+def test_legacy_string_windows_are_migrated_to_sorted_sets():
+    ingestion, _ = _ingestion()
+    cache = ingestion.cache
+    ingestion.run_once("5m")
+    tcs = ingestion.candles.get("TCS", "5m")
+    infy = _batch(0, 30)
+    cache.store.pop("bars:TCS:5m")
+    cache.set_bytes("candles:TCS:5m", json.dumps(tcs.to_payload()).encode())
+    cache.set_bytes("candles:INFY:5m", encode_candles(infy))
+    cache.set_bytes("candles:INFY:5m:40", encode_candles(infy))
+    cache.scan_keys = lambda pattern: [key for key in list(cache.store) if key.startswith(pattern[:-1])]
+
+    assert is_legacy(cache.get_bytes("candles:TCS:5m"))
+    assert migrate(cache) == 2
+    assert ingestion.candles.get("TCS", "5m").to_payload() == tcs.to_payload()
+    assert ingestion.candles.get("INFY", "5m").to_payload() == infy.to_payload()
+    assert "candles:TCS:5m" not in cache.store and "candles:INFY:5m" not in cache.store
+    assert "candles:INFY:5m:40" in cache.store
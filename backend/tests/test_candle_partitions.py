@@ -0,0 +1,48 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.infra.db.partitions import (
+    add_months,
+    create_month_sql,
+    lookback_start,
+    parse_retention,
+    partition_month,
+    partition_name,
+)
+
+
+def test_month_arithmetic_and_names():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    name = partition_name("5m", date(2026, 3, 1))
+    assert name == "candles_5m_2026_03"
+    assert partition_month(name) == date(2026, 3, 1)
+    assert partition_month("candles_5m_default") is None
+    with pytest.raises(ValueError):
+        partition_name("5m; DROP TABLE candles", date(2026, 3, 1))
+
+
+def test_month_partition_moves_default_rows_before_attaching():
+    create, move, attach = create_month_sql("15m", date(2026, 12, 1))
+    assert create.startswith("CREATE TABLE candles_15m_2026_12 ")
+    assert "DELETE FROM candles_15m_default WHERE ts >= '2026-12-01+00' AND ts < '2027-01-01+00'" in move
+    assert attach.endswith("FOR VALUES FROM ('2026-12-01+00') TO ('2027-01-01+00')")
+
+
+def test_retention_spec():
+    assert parse_retention(" 5m:6, 15m:24 ,") == {"5m": 6, "15m": 24}
+    assert parse_retention("") == {}
+    for bad in ("5m", "5m:0", "5m:x", "weekly:3"):
+        with pytest.raises(ValueError):
+            parse_retention(bad)
+
+
+def test_lookback_covers_limit_bars_and_stays_short():
+    now = datetime(2026, 10, 17, tzinfo=timezone.utc)
+    # 220 5m bars are under three sessions; 220 daily bars need most of a year.
+    intraday = (now - lookback_start("5m", 220, now)).days
+    daily = (now - lookback_start("1d", 220, now)).days
+    assert 5 <= intraday <= 20
+    assert 300 <= daily <= 330
+    assert (now - lookback_start("1h", 200, now)).days < 60
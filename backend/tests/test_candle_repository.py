@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from app.domain.candles import CandleBatch
+from app.infra.db.repositories import (
+    LATEST_ROW_DTYPE,
+    UpsertCounts,
+    copy_payload,
+    latest_candles_query,
+    split_latest_rows,
+)
+from tests.test_candles import _batch
+
+
+def test_copy_payload_rows_round_trip_exactly():
+    tcs = _batch(0, 3, source="groww")
+    odd = CandleBatch([1700000000], [0.1 + 0.2], [1e-17], [-3.5], [1234567.891], [0.0], source="resample")
+    payload = copy_payload([("TCS", "5m", tcs), ("NIFTY 50", "15m", odd), ("INFY", "5m", CandleBatch.empty())])
+
+    lines = payload.split("\n")
+    assert lines[-1] == "" and len(lines) == 5
+    rows = [line.split("\t") for line in lines[:-1]]
+    assert {len(row) for row in rows} == {9}
+    assert [row[0] for row in rows] == ["TCS", "TCS", "TCS", "NIFTY 50"]
+    assert [int(row[2]) for row in rows[:3]] == tcs.ts.tolist()
+    assert [float(value) for value in rows[3][3:8]] == [0.1 + 0.2, 1e-17, -3.5, 1234567.891, 0.0]
+    assert rows[3][8] == "resample"
+    assert copy_payload([("INFY", "5m", CandleBatch.empty())]) == ""
+
+
+def test_upsert_counts_add_up():
+    total = UpsertCounts(inserted=2) + UpsertCounts(updated=1, unchanged=217)
+    assert total == UpsertCounts(2, 1, 217)
+
+
+def test_latest_query_limits_per_symbol_with_lateral():
+    sql = str(latest_candles_query("5m", 200).compile(dialect=postgresql.dialect()))
+    assert "WITH ORDINALITY AS wanted(symbol, idx) JOIN LATERAL" in sql
+    assert "ORDER BY candles.ts DESC" in sql and "LIMIT" in sql
+    assert "row_number" not in sql
+    assert "candles.ts >=" in str(
+        latest_candles_query("5m", 200, datetime(2026, 10, 1, tzinfo=timezone.utc)).compile(dialect=postgresql.dialect())
+    )
+
+
+def test_split_latest_rows_maps_positions_to_symbols():
+    rows = [(1, 100, 1.0, 2.0, 0.5, 1.5, 10.0), (1, 400, 1.5, 2.5, 1.0, 2.0, 20.0), (3, 100, 5.0, 6.0, 4.0, 5.5, 30.0)]
+    records = np.fromiter(iter(rows), dtype=LATEST_ROW_DTYPE)
+    found = split_latest_rows(records, ["TCS", "INFY", "NIFTY"])
+    assert set(found) == {"TCS", "NIFTY"}
+    assert found["TCS"] == CandleBatch([100, 400], [1.0, 1.5], [2.0, 2.5], [0.5, 1.0], [1.5, 2.0], [10.0, 20.0], source="db")
+    assert found["NIFTY"].latest()["close"] == 5.5
+    assert split_latest_rows(records[:0], ["TCS"]) == {}
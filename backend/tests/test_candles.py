@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from app.domain.candles import CandleBatch
+from app.infra.groww.client import RealGrowwClient
+
+
+def _batch(start, n, source="groww"):
+    base = np.arange(n, dtype=float) + start
+    return CandleBatch(start * 300 + 300 * np.arange(n), base, base + 1, base - 1, base + 0.5, base * 10, source=source)
+
+
+def test_normalize_builds_columns_and_drops_bad_rows():
+    response = {
+        "payload": {
+            "candles": [
+                [1700000000, 1, 2, 0.5, 1.5, 100],
+                [1700000300, "1.1", None, 1, 1, 5],
+                [None, 1, 1, 1, 1, 1],
+                [1700000600, 1, 2, 1, 1.2, None],
+                [1700000900, "bad", 1, 1, 1, 1],
+                [1700001200, 1, 2],
+            ]
+        }
+    }
+    batch = RealGrowwClient._normalize_candles(response)
+    assert batch.ts.dtype == np.int64 and batch.close.dtype == np.float64
+    assert batch.ts.tolist() == [1700000000, 1700000600]
+    assert batch.volume.tolist() == [100.0, 0.0]
+    assert batch.source == "groww"
+    assert len(RealGrowwClient._normalize_candles({"payload": None})) == 0
+
+
+def test_batch_slicing_merge_and_payload_round_trip():
+    cached = _batch(0, 10)
+    fresh = _batch(8, 4)
+    merged = cached.merge(fresh, keep=10)
+    assert merged.ts.tolist() == (300 * np.arange(2, 12)).tolist()
+    assert merged.close[-4:].tolist() == fresh.close.tolist()
+
+    assert cached.before(900).ts.tolist() == [0, 300, 600]
+    assert cached.since(2700).ts.tolist() == [2700]
+    assert cached[-1].latest() == {"ts": 2700, "open": 9.0, "high": 10.0, "low": 8.0, "close": 9.5, "volume": 90.0}
+    assert CandleBatch.from_payload(cached.to_payload()) == cached
+    assert CandleBatch.concat([CandleBatch.empty(), cached]) is cached
+
+    with pytest.raises(AttributeError):
+        cached.extra = 1
+    with pytest.raises(ValueError):
+        CandleBatch([1, 2], [1.0], [1.0], [1.0], [1.0], [1.0])
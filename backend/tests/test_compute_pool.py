@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from app.domain.indicators.rrs_rrv_rve import SeriesContext
+from app.services.compute_pool import ComputePool, score_rows
+
+
+def _context(shape, base, rng):
+    close = base + np.cumsum(rng.normal(0, 1, shape), axis=-1)
+    return SeriesContext(
+        close + rng.random(shape),
+        close - rng.random(shape),
+        close,
+        rng.random(shape) * 1e5,
+    )
+
+
+def _groups():
+    rng = np.random.default_rng(11)
+    return [
+        (_context((9, 60), 100.0, rng), _context(60, 2000.0, rng)),
+        (_context((4, 45), 50.0, rng), _context(45, 4000.0, rng)),
+    ]
+
+
+def test_pool_matches_serial_bytes():
+    groups = _groups()
+    serial = [score_rows(sym, ben) for sym, ben in groups]
+
+    pool = ComputePool(workers=2, min_rows=1)
+    try:
+        parallel = pool.score_groups(groups)
+    finally:
+        pool.shutdown()
+
+    assert [len(g) for g in parallel] == [9, 4]
+    for par_group, ser_group in zip(parallel, serial):
+        for par_row, ser_row in zip(par_group, ser_group):
+            assert par_row[3] == ser_row[3]
+            assert np.array(par_row[:3]).tobytes() == np.array(ser_row[:3]).tobytes()
+
+
+def test_pool_small_batches_stay_in_process():
+    groups = _groups()
+    pool = ComputePool(workers=2, min_rows=1_000)
+    assert pool.score_groups(groups) == [score_rows(sym, ben) for sym, ben in groups]
+    assert pool._executor is None
+
+
+def test_pool_rejects_bad_config_and_benchmark_shape():
+    with pytest.raises(ValueError):
+        ComputePool(workers=0)
+    sym, ben = _groups()[0]
+    ben_matrix = SeriesContext(*(np.tile(a, (9, 1)) for a in (ben.high, ben.low, ben.close, ben.volume)))
+    with pytest.raises(ValueError):
+        ComputePool(workers=2, min_rows=1).score_groups([(sym, ben_matrix)])
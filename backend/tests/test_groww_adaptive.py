@@ -0,0 +1,208 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import Settings
+from app.services.groww_adaptive import (
+    AdaptiveGrowwClient,
+    AimdRate,
+    CircuitOpenError,
+    ErrorKind,
+    classify_error,
+    is_retryable,
+)
+from app.infra.groww.client import RealGrowwClient
+from app.services.groww_live_data import GrowwLiveDataService
+from app.services.ingestion import IngestionService
+from app.services.rate_limit import RateLimiter
+from app.services.retries import RetryPolicy
+from tests.test_pipeline_integration import (
+    FakeGrowwClient,
+    MemoryCache,
+    MemoryCandleRepo,
+    MemoryTickerIndexRepo,
+    MemoryWatchIndexRepo,
+    MemoryWatchStockRepoPair,
+)
+
+
+class HttpError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyClient(FakeGrowwClient):
+    """Raises the queued errors first, then behaves like the fake client."""
+
+    def __init__(self, errors=(), always=None):
+        self.errors = list(errors)
+        self.always = always
+        self.calls = 0
+        self.client = "sdk"
+
+    def fetch_candles(self, *args, **kwargs):
+        self.calls += 1
+        if self.always is not None:
+            raise self.always
+        if self.errors:
+            raise self.errors.pop(0)
+        return super().fetch_candles(*args, **kwargs)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fetch(client):
+    end = datetime(2024, 1, 2, 6, 0, tzinfo=timezone.utc)
+    return client.fetch_candles(
+        trading_symbol="TCS",
+        timeframe="5m",
+        start_time=end - timedelta(minutes=50),
+        end_time=end,
+        exchange="NSE",
+        segment="CASH",
+    )
+
+
+def test_classify_errors():
+    assert classify_error(HttpError(429)) == ErrorKind.THROTTLED
+    assert classify_error(RuntimeError("Too Many Requests")) == ErrorKind.THROTTLED
+    assert classify_error(HttpError(503)) == ErrorKind.TRANSIENT
+    assert classify_error(TimeoutError()) == ErrorKind.TRANSIENT
+    assert classify_error(HttpError(401)) == ErrorKind.AUTH
+    assert classify_error(HttpError(400)) == ErrorKind.PERMANENT
+    assert classify_error(CircuitOpenError("open")) == ErrorKind.PERMANENT
+    assert not is_retryable(HttpError(404)) and is_retryable(HttpError(502))
+
+
+def test_throttling_shrinks_rate_and_successes_restore_it():
+    clock = FakeClock()
+    limiter = RateLimiter(10, 600, clock=clock)
+    inner = FlakyClient(errors=[HttpError(429), HttpError(429)])
+    client = AdaptiveGrowwClient(inner, limiter, clock=clock)
+    retry = RetryPolicy(3, 0.0, 0.0, retry_on=is_retryable)
+
+    assert retry.run(_fetch, client)
+    # Both 429s landed within the same second, so the rate was halved once, and the
+    # success that followed added one increment back.
+    assert limiter.rate_factor == pytest.approx(0.52)
+    for _ in range(30):
+        _fetch(client)
+    assert limiter.rate_factor == 1.0
+    assert client.client == "sdk"
+
+
+class SlowFactorLimiter(RateLimiter):
+    """Widens the gap between reading and writing the factor, where unlocked updates race."""
+
+    def set_rate_factor(self, factor):
+        time.sleep(0.001)
+        super().set_rate_factor(factor)
+
+
+def test_concurrent_successes_each_add_one_increment():
+    limiter = SlowFactorLimiter(10, 600)
+    limiter.set_rate_factor(0.1)
+    aimd = AimdRate(limiter, increase=0.01)
+
+    threads = [threading.Thread(target=lambda: [aimd.on_success() for _ in range(5)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert limiter.rate_factor == pytest.approx(0.1 + 40 * 0.01)
+
+
+def test_permanent_errors_are_not_retried():
+    inner = FlakyClient(errors=[HttpError(400)])
+    client = AdaptiveGrowwClient(inner, RateLimiter(10, 600))
+    with pytest.raises(HttpError):
+        RetryPolicy(4, 0.0, 0.0, retry_on=is_retryable).run(_fetch, client)
+    assert inner.calls == 1
+    assert client.breaker_states() == {"candles": "closed"}
+
+
+def test_breaker_fails_fast_then_half_opens():
+    clock = FakeClock()
+    inner = FlakyClient(always=HttpError(503))
+    client = AdaptiveGrowwClient(inner, RateLimiter(10, 600), failure_threshold=3, cooldown_sec=30, clock=clock)
+
+    for _ in range(3):
+        with pytest.raises(HttpError):
+            _fetch(client)
+    with pytest.raises(CircuitOpenError):
+        _fetch(client)
+    assert inner.calls == 3
+    assert client.breaker_states() == {"candles": "open"}
+
+    clock.now += 31
+    inner.always = None
+    assert _fetch(client)
+    assert client.breaker_states() == {"candles": "closed"}
+
+
+def test_permanent_errors_leave_the_breaker_alone():
+    clock = FakeClock()
+    inner = FlakyClient(errors=[HttpError(503), HttpError(503), HttpError(400), HttpError(503)])
+    client = AdaptiveGrowwClient(inner, RateLimiter(10, 600), failure_threshold=3, cooldown_sec=30, clock=clock)
+
+    # An interleaved 4xx neither resets the consecutive 5xx count...
+    for _ in range(4):
+        with pytest.raises(HttpError):
+            _fetch(client)
+    assert client.breaker_states() == {"candles": "open"}
+
+    # ...nor closes a half-open breaker; it only frees the trial slot for the next call.
+    clock.now += 31
+    inner.errors = [HttpError(400)]
+    with pytest.raises(HttpError):
+        _fetch(client)
+    assert client.breaker_states() == {"candles": "half_open"}
+    assert _fetch(client)
+    assert client.breaker_states() == {"candles": "closed"}
+
+
+def test_ingestion_stops_calling_groww_once_breaker_opens():
+    settings = Settings()
+    settings.scheduler_timeframes = "5m"
+    settings.ingest_workers = 1
+    inner = FlakyClient(always=HttpError(503))
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=AdaptiveGrowwClient(inner, RateLimiter(1000, 100000), failure_threshold=3),
+        candle_repo=MemoryCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(4, 0.0, 0.0, retry_on=is_retryable),
+        watch_stock_repo=MemoryWatchStockRepoPair(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+    ingestion.run_once("5m")
+    # Without the breaker: 4 symbols x 4 attempts.
+    assert inner.calls == 3
+    assert ingestion.cache.store == {}
+
+
+class ExpiriesSdk:
+    def get_expiries(self, exchange, underlying_symbol, year, month):
+        return {"expiries": [f"{year}-{month:02d}-25"]}
+
+
+def test_live_data_sees_through_the_adaptive_wrapper():
+    real = RealGrowwClient.__new__(RealGrowwClient)
+    real.client = ExpiriesSdk()
+    real.groww_module = None
+    wrapped = AdaptiveGrowwClient(real, RateLimiter(10, 600))
+
+    result = GrowwLiveDataService(Settings(), wrapped).fetch_expiries("NSE", "NIFTY", 2026, 11)
+    assert result == {"expiries": ["2026-11-25"], "errors": None}
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.domain.indicators.rrs_rrv_rve import (
+    rrs,
+    rrv,
+    rve,
+    rrs_batch,
+    rrv_batch,
+    rve_batch,
+)
+
+
+def _universe(n_symbols=5, n_bars=80, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, (n_symbols, n_bars)), axis=1)
+    sym = {
+        "high": close + rng.random((n_symbols, n_bars)),
+        "low": close - rng.random((n_symbols, n_bars)),
+        "close": close,
+    }
+    bench_close = 2000 + np.cumsum(rng.normal(0, 3, n_bars))
+    bench = {
+        "high": bench_close + rng.random(n_bars),
+        "low": bench_close - rng.random(n_bars),
+        "close": bench_close,
+    }
+    sym_vol = rng.random((n_symbols, n_bars)) * 1e5
+    bench_vol = rng.random(n_bars) * 1e7
+    return sym, bench, sym_vol, bench_vol
+
+
+def _row(ohlc, i):
+    return {k: v[i] for k, v in ohlc.items()}
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"use_pct_atr": True}, {"floor_window": 30, "floor_method": "median"}])
+def test_rrs_rve_batch_match_scalar(kwargs):
+    sym, bench, _, _ = _universe()
+    sym["close"][1, 10] = np.nan
+
+    rrs_matrix = rrs_batch(sym, bench, length=12, **kwargs)
+    rve_matrix = rve_batch(sym, bench, length=12, atr_period=14, **kwargs)
+
+    for i in range(sym["close"].shape[0]):
+        np.testing.assert_array_equal(rrs_matrix[i], rrs(_row(sym, i), bench, length=12, **kwargs))
+        np.testing.assert_array_equal(rve_matrix[i], rve(_row(sym, i), bench, length=12, atr_period=14, **kwargs))
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"var_mode": "abs"}, {"winsorize": False, "floor_window": 30}])
+def test_rrv_batch_matches_scalar(kwargs):
+    _, _, sym_vol, bench_vol = _universe()
+    sym_vol[2, 5] = np.nan
+
+    rrv_matrix = rrv_batch(sym_vol, bench_vol, length=12, smooth=3, **kwargs)
+
+    for i in range(sym_vol.shape[0]):
+        np.testing.assert_array_equal(rrv_matrix[i], rrv(sym_vol[i], bench_vol, length=12, smooth=3, **kwargs))
+
+
+def test_batch_accepts_benchmark_matrix():
+    sym, bench, sym_vol, bench_vol = _universe()
+    n_symbols = sym["close"].shape[0]
+    bench_matrix = {k: np.tile(v, (n_symbols, 1)) for k, v in bench.items()}
+
+    np.testing.assert_array_equal(rrs_batch(sym, bench_matrix, length=12), rrs_batch(sym, bench, length=12))
+    np.testing.assert_array_equal(
+        rrv_batch(sym_vol, np.tile(bench_vol, (n_symbols, 1)), length=12),
+        rrv_batch(sym_vol, bench_vol, length=12),
+    )
+
+
+def test_batch_rejects_mismatched_shapes():
+    sym, bench, _, _ = _universe()
+    short_bench = {k: v[:-1] for k, v in bench.items()}
+    with pytest.raises(ValueError):
+        rrs_batch(sym, short_bench, length=12)
+    with pytest.raises(ValueError):
+        rrs_batch(_row(sym, 0), bench, length=12)
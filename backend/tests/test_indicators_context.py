@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from app.domain.indicators.context import SeriesContextCache
+from app.domain.indicators.rrs_rrv_rve import SeriesContext, rrs, rrv, rve, rrs_batch, rve_batch
+from app.services.benchmarks import compute_benchmark_state
+from app.services.relative_metrics import compute_relative_metrics
+
+
+def _ohlcv(n=80, seed=0, base=100.0, start=0):
+    rng = np.random.default_rng(seed)
+    close = base + np.cumsum(rng.normal(0, 1, n))
+    return {
+        "ts": np.arange(start, start + n, dtype="int64") * 300,
+        "open": close,
+        "high": close + rng.random(n),
+        "low": close - rng.random(n),
+        "close": close,
+        "volume": rng.random(n) * 1e5 + 1,
+    }
+
+
+def test_context_inputs_match_plain_arrays():
+    sym, bench = _ohlcv(seed=1), _ohlcv(seed=2, base=2000.0)
+    sym_ctx, ben_ctx = SeriesContext.from_ohlcv(sym), SeriesContext.from_ohlcv(bench)
+
+    np.testing.assert_array_equal(rrs(sym_ctx, ben_ctx, length=12), rrs(sym, bench, length=12))
+    np.testing.assert_array_equal(rve(sym_ctx, ben_ctx, length=12), rve(sym, bench, length=12))
+    np.testing.assert_array_equal(
+        rrv(sym_ctx, ben_ctx, length=12), rrv(sym["volume"], bench["volume"], length=12)
+    )
+    state = compute_benchmark_state("NIFTY", bench, ben_ctx)
+    assert state == compute_benchmark_state("NIFTY", bench)
+
+
+def test_context_memoizes_read_only_intermediates():
+    ctx = SeriesContext.from_ohlcv(_ohlcv())
+    atr = ctx.atr(14)
+    assert ctx.atr(14) is atr
+    assert ctx.true_range() is ctx.true_range()
+    assert ctx.atr(12) is not atr
+    with pytest.raises(ValueError):
+        atr[0] = 1.0
+    with pytest.raises(ValueError):
+        SeriesContext(ctx.high, ctx.low, ctx.close).volume_series(3, True)
+
+
+def test_batch_accepts_contexts():
+    rows = [_ohlcv(seed=s) for s in range(3)]
+    bench = _ohlcv(seed=9, base=2000.0)
+    sym_ctx = SeriesContext(*(np.vstack([r[k] for r in rows]) for k in ["high", "low", "close", "volume"]))
+    ben_ctx = SeriesContext.from_ohlcv(bench)
+
+    np.testing.assert_array_equal(rrs_batch(sym_ctx, ben_ctx, length=12)[1], rrs(rows[1], bench, length=12))
+    np.testing.assert_array_equal(rve_batch(sym_ctx, ben_ctx, length=12)[2], rve(rows[2], bench, length=12))
+    with pytest.raises(ValueError):
+        rrs_batch(SeriesContext.from_ohlcv(rows[0]), ben_ctx, length=12)
+
+
+def test_cache_shares_contexts_by_symbol_timeframe_and_bars():
+    contexts = SeriesContextCache()
+    stock = _ohlcv(seed=1)
+    bench = _ohlcv(seed=2, base=2000.0)
+
+    ctx = contexts.context("TCS", "5m", stock)
+    assert contexts.context("TCS", "5m", dict(stock)) is ctx
+    assert contexts.context("TCS", "15m", stock) is not ctx
+    assert contexts.context("TCS", "5m", _ohlcv(seed=1, start=1)) is not ctx
+
+    sym_ctx, ben_ctx, common_ts = contexts.align("TCS", "NIFTY", "5m", stock, bench)
+    assert sym_ctx is ctx
+    assert contexts.align("TCS", "NIFTY", "5m", stock, bench)[1] is ben_ctx
+    assert common_ts.size == 80
+
+    # A partially overlapping benchmark yields a new context on the shorter grid.
+    short_ctx, _, short_ts = contexts.align("TCS", "BANK", "5m", stock, _ohlcv(seed=3, start=20))
+    assert short_ts.size == 60
+    assert short_ctx is not ctx and short_ctx.close.size == 60
+
+
+def test_relative_metrics_with_shared_cache_match_fresh():
+    stock = _ohlcv(seed=1)
+    benches = {"NIFTY": _ohlcv(seed=2, base=2000.0), "BANK": _ohlcv(seed=3, base=4000.0)}
+    contexts = SeriesContextCache()
+
+    for name, bench in benches.items():
+        shared = compute_relative_metrics(
+            stock, bench, contexts=contexts, stock_symbol="TCS", bench_symbol=name, timeframe="5m"
+        )
+        assert shared == compute_relative_metrics(stock, bench)
+    assert len(contexts) == 3
@@ -99,3 +99,36 @@ def test_crosses_up_down_and_classify():
 
     rrs_series = np.array([0.1, 0.1])
     assert classify(0.1, 0.0, 0.0, rrs_series) == "NEUTRAL"
+
+
+def _wilders_rma_loop(x, length):
+    out = np.empty_like(x, dtype=float)
+    alpha = 1.0 / length
+    out[0] = x[0]
+    for i in range(1, len(x)):
+        out[i] = out[i - 1] + alpha * (x[i] - out[i - 1])
+    return out
+
+
+def test_wilders_rma_matches_recurrence():
+    rng = np.random.default_rng(11)
+    for n in (1, 2, 200, 2000, 20000):
+        x = 1000 + np.cumsum(rng.normal(0, 5, n))
+        for length in (1, 2, 14, 100):
+            npt.assert_allclose(wilders_rma(x, length), _wilders_rma_loop(x, length), rtol=1e-12, atol=1e-12)
+
+
+def test_wilders_rma_2d_smooths_last_axis():
+    rng = np.random.default_rng(12)
+    x = np.abs(rng.normal(0, 5, (4, 300)))
+    out = wilders_rma(x, 14)
+    assert out.shape == x.shape
+    for i in range(x.shape[0]):
+        npt.assert_array_equal(out[i], wilders_rma(x[i], 14))
+
+
+def test_wilders_rma_nan_propagates_forward():
+    x = np.array([1.0, 2.0, np.nan, 4.0, 5.0])
+    out = wilders_rma(x, 3)
+    assert np.all(np.isfinite(out[:2]))
+    assert np.all(np.isnan(out[2:]))
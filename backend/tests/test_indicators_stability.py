@@ -1,6 +1,8 @@
 import numpy as np
 import numpy.testing as npt
+import pytest
 
+from app.domain.indicators.order_stats import RollingOrderStats
 from app.domain.indicators.rrs_rrv_rve import (
     safe_div,
     rolling_floor,
@@ -33,6 +35,59 @@ def test_rolling_floor_length_and_positive():
     assert np.all(floor >= 0)
 
 
+@pytest.mark.parametrize("window", [1, 7, 20, 64])
+def test_rolling_floor_blocked_matches_windowed(window):
+    rng = np.random.default_rng(window)
+    series = rng.normal(0, 3, 300)
+    series[rng.integers(0, 300, size=40)] = np.nan
+    series[100:100 + window] = np.nan
+    series[200:240] = np.round(series[200:240])
+
+    for q in (0.0, 0.05, 0.5, 1.0):
+        npt.assert_array_equal(
+            rolling_floor(series, method="quantile_blocked", window=window, q=q),
+            rolling_floor(series, method="quantile", window=window, q=q),
+        )
+    npt.assert_array_equal(
+        rolling_floor(series, method="median_blocked", window=window),
+        rolling_floor(series, method="median", window=window),
+    )
+
+
+def test_rolling_floor_blocked_matches_windowed_across_blocks(monkeypatch):
+    import app.domain.indicators.rrs_rrv_rve as module
+
+    # A tiny block forces many sort passes, including a ragged last one.
+    monkeypatch.setattr(module, "_FLOOR_BLOCK_VALUES", 3 * 20 * 7)
+    rng = np.random.default_rng(3)
+    matrix = rng.normal(0, 3, (3, 150))
+    matrix[:, :12] = np.nan
+    matrix[1, 60:90] = np.nan
+
+    npt.assert_array_equal(
+        rolling_floor(matrix, method="quantile_blocked", window=20, q=0.05),
+        rolling_floor(matrix, method="quantile", window=20, q=0.05),
+    )
+    npt.assert_array_equal(
+        rolling_floor(matrix, method="median_blocked", window=20),
+        rolling_floor(matrix, method="median", window=20),
+    )
+
+
+def test_rolling_order_stats_window():
+    stats = RollingOrderStats(3, [5.0, np.nan, 1.0])
+    assert stats.count == 2
+    assert stats.median() == 3.0
+    stats.push(9.0)
+    assert np.isnan(stats.values()[0])  # NaN still occupies a slot
+    stats.push(4.0)
+    assert stats.values() == [1.0, 9.0, 4.0]
+    assert stats.median() == 4.0
+    assert stats.quantile(0.0) == 1.0
+    assert stats.quantile(1.0) == 9.0
+    assert stats.quantile(0.25) == np.quantile([1.0, 9.0, 4.0], 0.25)
+
+
 def test_clip_power():
     power = np.array([-100.0, -5.0, 0.0, 5.0, 100.0])
     clipped = clip_power(power, pmax=10.0)
@@ -63,6 +118,25 @@ def test_rrs_rrv_rve_warmup_nan():
     assert np.isnan(rve_series[:12]).any()
 
 
+def test_blocked_floor_method_matches_in_indicators():
+    rng = np.random.default_rng(5)
+    n = 120
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    sym = {"high": close + 1, "low": close - 1, "close": close}
+    ben = {"high": close * 2 + 1, "low": close * 2 - 1, "close": close * 2 + rng.normal(0, 1, n)}
+    vol_sym = rng.random(n) * 1e5
+    vol_ben = rng.random(n) * 1e6
+
+    npt.assert_array_equal(
+        rrs(sym, ben, length=12, floor_window=40, floor_method="quantile_blocked"),
+        rrs(sym, ben, length=12, floor_window=40, floor_method="quantile"),
+    )
+    npt.assert_array_equal(
+        rrv(vol_sym, vol_ben, length=12, floor_window=40, floor_method="median_blocked"),
+        rrv(vol_sym, vol_ben, length=12, floor_window=40, floor_method="median"),
+    )
+
+
 def test_rrv_var_mode_switch_changes_output():
     n = 80
     vol_sym = np.concatenate([np.ones(40) * 1000, np.ones(40) * 5000])
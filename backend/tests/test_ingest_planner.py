@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+
+from app.core.config import Settings
+from app.services.ingest_planner import IngestPlanner
+from app.services.ingestion import IngestionService
+from app.services.rate_limit import RateLimiter
+from app.services.retries import RetryPolicy
+from tests.test_ingestion_incremental import WindowRecordingClient
+from tests.test_pipeline_integration import (
+    MemoryCache,
+    MemoryCandleRepo,
+    MemoryTickerIndexRepo,
+    MemoryWatchIndexRepo,
+    MemoryWatchStockRepoPair,
+)
+
+
+def _utc(day, hour, minute):
+    return datetime(2024, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+def test_next_close_follows_bar_and_session_boundaries():
+    planner = IngestPlanner(Settings())
+    # Tue 2024-01-02 09:17 IST.
+    assert planner.next_close(_utc(2, 3, 47), "5m") == _utc(2, 3, 50)
+    # 15:16 IST: the 15:15 hourly bar is cut short by the 15:30 close.
+    assert planner.next_close(_utc(2, 9, 46), "1h") == _utc(2, 10, 0)
+    # Fri 2024-01-05 16:00 IST -> Mon 15:30 IST.
+    assert planner.next_close(_utc(5, 10, 30), "1d") == _utc(8, 10, 0)
+    assert planner.next_run(_utc(2, 3, 47), "5m").timestamp() == _utc(2, 3, 50).timestamp() + 2.0
+
+
+def test_due_only_when_watermark_is_behind_last_closed_bar():
+    planner = IngestPlanner(Settings())
+    now = _utc(2, 3, 57)  # 09:27 IST; the 09:20 bar is the newest closed one.
+    closed = planner.last_closed_bar(now, "5m")
+    assert closed == _utc(2, 3, 50)
+    assert not planner.is_due(int(closed.timestamp()), "5m", now)
+    assert planner.is_due(int(closed.timestamp()) - 300, "5m", now)
+    assert planner.is_due(None, "5m", now)
+    # After the close the session's last (possibly short) bar counts; before the open, yesterday's.
+    assert planner.last_closed_bar(_utc(2, 10, 10), "5m") == _utc(2, 9, 55)
+    assert planner.last_closed_bar(_utc(2, 10, 10), "1h") == _utc(2, 9, 45)
+    assert planner.last_closed_bar(_utc(3, 3, 30), "5m") == _utc(2, 9, 55)
+    # Monday morning: Friday's daily bar is the newest closed one.
+    assert planner.last_closed_bar(_utc(8, 4, 30), "1d") == datetime(2024, 1, 4, 18, 30, tzinfo=timezone.utc)
+
+
+def test_report_flags_universe_beyond_budget():
+    settings = Settings()
+    settings.scheduler_timeframes = "5m,15m"
+    planner = IngestPlanner(settings, RateLimiter(10, 300))
+
+    fits = planner.report(symbols=300, benchmarks=2)
+    assert fits["calls_per_min_budget"] == 300.0
+    assert fits["timeframes"]["5m"]["sweep_sec"] == 60.0
+    assert fits["timeframes"]["5m"]["max_fresh_symbols"] == 1500
+    assert not fits["over_budget"]
+
+    too_many = planner.report(symbols=2000, benchmarks=2)
+    assert too_many["over_budget"]
+    assert too_many["timeframes"]["5m"]["stale_bars"] == 1
+    assert too_many["timeframes"]["5m"]["benchmark_lag_sec"] == 2.4
+
+    planner.rate_limiter.set_rate_factor(0.5)
+    assert planner.report(symbols=300, benchmarks=2)["timeframes"]["5m"]["sweep_sec"] == 120.0
+
+
+def test_run_fetches_benchmarks_first_and_skips_fresh_symbols():
+    settings = Settings()
+    settings.scheduler_timeframes = "5m"
+    settings.ingest_bars = 20
+    settings.ingest_workers = 1
+    client = WindowRecordingClient()
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=client,
+        candle_repo=MemoryCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepoPair(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+        planner=IngestPlanner(settings),
+    )
+
+    assert ingestion.run_once("5m") == 4
+    assert [symbol for symbol, _, _ in client.windows] == ["NIFTY", "BANKNIFTY", "INFY", "TCS"]
+
+    # Only TCS has a watermark at or past the newest closed bar.
+    for symbol in ("NIFTY", "BANKNIFTY", "INFY"):
+        ingestion.cache.set_json(f"watermark:{symbol}:5m", 0)
+    ingestion.cache.set_json("watermark:TCS:5m", int(datetime.now(timezone.utc).timestamp()))
+    client.windows.clear()
+    assert ingestion.run_once("5m", due_only=True) == 3
+    assert "TCS" not in [symbol for symbol, _, _ in client.windows]
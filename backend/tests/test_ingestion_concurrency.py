@@ -0,0 +1,146 @@
+import threading
+import time
+
+from app.core.config import Settings
+from app.services.ingestion import IngestionService
+from app.services.rate_limit import RateLimiter
+from app.services.retries import RetryPolicy
+from tests.test_pipeline_integration import (
+    FakeGrowwClient,
+    MemoryCache,
+    MemoryCandleRepo,
+    MemoryTickerIndexRepo,
+    MemoryWatchIndexRepo,
+)
+
+
+class ManyStocks:
+    def __init__(self, count):
+        self.symbols = [f"S{i:03d}" for i in range(count)]
+
+    def get_active_symbols(self):
+        return list(self.symbols)
+
+
+class SlowClient(FakeGrowwClient):
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.started = []
+
+    def fetch_candles(self, *args, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.started.append(time.monotonic())
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return super().fetch_candles(*args, **kwargs)
+
+
+class CountingRepo(MemoryCandleRepo):
+    def __init__(self):
+        super().__init__()
+        self.batches = 0
+
+    def upsert_candles_many(self, batches):
+        self.batches += 1
+        return super().upsert_candles_many(batches)
+
+
+def _ingestion(stocks, client, workers, limiter):
+    settings = Settings()
+    settings.scheduler_timeframes = "5m"
+    settings.ingest_bars = 20
+    settings.ingest_workers = workers
+    settings.ingest_write_batch = 10
+    return IngestionService(
+        settings=settings,
+        groww_client=client,
+        candle_repo=CountingRepo(),
+        cache=MemoryCache(),
+        rate_limiter=limiter,
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=stocks,
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+
+
+def test_workers_fetch_concurrently_and_batch_writes():
+    stocks = ManyStocks(30)
+    client = SlowClient(delay=0.05)
+    ingestion = _ingestion(stocks, client, workers=8, limiter=RateLimiter(1000, 100000))
+    symbols = ingestion._symbols()
+
+    started = time.monotonic()
+    ingestion.run_once("5m")
+    elapsed = time.monotonic() - started
+
+    assert client.peak > 1
+    assert elapsed < len(symbols) * client.delay / 2
+    assert all((symbol, "5m") in ingestion.candle_repo.store for symbol in symbols)
+    assert all(f"bars:{symbol}:5m" in ingestion.cache.store for symbol in symbols)
+    assert ingestion.candle_repo.batches == -(-len(symbols) // 10)
+
+
+def test_workers_share_the_rate_limit():
+    stocks = ManyStocks(8)
+    client = SlowClient(delay=0.0)
+    ingestion = _ingestion(stocks, client, workers=8, limiter=RateLimiter(5, 100000))
+
+    ingestion.run_once("5m")
+    starts = sorted(client.started)
+    assert len(starts) == len(ingestion._symbols())
+    for i in range(len(starts) - 5):
+        assert starts[i + 5] - starts[i] >= 0.95
+
+
+class PoisonRepo(CountingRepo):
+    """Rejects any write batch that contains ``poison``, as a bad row would fail a whole COPY."""
+
+    def __init__(self, poison):
+        super().__init__()
+        self.poison = poison
+
+    def upsert_candles_many(self, batches):
+        if any(symbol == self.poison for symbol, _, _ in batches):
+            raise RuntimeError("write failed")
+        return super().upsert_candles_many(batches)
+
+
+def test_failed_write_batch_falls_back_per_symbol_and_continues():
+    stocks = ManyStocks(30)
+    ingestion = _ingestion(stocks, SlowClient(delay=0.0), workers=4, limiter=RateLimiter(1000, 100000))
+    ingestion.candle_repo = PoisonRepo("S005")
+    symbols = ingestion._symbols()
+
+    assert ingestion.run_once("5m") == len(symbols)
+
+    written = [symbol for symbol in symbols if symbol != "S005"]
+    assert all((symbol, "5m") in ingestion.candle_repo.store for symbol in written)
+    assert all(f"watermark:{symbol}:5m" in ingestion.cache.store for symbol in written)
+    assert ("S005", "5m") not in ingestion.candle_repo.store
+    assert "watermark:S005:5m" not in ingestion.cache.store
+
+
+class FailingClient(FakeGrowwClient):
+    def __init__(self, fail):
+        self.fail = fail
+
+    def fetch_candles(self, trading_symbol, *args, **kwargs):
+        if trading_symbol == self.fail:
+            raise RuntimeError("fetch failed")
+        return super().fetch_candles(trading_symbol, *args, **kwargs)
+
+
+def test_run_once_counts_only_successful_fetches():
+    stocks = ManyStocks(10)
+    ingestion = _ingestion(stocks, FailingClient("S003"), workers=4, limiter=RateLimiter(1000, 100000))
+    symbols = ingestion._symbols()
+
+    assert ingestion.run_once("5m") == len(symbols) - 1
+    assert ("S003", "5m") not in ingestion.candle_repo.store
@@ -0,0 +1,81 @@
+from app.core.config import Settings
+from app.services.ingestion import IngestionService
+from app.services.rate_limit import RateLimiter
+from app.services.retries import RetryPolicy
+from tests.test_pipeline_integration import (
+    FakeGrowwClient,
+    MemoryCache,
+    MemoryCandleRepo,
+    MemoryTickerIndexRepo,
+    MemoryWatchIndexRepo,
+    MemoryWatchStockRepo,
+)
+
+
+class WindowRecordingClient(FakeGrowwClient):
+    def __init__(self):
+        self.windows = []
+
+    def fetch_candles(self, trading_symbol, timeframe, start_time, end_time, exchange, segment):
+        candles = super().fetch_candles(trading_symbol, timeframe, start_time, end_time, exchange, segment)
+        self.windows.append((trading_symbol, start_time, len(candles)))
+        return candles
+
+
+def _ingestion():
+    settings = Settings()
+    settings.scheduler_timeframes = "5m"
+    settings.ingest_bars = 60
+    client = WindowRecordingClient()
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=client,
+        candle_repo=MemoryCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepo(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+    return ingestion, client
+
+
+def test_second_cycle_fetches_from_watermark_with_overlap():
+    ingestion, client = _ingestion()
+    cache = ingestion.cache
+
+    ingestion.run_once("5m")
+    assert {count for _, _, count in client.windows} == {60}
+    first = ingestion.candles.get("TCS", "5m").to_payload()
+    watermark = cache.get_json("watermark:TCS:5m")
+    assert watermark == first["ts"][-1]
+
+    client.windows.clear()
+    ingestion.run_once("5m")
+    tcs = [w for w in client.windows if w[0] == "TCS"]
+    assert len(tcs) == 1
+    _, since, count = tcs[0]
+    assert since.timestamp() == watermark - 2 * 5 * 60
+    assert count <= 4
+    # Only the refetched bars are written; the cached window keeps its size.
+    assert len(ingestion.candle_repo.store[("TCS", "5m")]) == count
+    merged = ingestion.candles.get("TCS", "5m").to_payload()
+    assert len(merged["ts"]) == 60
+    assert merged["ts"] == sorted(set(merged["ts"]))
+    assert merged["ts"] == sorted(set(first["ts"]) | set(merged["ts"][-count:]))[-60:]
+
+
+def test_gap_or_cache_loss_falls_back_to_full_window():
+    ingestion, client = _ingestion()
+    cache = ingestion.cache
+    ingestion.run_once("5m")
+
+    cache.set_json("watermark:TCS:5m", 0)
+    del cache.store["bars:BANKNIFTY:5m"]
+    client.windows.clear()
+    ingestion.run_once("5m")
+    counts = {symbol: count for symbol, _, count in client.windows}
+    assert counts["TCS"] == 60
+    assert counts["BANKNIFTY"] == 60
+    assert counts[ingestion.settings.nifty_symbol] <= 4
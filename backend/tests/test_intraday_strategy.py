@@ -35,6 +35,15 @@ class DummyCache:
     def set_json(self, key, value, ttl=None):
         pass
 
+    def get_bytes_many(self, keys):
+        return [None] * len(keys)
+
+    def zset_tail_many(self, keys, count):
+        return [[] for _ in keys]
+
+    def set_bytes(self, key, value, ttl=None):
+        pass
+
 
 class DummyIndexRepo:
     def get_indices_for_stock(self, symbol):
@@ -1,8 +1,11 @@
-from datetime import datetime, timedelta, timezone
+import numpy as np
 
 from app.core.config import Settings
+from app.domain.candles import CandleBatch
+from app.infra.db.repositories import UpsertCounts
 from app.services.ingestion import IngestionService
 from app.services.compute import ComputeService
+from app.services.dirty import DirtyTracker
 from app.services.rate_limit import RateLimiter
 from app.services.retries import RetryPolicy
 
@@ -11,22 +14,16 @@ class FakeGrowwClient:
     def fetch_candles(self, trading_symbol, timeframe, start_time, end_time, exchange, segment):
         minutes = {"5m": 5, "15m": 15, "1h": 60, "1d": 1440}[timeframe]
         total = int((end_time - start_time).total_seconds() / (minutes * 60))
-        candles = []
-        for i in range(total):
-            ts = start_time + timedelta(minutes=i * minutes)
-            base = 100 + i
-            candles.append(
-                {
-                    "ts": ts,
-                    "open": base,
-                    "high": base + 1,
-                    "low": base - 1,
-                    "close": base + 0.5,
-                    "volume": 1000 + i,
-                    "source": "fake",
-                }
-            )
-        return candles
+        base = 100.0 + np.arange(total)
+        return CandleBatch(
+            int(start_time.timestamp()) + np.arange(total) * minutes * 60,
+            base,
+            base + 1,
+            base - 1,
+            base + 0.5,
+            1000.0 + np.arange(total),
+            source="fake",
+        )
 
 
 class MemoryCache:
@@ -42,9 +39,40 @@ class MemoryCache:
     def get_json(self, key):
         return self.store.get(key)
 
+    def get_json_many(self, keys):
+        return [self.store.get(key) for key in keys]
+
     def set_json(self, key, value, ttl=None):
         self.store[key] = value
 
+    def set_json_many(self, values):
+        self.store.update(values)
+
+    def get_bytes(self, key):
+        return self.store.get(key)
+
+    def get_bytes_many(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def set_bytes(self, key, value, ttl=None):
+        self.store[key] = value
+
+    def set_bytes_many(self, values):
+        self.store.update(values)
+
+    def zset_replace_tail_many(self, updates, keep):
+        for key, (from_score, members) in updates.items():
+            zset = {m: s for m, s in self.store.get(key, {}).items() if s < from_score}
+            zset.update(members)
+            self.store[key] = dict(sorted(zset.items(), key=lambda item: item[1])[-keep:])
+
+    def zset_tail_many(self, keys, count):
+        return [list(self.store.get(key, {}))[-count:] for key in keys]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
 
 class MemoryCandleRepo:
     def __init__(self):
@@ -53,8 +81,18 @@ class MemoryCandleRepo:
     def upsert_candles(self, symbol, timeframe, candles):
         self.store[(symbol, timeframe)] = candles
 
+    def upsert_candles_many(self, batches):
+        counts = UpsertCounts()
+        for symbol, timeframe, candles in batches:
+            self.upsert_candles(symbol, timeframe, candles)
+            counts.inserted += len(candles)
+        return counts
+
     def get_latest_candles(self, symbol, timeframe, limit):
-        return []
+        return CandleBatch.empty()
+
+    def get_latest_candles_batch(self, symbols, timeframe, limit):
+        return {}
 
 
 class MemorySnapshotRepo:
@@ -84,6 +122,11 @@ class MemoryWatchStockRepo:
         return ["TCS"]
 
 
+class MemoryWatchStockRepoPair:
+    def get_active_symbols(self):
+        return ["TCS", "INFY"]
+
+
 class MemoryWatchIndexRepo:
     def __init__(self, symbol):
         self.symbol = symbol
@@ -119,7 +162,7 @@ def test_pipeline_end_to_end():
         groww_client=FakeGrowwClient(),
         candle_repo=MemoryCandleRepo(),
         cache=MemoryCache(),
-        rate_limiter=RateLimiter(1000, 1000),
+        rate_limiter=RateLimiter(1000, 100000),
         retry_policy=RetryPolicy(1, 0.01, 0.01),
         watch_stock_repo=MemoryWatchStockRepo(),
         watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
@@ -145,3 +188,180 @@ def test_pipeline_end_to_end():
     payload = cache.get_json("scanner:5m")
     assert payload is not None
     assert payload["rows"]
+
+
+def _compute_service(settings, ingestion, dirty_tracker=None):
+    return ComputeService(
+        settings=settings,
+        candle_repo=ingestion.candle_repo,
+        snapshot_repo=MemorySnapshotRepo(),
+        benchmark_repo=MemoryBenchmarkRepo(),
+        cache=ingestion.cache,
+        broadcaster=None,
+        watch_stock_repo=MemoryWatchStockRepoPair(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+        dirty_tracker=dirty_tracker,
+    )
+
+
+def test_dirty_set_recomputes_only_changed_symbols():
+    settings = Settings()
+    settings.ingest_bars = 50
+    settings.compute_bars = 40
+    tracker = DirtyTracker()
+
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=FakeGrowwClient(),
+        candle_repo=MemoryCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepoPair(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+        dirty_tracker=tracker,
+    )
+    cache = ingestion.cache
+    compute = _compute_service(settings, ingestion, tracker)
+
+    ingestion.run_once("5m")
+    assert tracker.pending("5m") == len(ingestion._symbols())
+    compute.compute_timeframe("5m")
+    full_snapshot = compute.snapshot_repo.last
+    bench_states = compute.benchmark_repo.last
+    assert {r["symbol"] for r in full_snapshot["rows"]} == {"TCS", "INFY"}
+
+    # Nothing changed: compute is skipped entirely.
+    compute.compute_timeframe("5m")
+    assert compute.snapshot_repo.last is full_snapshot
+
+    # Only INFY has a new latest candle: its row is rebuilt and merged.
+    infy = ingestion.candles.get("INFY", "5m")[-1]
+    bumped = CandleBatch(infy.ts, infy.open, infy.high + 25.0, infy.low, infy.close + 25.0, infy.volume)
+    ingestion.candles.write_many([("INFY", "5m", bumped, False)])
+    tracker.mark("5m", ["INFY"])
+    compute.compute_timeframe("5m")
+    merged = cache.get_json("scanner:5m")["rows"]
+    assert compute.snapshot_repo.last is not full_snapshot
+    assert compute.benchmark_repo.last is bench_states
+    before = {r["symbol"]: r for r in full_snapshot["rows"]}
+    after = {r["symbol"]: r for r in merged}
+    assert after["TCS"] == before["TCS"]
+    assert after["INFY"]["rrs"] != before["INFY"]["rrs"]
+
+    reference = _compute_service(settings, ingestion)
+    reference.compute_timeframe("5m")
+    assert cache.get_json("scanner:5m")["rows"] == merged
+
+    # A benchmark change forces a full recompute, including benchmark states.
+    tracker.mark("5m", [settings.nifty_symbol])
+    compute.compute_timeframe("5m")
+    assert compute.benchmark_repo.last is not bench_states
+
+
+class CountingCache(MemoryCache):
+    def __init__(self):
+        super().__init__()
+        self.mget_calls = []
+        self.get_calls = []
+
+    def get_json(self, key):
+        self.get_calls.append(key)
+        return super().get_json(key)
+
+    def get_json_many(self, keys):
+        self.mget_calls.append(list(keys))
+        return super().get_json_many(keys)
+
+    def get_bytes(self, key):
+        self.get_calls.append(key)
+        return super().get_bytes(key)
+
+    def get_bytes_many(self, keys):
+        self.mget_calls.append(list(keys))
+        return super().get_bytes_many(keys)
+
+    def zset_tail_many(self, keys, count):
+        self.mget_calls.append(list(keys))
+        return super().zset_tail_many(keys, count)
+
+
+class BatchCandleRepo(MemoryCandleRepo):
+    def __init__(self):
+        super().__init__()
+        self.batch_calls = []
+
+    def get_latest_candles_batch(self, symbols, timeframe, limit):
+        self.batch_calls.append(list(symbols))
+        return {
+            symbol: self.store[(symbol, timeframe)].tail(limit)
+            for symbol in symbols
+            if (symbol, timeframe) in self.store
+        }
+
+
+def test_compute_loads_candles_in_one_round_trip_per_source():
+    settings = Settings()
+    settings.ingest_bars = 50
+    settings.compute_bars = 50
+
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=FakeGrowwClient(),
+        candle_repo=BatchCandleRepo(),
+        cache=CountingCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepoPair(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+    ingestion.run_once("5m")
+    cache = ingestion.cache
+    cache.mget_calls.clear()
+    cache.get_calls.clear()
+
+    compute = _compute_service(settings, ingestion)
+    compute.compute_timeframe("5m")
+    expected = cache.store["scanner:5m"]["rows"]
+    assert len(cache.mget_calls) == 1
+    assert not [key for key in cache.get_calls if key.startswith("bars:")]
+    assert ingestion.candle_repo.batch_calls == []
+
+    # A cache miss is served by the windowed batch query with identical results.
+    del cache.store["bars:INFY:5m"]
+    compute.compute_timeframe("5m")
+    assert len(cache.mget_calls) == 2
+    assert ingestion.candle_repo.batch_calls == [["INFY"]]
+    assert cache.store["scanner:5m"]["rows"] == expected
+
+
+def test_compute_reads_the_whole_cached_window():
+    settings = Settings()
+    settings.ingest_bars = 60
+    settings.compute_bars = 40
+
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=FakeGrowwClient(),
+        candle_repo=BatchCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepoPair(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+    ingestion.run_once("5m")
+    compute = _compute_service(settings, ingestion)
+
+    # Indicators warm up on everything ingestion keeps cached, as they always have;
+    # only a cache miss falls back to the latest COMPUTE_BARS from the database.
+    cached = ingestion.candles.get("INFY", "5m")
+    assert len(cached) > settings.compute_bars
+    assert len(compute._load_candles(["INFY"], "5m")["INFY"]["close"]) == len(cached)
+
+    ingestion.cache.delete(ingestion.candles.key("INFY", "5m"))
+    assert len(compute._load_candles(["INFY"], "5m")["INFY"]["close"]) == settings.compute_bars
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.rate_limit import RateLimiter, TokenBucket, parse_endpoint_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reservations_space_calls_by_the_tightest_bucket():
+    clock = FakeClock()
+    limiter = RateLimiter(10, 300, clock=clock)
+    # 300/min = one call every 0.2 s, tighter than 10/s.
+    waits = [limiter._reserve(None) for _ in range(4)]
+    assert waits == pytest.approx([0.0, 0.2, 0.4, 0.6])
+
+    clock.now += 10.0
+    assert limiter._reserve(None) == 0.0
+
+
+def test_burst_and_endpoint_buckets():
+    clock = FakeClock()
+    limiter = RateLimiter(10, 6000, burst=3, clock=clock)
+    limiter.add_endpoint("quote", 2)
+    assert [limiter._reserve(None) for _ in range(4)] == pytest.approx([0.0, 0.0, 0.0, 0.1])
+
+    clock.now += 5.0
+    assert [limiter._reserve("quote") for _ in range(3)] == pytest.approx([0.0, 0.5, 1.0])
+    stats = limiter.stats()
+    assert stats["default"]["throttled"] == 1
+    assert stats["quote"]["acquired"] == 3
+    assert stats["quote"]["max_wait_sec"] == pytest.approx(1.0)
+
+
+def test_waiting_happens_outside_the_lock():
+    limiter = RateLimiter(5, 1000)
+    limiter.acquire()
+    limiter.acquire()  # the next slot is now ~0.2 s out for everyone
+
+    sleeper = threading.Thread(target=limiter.acquire)
+    sleeper.start()
+    time.sleep(0.02)
+    started = time.monotonic()
+    wait = limiter._reserve(None)
+    assert time.monotonic() - started < 0.05
+    assert wait > 0.3
+    sleeper.join()
+
+
+def test_async_acquire_is_fifo():
+    limiter = RateLimiter(20, 100000)
+    order = []
+
+    async def call(i):
+        await limiter.acquire_async()
+        order.append(i)
+
+    async def main():
+        await asyncio.gather(*(call(i) for i in range(6)))
+
+    started = time.monotonic()
+    asyncio.run(main())
+    assert order == list(range(6))
+    assert time.monotonic() - started >= 0.24
+
+
+def test_token_bucket_rejects_bad_config():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    with pytest.raises(ValueError):
+        TokenBucket(1, capacity=0)
+
+
+def test_rate_change_credits_tokens_earned_at_the_old_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(10, 6000, clock=clock)
+    limiter._reserve(None)
+    clock.now += 0.05  # half a token earned at 10/s
+    limiter.set_rate_factor(0.5)
+    # The remaining half token now takes 0.1 s at 5/s, not the 0.15 s a
+    # retroactive rate change would charge.
+    assert limiter._reserve(None) == pytest.approx(0.1)
+
+
+def test_cancelled_async_waiter_returns_its_token():
+    clock = FakeClock()
+    limiter = RateLimiter(1, 6000, clock=clock)
+    limiter._reserve(None)
+
+    async def main():
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(main())
+    # The cancelled reservation's slot at +1 s is free again for the next caller.
+    assert limiter._reserve(None) == pytest.approx(1.0)
+
+
+def test_parse_endpoint_limits():
+    assert parse_endpoint_limits("candles:8, quote:2.5,") == {"candles": 8.0, "quote": 2.5}
+    assert parse_endpoint_limits("") == {}
+    for bad in ("candles", "candles:0", ":3", "candles:x"):
+        with pytest.raises(ValueError):
+            parse_endpoint_limits(bad)
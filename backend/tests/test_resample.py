@@ -0,0 +1,192 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.config import Settings
+from app.domain.candles import CandleBatch
+from app.services.market_hours import bar_start
+from app.services.ingestion import IngestionService, _Writes
+from app.services.rate_limit import RateLimiter
+from app.services.resample import resample_candles
+from app.services.retries import RetryPolicy
+from tests.test_pipeline_integration import (
+    FakeGrowwClient,
+    MemoryCache,
+    MemoryCandleRepo,
+    MemoryTickerIndexRepo,
+    MemoryWatchIndexRepo,
+    MemoryWatchStockRepo,
+)
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+def _session(day, start="09:15", end="15:30"):
+    hour, minute = map(int, start.split(":"))
+    first = datetime(2024, 1, day, hour, minute, tzinfo=IST)
+    close_h, close_m = map(int, end.split(":"))
+    stop = datetime(2024, 1, day, close_h, close_m, tzinfo=IST)
+    n = int((stop - first).total_seconds() // 300)
+    base = 100.0 + day * 10 + np.arange(n)
+    ts = int(first.timestamp()) + 300 * np.arange(n)
+    return CandleBatch(ts, base, base + 2, base - 1, base + 1, np.full(n, 10.0))
+
+
+def _epoch(*args):
+    return int(datetime(*args, tzinfo=IST).timestamp())
+
+
+def test_resample_aligns_to_session_and_drops_partial_leading_bar():
+    settings = Settings()
+    # Window starts at 09:20, inside the 09:15 15m/1h/1d bars of Jan 2.
+    candles = CandleBatch.concat([_session(2, start="09:20"), _session(3)])
+
+    fifteen = resample_candles(candles, "15m", settings)
+    assert fifteen.ts[0] == _epoch(2024, 1, 2, 9, 30)
+    assert fifteen.source == "resample"
+    src = candles[(candles.ts >= fifteen.ts[0]) & (candles.ts < fifteen.ts[0] + 900)]
+    assert fifteen.open[0] == src.open[0] and fifteen.close[0] == src.close[-1]
+    assert fifteen.high[0] == src.high.max() and fifteen.low[0] == src.low.min()
+    assert fifteen.volume[0] == 30.0
+
+    hourly = resample_candles(candles, "1h", settings)
+    local = [datetime.fromtimestamp(ts, tz=IST) for ts in hourly.ts.tolist()]
+    assert [t.strftime("%H:%M") for t in local if t.day == 3] == [
+        "09:15", "10:15", "11:15", "12:15", "13:15", "14:15", "15:15"
+    ]
+    assert hourly.volume[-1] == 30.0  # 15:15-15:30 is a short bar
+
+    daily = resample_candles(candles, "1d", settings)
+    assert daily.ts.tolist() == [_epoch(2024, 1, 3, 9, 15)]
+    assert daily.volume[0] == 750.0
+
+
+def test_resample_matches_bar_start_per_candle():
+    settings = Settings()
+    candles = CandleBatch.concat([_session(2), _session(3, start="10:05")])
+    for timeframe in ("15m", "1h"):
+        minutes = {"15m": 15, "1h": 60}[timeframe]
+        starts = [
+            int(bar_start(datetime.fromtimestamp(ts, tz=timezone.utc), minutes, settings).timestamp())
+            for ts in candles.ts.tolist()
+        ]
+        assert sorted(set(starts)) == resample_candles(candles, timeframe, settings).ts.tolist()
+    assert len(resample_candles(CandleBatch.empty(), "1h", settings)) == 0
+
+
+class CountingGrowwClient(FakeGrowwClient):
+    def __init__(self):
+        self.calls = []
+
+    def fetch_candles(self, trading_symbol, timeframe, **kwargs):
+        self.calls.append((trading_symbol, timeframe))
+        return super().fetch_candles(trading_symbol, timeframe, **kwargs)
+
+
+def test_ingestion_derives_higher_timeframes_from_5m():
+    settings = Settings()
+    settings.ingest_bars = 300
+    settings.compute_bars = 20
+    client = CountingGrowwClient()
+    ingestion = IngestionService(
+        settings=settings,
+        groww_client=client,
+        candle_repo=MemoryCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepo(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+    symbols = ingestion._symbols()
+
+    ingestion.run_once("5m")
+    # 15m has enough bars from the 5m window; 1h and 1d are backfilled once.
+    assert sorted({tf for _, tf in client.calls}) == ["1d", "1h", "5m"]
+    assert len(client.calls) == 3 * len(symbols)
+    tcs_15m = ingestion.candles.get("TCS", "15m").to_payload()
+    assert len(tcs_15m["ts"]) >= settings.compute_bars
+    assert ingestion.candle_repo.store[("TCS", "15m")].source == "resample"
+
+    client.calls.clear()
+    ingestion.run_once("5m")
+    assert client.calls == [(symbol, "5m") for symbol in symbols]
+    daily_ts = ingestion.candles.get("TCS", "1d").ts.tolist()
+    assert daily_ts == sorted(set(daily_ts))
+
+
+class MidnightDailyClient(FakeGrowwClient):
+    """Stamps native daily bars at local midnight, as Groww can, one per calendar day."""
+
+    def fetch_candles(self, trading_symbol, timeframe, start_time, end_time, **kwargs):
+        if timeframe != "1d":
+            return super().fetch_candles(trading_symbol, timeframe, start_time, end_time, **kwargs)
+        first = start_time.astimezone(IST).replace(hour=0, minute=0, second=0, microsecond=0)
+        days = (end_time.astimezone(IST) - first).days + 1
+        ts = int(first.timestamp()) + 86400 * np.arange(days)
+        base = 100.0 + np.arange(days)
+        return CandleBatch(ts, base, base + 1, base - 1, base, np.full(days, 1e4), source="fake")
+
+
+class FlakyBackfillClient(CountingGrowwClient):
+    """Fails the first native daily fetch of every symbol."""
+
+    def fetch_candles(self, trading_symbol, timeframe, **kwargs):
+        if timeframe == "1d" and (trading_symbol, "1d") not in self.calls:
+            self.calls.append((trading_symbol, timeframe))
+            raise TimeoutError("Groww timed out")
+        return super().fetch_candles(trading_symbol, timeframe, **kwargs)
+
+
+def _derived_ingestion(client):
+    settings = Settings()
+    settings.ingest_bars = 300
+    settings.compute_bars = 20
+    return IngestionService(
+        settings=settings,
+        groww_client=client,
+        candle_repo=MemoryCandleRepo(),
+        cache=MemoryCache(),
+        rate_limiter=RateLimiter(1000, 100000),
+        retry_policy=RetryPolicy(1, 0.01, 0.01),
+        watch_stock_repo=MemoryWatchStockRepo(),
+        watch_index_repo=MemoryWatchIndexRepo(settings.nifty_symbol),
+        ticker_index_repo=MemoryTickerIndexRepo(settings.nifty_symbol),
+    )
+
+
+def test_midnight_stamped_daily_backfill_keeps_one_bar_per_trading_day():
+    ingestion = _derived_ingestion(MidnightDailyClient())
+    base = CandleBatch.concat([_session(2), _session(3)])
+    writes = _Writes(symbols=1)
+    ingestion._derive(writes, "TCS", "1d", base, int(base.ts[0]), datetime(2024, 1, 3, 15, 30, tzinfo=IST))
+
+    (_, _, window, replace), = writes.bars
+    assert replace
+    stored = CandleBatch.concat([candles for _, _, candles in writes.upserts])
+    for daily in (window, stored):
+        local = [datetime.fromtimestamp(ts, tz=IST) for ts in daily.ts.tolist()]
+        assert len({stamp.date() for stamp in local}) == len(local)
+        assert {(stamp.hour, stamp.minute) for stamp in local} == {(9, 15)}
+    assert window.ts[-2:].tolist() == [_epoch(2024, 1, 2, 9, 15), _epoch(2024, 1, 3, 9, 15)]
+    assert window.source == "resample" and window.volume[-1] == 750.0
+
+
+def test_failed_derived_backfill_keeps_resampled_bars_and_retries():
+    client = FlakyBackfillClient()
+    ingestion = _derived_ingestion(client)
+    base = CandleBatch.concat([_session(2), _session(3)])
+    now = datetime(2024, 1, 3, 15, 30, tzinfo=IST)
+
+    writes = _Writes(symbols=1)
+    ingestion._derive(writes, "TCS", "1d", base, int(base.ts[0]), now)
+    # The failed fetch only costs the backfill; the resampled daily bars are still written.
+    (_, _, daily), = writes.upserts
+    assert daily.ts.tolist() == [_epoch(2024, 1, 2, 9, 15), _epoch(2024, 1, 3, 9, 15)]
+    assert ("TCS", "1d") not in ingestion._backfilled
+
+    ingestion._derive(_Writes(symbols=1), "TCS", "1d", base, int(base.ts[0]), now)
+    assert client.calls == [("TCS", "1d"), ("TCS", "1d")]
+    assert ("TCS", "1d") in ingestion._backfilled
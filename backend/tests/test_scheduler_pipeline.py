@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from app.core.config import Settings
+from app.services.market_hours import next_bar_close
+from app.services.pipeline_metrics import PipelineLatency
+from app.services.scheduler import Scheduler
+
+
+class CountingIngestion:
+    def __init__(self):
+        self.runs = 0
+
+    def run_once(self, timeframe):
+        self.runs += 1
+
+
+class CountingCompute:
+    def __init__(self):
+        self.runs = 0
+        self.done = threading.Event()
+
+    def compute_timeframe(self, timeframe):
+        self.runs += 1
+        if self.runs >= 2:
+            self.done.set()
+
+
+def _settings(mode):
+    settings = Settings(
+        MARKET_ALLOW_AFTER_HOURS=True,
+        SCHEDULER_TIMEFRAMES="5m",
+        SCHEDULER_MODE=mode,
+        SCHEDULER_COMPUTE_INTERVAL_SEC=60,
+    )
+    settings.scheduler_ingest_interval_sec = 0.01
+    return settings
+
+
+def _run(settings, seconds):
+    ingestion, compute = CountingIngestion(), CountingCompute()
+
+    async def main():
+        scheduler = Scheduler(settings, ingestion, compute)
+        scheduler.start()
+        await asyncio.to_thread(compute.done.wait, seconds)
+        await scheduler.stop()
+
+    asyncio.run(main())
+    return ingestion, compute
+
+
+def test_pipeline_mode_computes_after_ingestion_without_waiting_for_timer():
+    ingestion, compute = _run(_settings("pipeline"), 5)
+    assert compute.runs >= 2
+    assert ingestion.runs >= compute.runs
+
+
+def test_timer_mode_waits_for_compute_interval():
+    _, compute = _run(_settings("timer"), 0.2)
+    assert compute.runs == 1
+
+
+def test_next_bar_close_is_anchored_to_session_open():
+    settings = Settings()
+    # 09:17 IST -> 09:20 (5m) and 10:15 (1h, since bars start at 09:15).
+    now = datetime(2024, 1, 2, 3, 47, tzinfo=timezone.utc)
+    assert next_bar_close(now, 5, settings) == datetime(2024, 1, 2, 3, 50, tzinfo=timezone.utc)
+    assert next_bar_close(now, 60, settings) == datetime(2024, 1, 2, 4, 45, tzinfo=timezone.utc)
+    on_boundary = datetime(2024, 1, 2, 3, 50, tzinfo=timezone.utc)
+    assert next_bar_close(on_boundary, 5, settings) == datetime(2024, 1, 2, 3, 55, tzinfo=timezone.utc)
+
+
+def test_pipeline_latency_counts_each_closed_bar_once():
+    latency = PipelineLatency()
+    # Bar 1000..1300 closed; published 4s after close.
+    assert latency.observe("5m", 1000, 5, 1304.0) == 4.0
+    # Recompute of the same data does not add a sample.
+    assert latency.observe("5m", 1000, 5, 1310.0) is None
+    # A forming bar starting at 1300 means the newest closed bar ended at 1300.
+    assert latency.observe("5m", 1300, 5, 1320.0) is None
+    assert latency.observe("5m", 1600, 5, 1620.0) == 20.0
+
+    snapshot = latency.snapshot()["5m"]
+    assert snapshot["samples"] == 2
+    assert snapshot["last_sec"] == 20.0
+    assert snapshot["max_sec"] == 20.0
+    assert snapshot["last_bar_close"] == 1600.0
+
+
+def test_derived_timeframes_ride_on_5m_ingestion():
+    settings = _settings("pipeline")
+    settings.scheduler_timeframes = "15m"
+    ingestion = CountingIngestion()
+    seen = []
+
+    class RecordingCompute(CountingCompute):
+        def compute_timeframe(self, timeframe):
+            seen.append(timeframe)
+            super().compute_timeframe(timeframe)
+
+    compute = RecordingCompute()
+    ingested = []
+    ingestion.run_once = ingested.append
+
+    async def main():
+        scheduler = Scheduler(settings, ingestion, compute)
+        scheduler.start()
+        await asyncio.to_thread(compute.done.wait, 5)
+        await scheduler.stop()
+
+    asyncio.run(main())
+    assert set(ingested) == {"5m"}
+    assert set(seen) == {"15m"} and len(seen) >= 2
@@ -0,0 +1,194 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.infra.db.models import ScannerSnapshot
+from app.infra.db.repositories import (
+    BenchmarkRepository,
+    SnapshotRepository,
+    latest_pointer_upsert,
+    snapshot_row_changed,
+)
+
+TS = datetime(2026, 10, 16, 9, 20, tzinfo=timezone.utc)
+
+
+class RecordingDb:
+    """Database stand-in: records the statements executed in each session."""
+
+    def __init__(self):
+        self.sessions = []
+
+    @contextmanager
+    def session(self):
+        statements = []
+        self.sessions.append(statements)
+        yield self
+
+    def execute(self, stmt):
+        self.sessions[-1].append(stmt)
+        return self
+
+
+class ScriptedDb:
+    """Database stand-in that answers each executed statement with the next queued result."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+
+    @contextmanager
+    def session(self):
+        yield self
+
+    def execute(self, stmt):
+        self.result = self.results.pop(0)
+        return self
+
+    def scalar(self):
+        return self.result
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.result
+
+
+def _pointer_values(stmt):
+    return stmt.compile(dialect=postgresql.dialect()).params
+
+
+def _inserted(stmt):
+    """Rows of a multi-row snapshot INSERT, from its ``<column>_m<i>`` parameters."""
+    rows = {}
+    for key, value in stmt.compile(dialect=postgresql.dialect()).params.items():
+        column, _, index = key.rpartition("_m")
+        rows.setdefault(int(index), {})[column] = value
+    return [rows[i] for i in sorted(rows)]
+
+
+def _scan(**overrides):
+    rows = {
+        "TCS": {"symbol": "TCS", "rrs": 1.0, "rrv": 0.2, "rve": 0.1, "signal": "WATCH"},
+        "INFY": {"symbol": "INFY", "rrs": -0.5, "rrv": 0.1, "rve": 0.3, "signal": "NEUTRAL"},
+        "SBIN": {"symbol": "SBIN", "rrs": 0.3, "rrv": float("nan"), "rve": 0.0, "signal": "NEUTRAL"},
+    }
+    for symbol, change in overrides.items():
+        if change is None:
+            rows.pop(symbol)
+        else:
+            rows[symbol] = {**rows[symbol], **change}
+    return list(rows.values())
+
+
+def test_snapshot_and_pointer_are_written_in_one_transaction():
+    db = RecordingDb()
+    rows = [
+        {"symbol": "TCS", "rrs": 1.5, "rrv": 0.2, "rve": float("nan"), "signal": "WATCH"},
+        {"symbol": "INFY", "rrs": -0.5, "rrv": 0.1, "rve": 0.3, "signal": "TRIGGER_LONG"},
+    ]
+    SnapshotRepository(db).save_snapshot("5m", TS, rows)
+
+    assert len(db.sessions) == 1 and len(db.sessions[0]) == 3
+    params = _pointer_values(db.sessions[0][-1])
+    assert params["kind"] == "scanner" and params["row_count"] == 2
+    payload = params["payload"]
+    assert payload["ts"] == TS.isoformat()
+    assert [row["symbol"] for row in payload["rows"]] == ["INFY", "TCS"]
+    assert payload["rows"][1]["rve"] is None
+
+
+def test_benchmark_states_pointer_is_prebuilt_in_api_shape():
+    db = RecordingDb()
+    states = [
+        {"benchmark": name, "regime": "RISK_ON", "trend": 1.0, "vol_expansion": 0.5, "participation": 0.7}
+        for name in ("NIFTY", "BANKNIFTY")
+    ]
+    BenchmarkRepository(db).save_states("15m", TS, states)
+
+    assert len(db.sessions) == 1 and len(db.sessions[0]) == 2
+    payload = _pointer_values(db.sessions[0][1])["payload"]
+    assert [s["benchmark"] for s in payload["states"]] == ["BANKNIFTY", "NIFTY"]
+    assert payload["states"][0]["ts"] == payload["ts"] == TS.isoformat()
+
+
+def test_pointer_never_moves_backwards_and_checksum_is_canonical():
+    stmt = latest_pointer_upsert("scanner", "5m", TS, {"b": 1, "a": [1.0]}, 1)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (kind, timeframe) DO UPDATE" in sql
+    assert "WHERE latest_snapshot.ts <= excluded.ts" in sql
+    same = latest_pointer_upsert("scanner", "5m", TS, {"a": [1.0], "b": 1}, 1)
+    other = latest_pointer_upsert("scanner", "5m", TS, {"a": [2.0], "b": 1}, 1)
+    checksum = _pointer_values(stmt)["checksum"]
+    assert checksum == _pointer_values(same)["checksum"] != _pointer_values(other)["checksum"]
+
+
+def test_delta_mode_writes_changes_tombstones_and_periodic_keyframes():
+    db = RecordingDb()
+    repo = SnapshotRepository(db, epsilon=1e-3, keyframe_every=3)
+
+    repo.save_snapshot("5m", TS, _scan())
+    first = _inserted(db.sessions[-1][0])
+    assert len(first) == 3 and all(row["keyframe"] for row in first)
+
+    # Sub-epsilon noise and unchanged NaNs are skipped; the move and the removal are written.
+    repo.save_snapshot("5m", TS + timedelta(minutes=5), _scan(TCS={"rrs": 1.0004}, INFY={"rrs": -0.4}, SBIN=None))
+    delta = {row["symbol"]: row for row in _inserted(db.sessions[-1][0])}
+    assert set(delta) == {"INFY", "SBIN"}
+    assert delta["INFY"]["rrs_vs_nifty"] == -0.4 and not delta["INFY"]["removed"]
+    assert delta["SBIN"]["removed"] and not delta["SBIN"]["keyframe"]
+    # The pointer still carries the full cycle.
+    assert _pointer_values(db.sessions[-1][-1])["row_count"] == 2
+
+    # Drift is measured against the last written value, so it cannot creep past epsilon.
+    # The cycle time is still recorded, next to the pointer.
+    repo.save_snapshot("5m", TS + timedelta(minutes=10), _scan(TCS={"rrs": 1.0008}, SBIN=None, INFY={"rrs": -0.4}))
+    cycle, pointer = db.sessions[-1]
+    assert cycle.table.name == "scanner_snapshot_cycle"
+    assert _pointer_values(cycle)["ts"] == _pointer_values(pointer)["ts"] == TS + timedelta(minutes=10)
+
+    repo.save_snapshot("5m", TS + timedelta(minutes=15), _scan(TCS={"rrs": 1.0012}, SBIN=None, INFY={"rrs": -0.4}))
+    keyframe = _inserted(db.sessions[-1][0])
+    assert {row["symbol"] for row in keyframe} == {"TCS", "INFY"} and all(row["keyframe"] for row in keyframe)
+
+
+def test_full_mode_writes_every_row_as_a_keyframe():
+    db = RecordingDb()
+    repo = SnapshotRepository(db, mode="full")
+    for minutes in (0, 5):
+        repo.save_snapshot("5m", TS + timedelta(minutes=minutes), _scan())
+        assert len(_inserted(db.sessions[-1][0])) == 3
+
+
+def test_row_change_rules():
+    row = {
+        "rrs_vs_nifty": 1.0, "rrv_vs_nifty": float("nan"), "rve_vs_nifty": 0.0,
+        "rrs_vs_bank": 0.0, "rrv_vs_bank": 0.0, "rve_vs_bank": 0.0,
+        "score_vs_nifty": 2, "signal_vs_nifty": "WATCH", "score_vs_bank": 0, "signal_vs_bank": "NEUTRAL",
+        "best_signal": "WATCH", "benchmark_symbol": "NIFTY",
+    }
+    assert snapshot_row_changed(None, row, 1e-3)
+    assert not snapshot_row_changed(row, dict(row, rrs_vs_nifty=1.0009), 1e-3)
+    assert snapshot_row_changed(row, dict(row, rrs_vs_nifty=1.002), 1e-3)
+    assert snapshot_row_changed(row, dict(row, rrv_vs_nifty=0.0), 1e-3)
+    assert snapshot_row_changed(row, dict(row, signal_vs_nifty="TRIGGER_LONG"), 1e-3)
+
+
+def test_rebuilt_snapshot_reports_the_cycle_time_not_the_newest_change():
+    keyframe = TS
+    rows = [
+        ScannerSnapshot(
+            ts=keyframe, timeframe="5m", symbol="TCS", rrs_vs_nifty=1.0, rrv_vs_nifty=0.2, rve_vs_nifty=0.1,
+            signal_vs_nifty="WATCH", best_signal="WATCH", benchmark_symbol="NIFTY", removed=False,
+        ),
+    ]
+    # Nothing changed for four cycles after the keyframe.
+    db = ScriptedDb(keyframe, rows, TS + timedelta(minutes=20))
+
+    snapshot = SnapshotRepository(db).get_snapshot_at("5m")
+    assert snapshot["ts"] == (TS + timedelta(minutes=20)).isoformat()
+    assert [row["symbol"] for row in snapshot["rows"]] == ["TCS"]
+
+    # Snapshots from before cycle times were recorded fall back to their rows' time.
+    assert SnapshotRepository(ScriptedDb(keyframe, rows, None)).get_snapshot_at("5m")["ts"] == TS.isoformat()
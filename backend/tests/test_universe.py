@@ -0,0 +1,109 @@
+from app.services.indices import get_associated_indices
+from app.core.config import Settings
+from app.services.universe import CHANNEL, VERSION_KEY, UniverseCache
+
+
+class CountingRepos:
+    def __init__(self):
+        self.queries = 0
+        self.stocks = ["TCS", "INFY"]
+        self.indices = {"NIFTY": "NIFTY", "NIFTYIT": "CNXIT"}
+        self.mappings = {"TCS": ["NIFTYIT", "NIFTY"]}
+
+    def get_active_symbols(self):
+        self.queries += 1
+        return list(self.stocks)
+
+    def get_active_mappings(self):
+        self.queries += 1
+        return dict(self.indices)
+
+    def get_mappings(self):
+        self.queries += 1
+        return {k: list(v) for k, v in self.mappings.items()}
+
+    def get_indices_for_stock(self, symbol):
+        raise AssertionError("universe should serve stock indices")
+
+
+class PubSubCache:
+    def __init__(self):
+        self.store = {}
+        self.handlers = {}
+        self.published = []
+
+    def get_json(self, key):
+        return self.store.get(key)
+
+    def incr(self, key):
+        self.store[key] = self.store.get(key, 0) + 1
+        return self.store[key]
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        for handler in self.handlers.get(channel, []):
+            handler({"channel": channel, "data": message})
+
+    def subscribe(self, channel, handler):
+        self.handlers.setdefault(channel, []).append(handler)
+        return None
+
+
+def _universe(repos, cache):
+    return UniverseCache(repos, repos, repos, cache, max_age_sec=3600)
+
+
+def test_snapshot_loads_once_until_bumped():
+    repos, cache = CountingRepos(), PubSubCache()
+    universe = _universe(repos, cache)
+
+    first = universe.get()
+    assert first.stock_symbols == ("TCS", "INFY")
+    assert first.index_data_symbols == ["NIFTY", "CNXIT"]
+    assert first.indices_for_stock("TCS") == ["NIFTY", "NIFTYIT"]
+    assert universe.get() is first
+    assert repos.queries == 3
+
+    repos.stocks.append("HDFCBANK")
+    universe.bump()
+    second = universe.get()
+    assert second.version == 1 and cache.store[VERSION_KEY] == 1
+    assert "HDFCBANK" in second.stock_symbols
+    assert repos.queries == 6
+
+
+def test_pubsub_message_invalidates_other_processes():
+    repos, cache = CountingRepos(), PubSubCache()
+    admin, worker = _universe(repos, cache), _universe(repos, cache)
+    worker.start()
+
+    stale = worker.get()
+    repos.indices["BANKNIFTY"] = "BANKNIFTY"
+    admin.bump()
+    assert cache.published == [(CHANNEL, "1")]
+    assert worker.get() is not stale
+    assert "BANKNIFTY" in worker.get().index_map
+
+
+def test_load_racing_an_invalidation_is_not_kept():
+    repos, cache = CountingRepos(), PubSubCache()
+    universe = _universe(repos, cache)
+    original = repos.get_mappings
+
+    def invalidate_mid_load():
+        universe.invalidate()
+        return original()
+
+    repos.get_mappings = invalidate_mid_load
+    universe.get()
+    repos.get_mappings = original
+    queries = repos.queries
+    universe.get()
+    assert repos.queries == queries + 3
+
+
+def test_associated_indices_from_universe():
+    repos = CountingRepos()
+    universe = _universe(repos, PubSubCache())
+    settings = Settings()
+    assert get_associated_indices("tcs", settings, repos, universe) == [settings.nifty_symbol, "NIFTYIT"]